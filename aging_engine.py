@@ -0,0 +1,137 @@
+"""
+AR/AP Aging Engine
+Maps recognized revenue and expenses to cash timing through payment-term mixes.
+
+A terms mix such as {0: 0.2, 30: 0.5, 60: 0.3} (share of invoices paid on receipt,
+net-30 and net-60) becomes a month-lag kernel [0.2, 0.5, 0.3]. Cash collected or paid
+is the causal convolution of the monthly amounts with that kernel, and the open
+balance is everything recognized but not yet settled. Every function works over the
+last (month) axis with any leading axes, so many scenarios age in one call.
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+DAYS_PER_MONTH = 30
+
+# Named mixes offered in the UI; keys are days until payment
+TERMS_PRESETS = {
+    'Due on receipt': {0: 1.0},
+    'Net 30': {30: 1.0},
+    'Net 60': {60: 1.0},
+    'Net 90': {90: 1.0},
+}
+
+AGING_BUCKETS = ('Current', '1-30 Days', '31-60 Days', '61-90 Days', '90+ Days')
+
+
+def terms_kernel(mix: Dict[int, float]) -> np.ndarray:
+    """
+    {days: share} -> month-lag kernel. Days round to whole months (net-45 counts as
+    2 months) and shares are normalized to sum to 1.
+    """
+    if not mix:
+        return np.ones(1)
+    lags = {}
+    for days, share in mix.items():
+        lag = int(round(int(days) / DAYS_PER_MONTH))
+        lags[lag] = lags.get(lag, 0.0) + float(share)
+    kernel = np.zeros(max(lags) + 1)
+    for lag, share in lags.items():
+        kernel[lag] = share
+    total = kernel.sum()
+    if total <= 0:
+        raise ValueError("Payment terms mix must have a positive share")
+    return kernel / total
+
+
+def convolve_months(values: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """
+    Causal convolution along the month axis, truncated to the input length:
+    out[..., t] = sum_k kernel[k] * values[..., t - k].
+    """
+    values = np.asarray(values, dtype=float)
+    kernel = np.asarray(kernel, dtype=float)
+    n_months = values.shape[-1]
+    if values.ndim == 1:
+        return np.convolve(values, kernel)[:n_months]
+    # Kernels are a few taps long: one shifted multiply-add per tap over every row
+    out = np.zeros_like(values)
+    for lag, weight in enumerate(kernel[:n_months]):
+        if weight:
+            out[..., lag:] += weight * values[..., :n_months - lag]
+    return out
+
+
+def settle_opening(balance: float, kernel: np.ndarray, n_months: int) -> np.ndarray:
+    """
+    Cash from an opening balance. Opening invoices are already partway through
+    their terms, so the balance settles over the kernel with its first lag
+    brought forward into month 1.
+    """
+    out = np.zeros(n_months)
+    tail = np.asarray(kernel, dtype=float)
+    # Drop the leading zero lags: an invoice already on the books is not "due in 60 days"
+    nonzero = np.flatnonzero(tail)
+    tail = tail[nonzero[0]:] if len(nonzero) else tail
+    k = min(len(tail), n_months)
+    out[:k] = balance * tail[:k]
+    return out
+
+
+def age_flows(recognized: np.ndarray, mix: Dict[int, float],
+              opening_balance: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Cash timing and open balances for amounts recognized per month.
+
+    Returns: {"recognized", "cash" (collections or payments), "balance" (open at
+              month end), "opening_cash" (the part of cash settling the opening balance)}
+    """
+    recognized = np.asarray(recognized, dtype=float)
+    kernel = terms_kernel(mix)
+    n_months = recognized.shape[-1]
+    opening_cash = settle_opening(opening_balance, kernel, n_months)
+    cash = convolve_months(recognized, kernel) + opening_cash
+    balance = opening_balance + np.cumsum(recognized - cash, axis=-1)
+    return {
+        'recognized': recognized,
+        'cash': cash,
+        'balance': balance,
+        'opening_cash': opening_cash,
+    }
+
+
+def aging_buckets(recognized: np.ndarray, mix: Dict[int, float],
+                  buckets: Sequence[str] = AGING_BUCKETS) -> np.ndarray:
+    """
+    Open balance at each month end split by invoice age: amounts recognized this
+    month are Current, last month's are 1-30 days, and so on; the last bucket
+    holds everything older. Excludes any opening balance.
+
+    Returns: array of shape (..., len(buckets), months)
+    """
+    recognized = np.asarray(recognized, dtype=float)
+    kernel = terms_kernel(mix)
+    n_months = recognized.shape[-1]
+    # Share of an invoice still open `age` months after recognition
+    open_share = 1.0 - np.cumsum(kernel)
+    open_share = np.clip(open_share, 0.0, None)
+
+    out = np.zeros(recognized.shape[:-1] + (len(buckets), n_months))
+    last = len(buckets) - 1
+    for age, share in enumerate(open_share[:n_months]):
+        if share <= 0:
+            continue
+        row = min(age, last)
+        out[..., row, age:] += share * recognized[..., :n_months - age]
+    return out
+
+
+def mix_from_shares(shares: Dict[str, float]) -> Dict[int, float]:
+    """UI shares keyed by preset name (percent or fraction) -> {days: share}."""
+    mix: Dict[int, float] = {}
+    for name, share in shares.items():
+        for days, weight in TERMS_PRESETS[name].items():
+            mix[days] = mix.get(days, 0.0) + share * weight
+    return mix
@@ -0,0 +1,172 @@
+"""
+QBO Anomaly Scan
+Flags unusual movements in imported QBO accounts.
+
+Every P&L account plus the balance-sheet cash and AP series is laid out as one
+(account x month) matrix over all imported periods. Three checks then run as
+whole-matrix operations, so a multi-year, full chart-of-accounts export costs a
+handful of array passes:
+  MoM Change   month-over-month move above MOM_PCT_THRESHOLD of the prior month
+  Z-Score      value more than Z_THRESHOLD trailing standard deviations from the
+               trailing ZSCORE_WINDOW-month mean (rolling sums via cumulative sums)
+  Ratio Break  a ratio such as COGS / Revenue moving more than RATIO_THRESHOLD
+               away from its trailing mean
+Moves smaller than MIN_ABS_CHANGE dollars are ignored as immaterial.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model_cache import FingerprintCache
+from qbo_parser import deserialize_qbo_data, MONTHS
+
+MOM_PCT_THRESHOLD = 50.0
+Z_THRESHOLD = 3.0
+ZSCORE_WINDOW = 6
+MIN_WINDOW_OBS = 4
+MIN_ABS_CHANGE = 1000.0
+RATIO_THRESHOLD = 0.15
+
+BALANCE_SERIES = {'Cash Balance': 'cash_data', 'Accounts Payable': 'ap_data'}
+# name -> (numerator account, denominator account)
+RATIOS = {
+    'COGS / Revenue': ('Total COGS', 'Total Revenue'),
+    'OpEx / Revenue': ('Total Expenses', 'Total Revenue'),
+    'Wholesale Share of Revenue': ('Wholesale Revenue', 'Total Revenue'),
+}
+CHECKS = ('MoM Change', 'Z-Score', 'Ratio Break')
+
+_cache = FingerprintCache('anomaly_scan', max_entries=4)
+
+
+def account_matrix(parsed: Dict) -> Tuple[List[str], List[Tuple[int, int]], np.ndarray]:
+    """
+    (account x period) values over every imported month, NaN where an account has
+    no value. Returns (accounts, periods as (year, month), matrix).
+    """
+    series = dict(parsed.get('pl_data', {}))
+    for name, key in BALANCE_SERIES.items():
+        if parsed.get(key):
+            series[name] = parsed[key]
+    periods = sorted({p for values in series.values() for p in values} | set(parsed.get('months_found', [])))
+    column = {p: i for i, p in enumerate(periods)}
+    accounts = list(series)
+    matrix = np.full((len(accounts), len(periods)), np.nan)
+    for row, name in enumerate(accounts):
+        cells = series[name]
+        if cells:
+            matrix[row, [column[p] for p in cells]] = list(cells.values())
+    return accounts, periods, matrix
+
+
+def _trailing_stats(x: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Mean, std and count of the `window` months before each month, ignoring NaN."""
+    valid = ~np.isnan(x)
+    vals = np.where(valid, x, 0.0)
+
+    def trailing_sum(a):
+        csum = np.concatenate([np.zeros((a.shape[0], 1)), np.cumsum(a, axis=1)], axis=1)
+        end = np.arange(a.shape[1])                        # exclusive: months before t
+        start = np.maximum(end - window, 0)
+        return csum[:, end] - csum[:, start]
+
+    n = trailing_sum(valid.astype(float))
+    s1 = trailing_sum(vals)
+    s2 = trailing_sum(vals ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = s1 / n
+        var = (s2 - n * mean ** 2) / (n - 1)
+    return mean, np.sqrt(np.maximum(var, 0.0)), n
+
+
+def _flags(check: str, names: List[str], periods: List[Tuple[int, int]], mask: np.ndarray,
+           value: np.ndarray, reference: np.ndarray, score: np.ndarray, detail: np.ndarray) -> pd.DataFrame:
+    rows, cols = np.nonzero(mask)
+    return pd.DataFrame({
+        'Account': np.array(names, dtype=object)[rows],
+        'Year': [periods[c][0] for c in cols],
+        'Month': [periods[c][1] for c in cols],
+        'Check': check,
+        'Value': value[rows, cols],
+        'Reference': reference[rows, cols],
+        'Change': value[rows, cols] - reference[rows, cols],
+        'Detail': detail[rows, cols],
+        'Score': score[rows, cols],
+    })
+
+
+def scan(parsed: Dict) -> pd.DataFrame:
+    """
+    Run every check on a parsed QBO import (qbo_parser.parse_qbo_file output).
+
+    Returns: one row per flagged cell with Account, Year, Month, Period, Check,
+             Value, Reference (prior month or trailing mean), Change, Detail
+             (% change, z-score or ratio points) and Score (for ranking), latest
+             period first and largest score first within a period.
+    """
+    accounts, periods, x = account_matrix(parsed)
+    if not periods:
+        return pd.DataFrame(columns=['Account', 'Year', 'Month', 'Period', 'Check', 'Value',
+                                     'Reference', 'Change', 'Detail', 'Score'])
+
+    # Month-over-month change
+    prior = np.concatenate([np.full((len(accounts), 1), np.nan), x[:, :-1]], axis=1)
+    change = x - prior
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mom_pct = np.where(prior != 0, change / np.abs(prior) * 100, np.nan)
+    material = np.abs(change) >= MIN_ABS_CHANGE
+    mom = material & (np.abs(mom_pct) > MOM_PCT_THRESHOLD)
+
+    # Rolling z-score against the trailing window
+    mean, std, n = _trailing_stats(x, ZSCORE_WINDOW)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (x - mean) / std
+    zflag = (n >= MIN_WINDOW_OBS) & (std > 0) & (np.abs(z) > Z_THRESHOLD) & \
+        (np.abs(x - mean) >= MIN_ABS_CHANGE)
+
+    frames = [
+        _flags('MoM Change', accounts, periods, mom, x, prior, np.abs(mom_pct) / MOM_PCT_THRESHOLD, mom_pct),
+        _flags('Z-Score', accounts, periods, zflag, x, mean, np.abs(z) / Z_THRESHOLD, z),
+    ]
+
+    # Ratio breaks
+    index = {name: i for i, name in enumerate(accounts)}
+    ratios = [(name, parts) for name, parts in RATIOS.items() if all(p in index for p in parts)]
+    if ratios:
+        num = x[[index[a] for _, (a, _) in ratios]]
+        den = x[[index[b] for _, (_, b) in ratios]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(den > 0, num / den, np.nan)
+        r_mean, _, r_n = _trailing_stats(ratio, ZSCORE_WINDOW)
+        move = ratio - r_mean
+        rflag = (r_n >= MIN_WINDOW_OBS) & (np.abs(move) > RATIO_THRESHOLD)
+        frames.append(_flags('Ratio Break', [name for name, _ in ratios], periods, rflag,
+                             ratio, r_mean, np.abs(move) / RATIO_THRESHOLD, move * 100))
+
+    flags = pd.concat(frames, ignore_index=True)
+    flags.insert(3, 'Period', [f"{MONTHS[m - 1]} {y}" for y, m in zip(flags['Year'], flags['Month'])])
+    return flags.sort_values(['Year', 'Month', 'Score'], ascending=[False, False, False]).reset_index(drop=True)
+
+
+def scan_serialized(qbo_raw: Dict) -> pd.DataFrame:
+    """scan() for the stored (serialized) actuals, reused while they are unchanged."""
+    return _cache.get_or_compute(qbo_raw, lambda: scan(deserialize_qbo_data(qbo_raw)))
+
+
+def latest_flags(flags: pd.DataFrame, year: int, month: int) -> pd.DataFrame:
+    """Flags for one period (e.g. the month just imported)."""
+    return flags[(flags['Year'] == year) & (flags['Month'] == month)]
+
+
+def describe(flag: Dict) -> str:
+    """One-line description of a flagged cell."""
+    if flag['Check'] == 'Ratio Break':
+        return (f"{flag['Account']} {flag['Period']}: {flag['Value']:.1%} vs trailing "
+                f"{flag['Reference']:.1%} ({flag['Detail']:+.1f} pts)")
+    if flag['Check'] == 'Z-Score':
+        return (f"{flag['Account']} {flag['Period']}: ${flag['Value']:,.0f} vs trailing mean "
+                f"${flag['Reference']:,.0f} (z = {flag['Detail']:+.1f})")
+    return (f"{flag['Account']} {flag['Period']}: ${flag['Value']:,.0f} vs "
+            f"${flag['Reference']:,.0f} prior month ({flag['Detail']:+.0f}%)")
@@ -0,0 +1,397 @@
+"""
+Forecast API Server
+Lightweight JSON HTTP service that exposes the forecast model to other internal tools.
+Responses are computed from financial_calcs + DataStore, served from a content-hash
+cache with ETag support, and handled on a worker pool for concurrent clients.
+
+Usage:
+    python api_server.py --port 8502 --workers 8
+
+Endpoints (all GET, JSON):
+    /health
+    /pl?year=2026&constrained=0
+    /runway?year=2026&starting_cash=&ar=&ap=
+    /inventory?year=2026
+    /variance?year=2026
+"""
+
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Tuple
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from data_persistence import DataStore, content_hash
+from metrics import record_cache, CACHE_ENTRIES
+from financial_calcs import (
+    generate_monthly_pl,
+    calculate_inventory_balance,
+    calculate_po_payments,
+    get_dtc_demand_units,
+)
+from qbo_parser import deserialize_qbo_data, build_actuals_dataframe, actuals_to_pl_format, MONTHS
+
+VARIANCE_METRICS = ['Total Revenue', 'Total COGS', 'Gross Profit', 'Total OpEx', 'EBITDA']
+# Years /inventory accepts; it chains every year from the first, so the range is capped
+INVENTORY_FIRST_YEAR, INVENTORY_LAST_YEAR = 2026, 2035
+
+
+class BadRequest(ValueError):
+    """Raised for invalid query parameters (returned as HTTP 400)."""
+
+
+def _json_default(obj):
+    """JSON encoder fallback for numpy scalars/arrays."""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+def _int_param(params: Dict[str, str], name: str, default: int) -> int:
+    raw = params.get(name)
+    if raw is None or raw == '':
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be an integer, got {raw!r}")
+
+
+def _float_param(params: Dict[str, str], name: str, default: float) -> float:
+    raw = params.get(name)
+    if raw is None or raw == '':
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be a number, got {raw!r}")
+
+
+# ============================================================
+# MODEL COMPUTATIONS
+# ============================================================
+
+def _pl_kwargs(inputs: Dict[str, Any], year: int, constrained: bool) -> Dict[str, Any]:
+    """Build generate_monthly_pl kwargs the same way the dashboard pages do."""
+    kwargs = dict(
+        year=year,
+        team_members=inputs['team_members'],
+        opex_expenses=inputs['opex_expenses'],
+        wholesale_deals=inputs['wholesale_deals'],
+        dtc_discount_rate=0.0,
+        dtc_return_rate=0.0,
+    )
+    if constrained and inputs['po_data'] and inputs['inventory_config']:
+        kwargs['po_data'] = inputs['po_data']
+        kwargs['inventory_config'] = inputs['inventory_config']
+    return kwargs
+
+
+def compute_pl(inputs: Dict[str, Any], params: Dict[str, str]) -> Dict[str, Any]:
+    year = _int_param(params, 'year', 2026)
+    constrained = params.get('constrained', '0') in ('1', 'true', 'yes')
+    df = generate_monthly_pl(**_pl_kwargs(inputs, year, constrained))
+    return {
+        'year': year,
+        'constrained': constrained,
+        'months': df.to_dict(orient='records'),
+        'totals': df.drop(columns=['Month', 'Gross Margin %', 'EBITDA Margin %']).sum().to_dict(),
+    }
+
+
+def compute_runway(inputs: Dict[str, Any], params: Dict[str, str]) -> Dict[str, Any]:
+    from pages.cash_runway import calculate_cash_runway, calculate_fulfillment_cogs
+
+    year = _int_param(params, 'year', 2026)
+    qbo = inputs['qbo_actuals']
+    starting_cash = _float_param(params, 'starting_cash', qbo.get('latest_cash', 41422.0) if qbo else 41422.0)
+    current_ap = _float_param(params, 'ap', qbo.get('latest_ap', 8414.0) if qbo else 8414.0)
+    current_ar = _float_param(params, 'ar', 0.0)
+
+    monthly_df = generate_monthly_pl(**_pl_kwargs(inputs, year, constrained=True))
+
+    po_pay = None
+    fulfill_cogs = None
+    inv_config = inputs['inventory_config']
+    if inputs['po_data'] and inv_config:
+        po_pay = calculate_po_payments(
+            inputs['po_data'],
+            inv_config.get('lead_time_months', 4),
+            inv_config.get('payment_terms_months', 5),
+            year,
+        )
+        fulfill_cogs = calculate_fulfillment_cogs(monthly_df, inv_config)
+
+    runway_df = calculate_cash_runway(
+        starting_cash=starting_cash,
+        current_ap=current_ap,
+        current_ar=current_ar,
+        monthly_pl_df=monthly_df,
+        fundraising_rounds=inputs['fundraising_rounds'],
+        year=year,
+        po_payments=po_pay,
+        fulfillment_cogs=fulfill_cogs,
+    )
+    return {
+        'year': year,
+        'starting_cash': starting_cash,
+        'current_ap': current_ap,
+        'current_ar': current_ar,
+        'months': runway_df.to_dict(orient='records'),
+        'min_ending_cash': float(runway_df['Ending Cash'].min()),
+    }
+
+
+def compute_inventory(inputs: Dict[str, Any], params: Dict[str, str]) -> Dict[str, Any]:
+    year = _int_param(params, 'year', 2026)
+    if not INVENTORY_FIRST_YEAR <= year <= INVENTORY_LAST_YEAR:
+        raise BadRequest(
+            f"inventory is modelled for {INVENTORY_FIRST_YEAR}-{INVENTORY_LAST_YEAR}, got {year}")
+
+    config = inputs['inventory_config']
+    lead_time = config.get('lead_time_months', 4)
+    beg_inv = {
+        "Beta": config.get('beg_inv_beta', 2500),
+        "Alpha": config.get('beg_inv_alpha', 500),
+    }
+
+    # Chain ending inventory forward from 2026 to the requested year
+    prior_ending = None
+    for yr in range(INVENTORY_FIRST_YEAR, year + 1):
+        balance = calculate_inventory_balance(
+            inputs['po_data'], inputs['wholesale_deals'], lead_time, beg_inv,
+            get_dtc_demand_units(yr), yr, prior_ending=prior_ending,
+        )
+        prior_ending = {p: balance[p]["ending"][-1] for p in balance}
+
+    return {'year': year, 'months': MONTHS, 'products': balance}
+
+
+def compute_variance(inputs: Dict[str, Any], params: Dict[str, str]) -> Dict[str, Any]:
+    year = _int_param(params, 'year', 2026)
+    parsed = deserialize_qbo_data(inputs['qbo_actuals'])
+    if not parsed:
+        return {'year': year, 'closed_months': 0, 'metrics': {}}
+
+    closed = max((mo for yr, mo in parsed['months_found'] if yr == year), default=0)
+    if closed == 0:
+        return {'year': year, 'closed_months': 0, 'metrics': {}}
+
+    actual_rows = actuals_to_pl_format(build_actuals_dataframe(parsed['pl_data'], year, closed))
+    forecast_df = generate_monthly_pl(**_pl_kwargs(inputs, year, constrained=False))
+
+    metrics = {}
+    for metric in VARIANCE_METRICS:
+        monthly = []
+        for m in range(closed):
+            act = actual_rows[m].get(metric, 0.0)
+            fc = float(forecast_df[metric].iloc[m])
+            var = act - fc
+            monthly.append({
+                'Month': MONTHS[m],
+                'Actual': act,
+                'Forecast': fc,
+                'Variance $': var,
+                'Variance %': (var / fc * 100) if fc != 0 else 0,
+            })
+        ytd_act = sum(r['Actual'] for r in monthly)
+        ytd_fc = sum(r['Forecast'] for r in monthly)
+        metrics[metric] = {
+            'monthly': monthly,
+            'ytd': {
+                'Actual': ytd_act,
+                'Forecast': ytd_fc,
+                'Variance $': ytd_act - ytd_fc,
+                'Variance %': ((ytd_act - ytd_fc) / ytd_fc * 100) if ytd_fc != 0 else 0,
+            },
+        }
+    return {'year': year, 'closed_months': closed, 'metrics': metrics}
+
+
+ROUTES = {
+    '/pl': compute_pl,
+    '/runway': compute_runway,
+    '/inventory': compute_inventory,
+    '/variance': compute_variance,
+}
+
+
+# ============================================================
+# RESPONSE CACHE
+# ============================================================
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of serialized responses.
+    Keys combine the route, its query parameters and the digest of the model inputs,
+    so any saved change to the underlying data produces a new key (and a new ETag).
+    """
+
+    def __init__(self, store: DataStore, max_entries: int = 256):
+        self.store = store
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # {key: (etag, body_bytes)}
+        self._inputs = None            # (file_signature, inputs, digest)
+        self.hits = 0
+        self.misses = 0
+
+    def get_inputs(self) -> Tuple[Dict[str, Any], str]:
+        """Load model inputs, reusing the last load while the data files are unchanged."""
+        signature = self.store.get_file_signature()
+        with self._lock:
+            if self._inputs and self._inputs[0] == signature:
+                return self._inputs[1], self._inputs[2]
+        inputs = self.store.load_model_inputs()
+        digest = content_hash(inputs)
+        with self._lock:
+            self._inputs = (signature, inputs, digest)
+        return inputs, digest
+
+    def get_or_compute(self, route: str, params: Dict[str, str]) -> Tuple[str, bytes]:
+        inputs, digest = self.get_inputs()
+        key = (route, tuple(sorted(params.items())), digest)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_cache('api_response', hit=True)
+                return entry
+            self.misses += 1
+        record_cache('api_response', hit=False)
+
+        payload = ROUTES[route](inputs, params)
+        body = json.dumps(payload, default=_json_default).encode('utf-8')
+        etag = f'"{content_hash(body.decode("utf-8"))[:32]}"'
+
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            CACHE_ENTRIES.set(len(self._entries), cache='api_response')
+        return etag, body
+
+
+# ============================================================
+# HTTP SERVER
+# ============================================================
+
+class ForecastRequestHandler(BaseHTTPRequestHandler):
+    """Serves ROUTES as JSON. The server instance carries the shared ResponseCache."""
+
+    server_version = "AlmaMaterForecastAPI/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if url.path == '/health':
+            self._send_json(200, {'status': 'ok', 'routes': sorted(ROUTES)})
+            return
+        if url.path not in ROUTES:
+            self._send_json(404, {'error': f"Unknown endpoint {url.path}", 'routes': sorted(ROUTES)})
+            return
+
+        try:
+            etag, body = self.server.cache.get_or_compute(url.path, params)
+        except BadRequest as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+
+        if etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, default=_json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each accepted connection to a fixed-size worker pool."""
+
+    def __init__(self, server_address, handler_class, cache: ResponseCache,
+                 workers: int = 8, verbose: bool = False):
+        super().__init__(server_address, handler_class)
+        self.cache = cache
+        self.verbose = verbose
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='forecast-api')
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+def create_server(host: str = '127.0.0.1', port: int = 8502, data_dir: str = 'data',
+                  workers: int = 8, verbose: bool = False) -> PooledHTTPServer:
+    """Build (but do not start) the API server."""
+    cache = ResponseCache(DataStore(data_dir))
+    return PooledHTTPServer((host, port), ForecastRequestHandler, cache,
+                            workers=workers, verbose=verbose)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve forecast numbers as JSON over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--data-dir', default='data')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.data_dir, args.workers, args.verbose)
+    print(f"Forecast API listening on http://{args.host}:{args.port} ({args.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,9 @@ v2.0 - QBO Import & Variance Analysis
 import streamlit as st
 import sys
 from pathlib import Path
-from data_persistence import get_data_store
+from data_persistence import get_data_store, list_entities, DEFAULT_ENTITY
+from instrumentation import start_render, end_render
+from metrics import start_metrics_server, record_page_render
 
 # Add project root to path
 project_root = Path(__file__).parent
@@ -44,12 +46,25 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Session keys loaded from the active entity's data store
+ENTITY_DATA_KEYS = ['team_members', 'opex_expenses', 'wholesale_deals', 'assumptions',
+                    'qbo_actuals', 'fundraising_rounds', 'po_data', 'inventory_config']
+
+
+def switch_entity():
+    """Drop the previous entity's data so the next render loads the selected one"""
+    for key in ENTITY_DATA_KEYS:
+        st.session_state.pop(key, None)
+
+
 # Initialize session state
 def init_session_state():
     """Initialize session state with persistent data"""
     
-    # Get data store
-    store = get_data_store()
+    # Get data store for the active entity
+    if 'entity' not in st.session_state:
+        st.session_state.entity = DEFAULT_ENTITY
+    store = get_data_store(st.session_state.entity)
     
     # Load data from files if not in session state
     if 'team_members' not in st.session_state:
@@ -74,7 +89,7 @@ def init_session_state():
     # Load fundraising rounds
     if 'fundraising_rounds' not in st.session_state:
         fundraising = store.load_fundraising()
-        if fundraising:
+        if fundraising or not store.use_baseline:
             st.session_state.fundraising_rounds = fundraising
         else:
             from baseline_data import get_baseline_fundraising
@@ -83,7 +98,7 @@ def init_session_state():
     # Load PO data and inventory config
     if 'po_data' not in st.session_state:
         po_data = store.load_po_data()
-        if po_data:
+        if po_data or not store.use_baseline:
             st.session_state.po_data = po_data
         else:
             from baseline_data import get_baseline_po_data
@@ -107,7 +122,7 @@ def init_session_state():
 def auto_save_data():
     """Auto-save all data to persistent storage"""
     if st.session_state.get('auto_save_enabled', True):
-        store = get_data_store()
+        store = get_data_store(st.session_state.get('entity'))
         
         # Save all data
         if 'team_members' in st.session_state:
@@ -131,6 +146,9 @@ def auto_save_data():
 def main():
     """Main app"""
     
+    trace = start_render("app")
+    start_metrics_server()
+
     # Initialize
     init_session_state()
     
@@ -138,6 +156,12 @@ def main():
     with st.sidebar:
         st.markdown("### Alma Mater Inc.")
         st.markdown("Financial Dashboard")
+        entities = list_entities()
+        if st.session_state.entity not in entities:
+            st.session_state.entity = DEFAULT_ENTITY
+        if len(entities) > 1:
+            st.selectbox("Entity", entities, key="entity", on_change=switch_entity)
+        show_data_issues()
         st.divider()
         
         # Navigation
@@ -155,6 +179,7 @@ def main():
                 "OpEx Tracker",
                 "Wholesale Tracker",
                 "Inventory Tracker",
+                "Consolidation",
                 "Export to PDF"
             ],
             label_visibility="collapsed"
@@ -188,7 +213,13 @@ def main():
         else:
             st.metric("Current Cash", "$41K")
         st.metric("Cash Runway", "~2-3 months")
+
+        st.divider()
+        st.checkbox("Show render timings", key="show_render_timings",
+                    help="Debug panel with per-render timing of model, I/O and chart spans")
     
+    trace.page = page
+
     # Main content - route to appropriate page
     if page == "Management Dashboard":
         from pages import management_dashboard
@@ -220,6 +251,9 @@ def main():
     elif page == "Inventory Tracker":
         from pages import inventory_tracker
         inventory_tracker.show()
+    elif page == "Consolidation":
+        from pages import consolidation
+        consolidation.show()
     elif page == "Export to PDF":
         from pages import export_pdf
         export_pdf.show()
@@ -227,5 +261,47 @@ def main():
     # Auto-save after page render
     auto_save_data()
 
+    trace = end_render()
+    record_page_render(page, trace.duration_ms / 1000)
+    if st.session_state.get('show_render_timings'):
+        show_render_timings(trace)
+
+
+def show_data_issues():
+    """Sidebar expander listing values rejected when the entity's data was loaded."""
+    errors = get_data_store(st.session_state.entity).validation_errors
+    count = sum(len(e) for e in errors.values())
+    if not count:
+        return
+    from record_schema import error_frame
+
+    with st.expander(f"Data Issues ({count})"):
+        st.caption("These values could not be read. They are kept as entered and left blank in the model.")
+        st.dataframe(error_frame(errors), use_container_width=True, hide_index=True)
+
+
+def show_render_timings(trace):
+    """Sidebar debug panel: aggregated spans for this render plus a JSON trace download."""
+    import pandas as pd
+
+    with st.sidebar:
+        with st.expander(f"Render Timings ({trace.duration_ms:,.0f} ms)", expanded=True):
+            st.caption(f"Page: **{trace.page}** | {len(trace.spans)} spans")
+            summary = trace.summary()
+            if summary:
+                df = pd.DataFrame(summary)
+                st.dataframe(
+                    df.style.format({'Total (ms)': "{:,.1f}", 'Max (ms)': "{:,.1f}"}),
+                    use_container_width=True, hide_index=True,
+                )
+            else:
+                st.caption("No instrumented spans ran on this render.")
+            st.download_button(
+                "Download Trace (JSON)",
+                data=trace.to_json(),
+                file_name=f"render_trace_{trace.page.lower().replace(' ', '_')}.json",
+                mime="application/json",
+            )
+
 if __name__ == "__main__":
     main()
@@ -391,6 +391,13 @@ BASELINE_INVENTORY_CONFIG = {
 }
 
 
+# Opening cash position used when no QBO balance sheet has been imported
+BASELINE_CASH_POSITION = {
+    "cash": 41422.0,
+    "ap": 8414.0,
+}
+
+
 def get_baseline_po_data():
     """Get baseline purchase orders"""
     return [d.copy() for d in BASELINE_PO_DATA]
@@ -401,6 +408,11 @@ def get_baseline_inventory_config():
     return BASELINE_INVENTORY_CONFIG.copy()
 
 
+def get_baseline_cash_position():
+    """Get baseline opening cash and AP"""
+    return BASELINE_CASH_POSITION.copy()
+
+
 def get_baseline_team():
     """Get baseline team members"""
     return [m.copy() for m in BASELINE_TEAM]
@@ -0,0 +1,327 @@
+"""
+Benchmark Suite
+Times every financial_calcs function on synthetic team rosters, OpEx lists, wholesale
+deals and POs at increasing record counts, saves the results as JSON and compares two
+runs to flag regressions.
+
+    python benchmark_calcs.py --scales 10,1k,100k --output bench.json
+    python benchmark_calcs.py --scales 10,1k,100k --compare bench.json
+    python benchmark_calcs.py --input new.json --compare old.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import financial_calcs as fc
+import model_cache
+from baseline_data import get_baseline_inventory_config
+
+DEFAULT_SCALES = '10,1k,100k,1M'
+OPEX_FREQUENCIES = ['Custom Monthly', 'Monthly', 'Quarterly', 'Annual', 'One-Time']
+PRODUCTS = ['Beta', 'Alpha']
+YEAR = 2026
+
+
+def parse_scale(text: str) -> int:
+    """'10' -> 10, '1k' -> 1000, '1M' -> 1000000"""
+    text = text.strip()
+    multiplier = {'k': 1_000, 'K': 1_000, 'm': 1_000_000, 'M': 1_000_000}.get(text[-1:], 1)
+    number = text[:-1] if multiplier > 1 else text
+    return int(float(number) * multiplier)
+
+
+def format_scale(n: int) -> str:
+    if n >= 1_000_000 and n % 1_000_000 == 0:
+        return f"{n // 1_000_000}M"
+    if n >= 1_000 and n % 1_000 == 0:
+        return f"{n // 1_000}k"
+    return str(n)
+
+
+# ============================================================
+# SYNTHETIC DATA GENERATORS
+# ============================================================
+
+# Date strings are drawn from small pools so 1M-record lists stay within memory
+_MONTH_STARTS = [f"{y}-{m:02d}-01" for y in (2025, 2026, 2027) for m in range(1, 13)]
+_MID_MONTHS = [f"{y}-{m:02d}-15" for y in (2026, 2027) for m in range(1, 13)]
+
+
+def generate_team(n: int, seed: int = 0) -> List[Dict]:
+    """Team roster: mix of W2 and 1099, staggered starts, ~10% terminated."""
+    rng = random.Random(seed)
+    team = []
+    for i in range(n):
+        start = rng.randrange(12, 30)
+        member = {
+            'first_name': f"First{i}",
+            'last_name': f"Last{i}",
+            'employment_type': 'Contractor (1099)' if rng.random() < 0.2 else 'Full-Time Employee (FTE)',
+            'annual_salary': float(rng.randrange(40_000, 220_000, 1_000)),
+            'start_date': _MONTH_STARTS[start],
+            'termination_date': None,
+        }
+        if rng.random() < 0.1:
+            member['termination_date'] = _MONTH_STARTS[min(start + rng.randrange(1, 12), 35)]
+        team.append(member)
+    return team
+
+
+def generate_opex(n: int, seed: int = 1) -> List[Dict]:
+    """OpEx list cycling through every frequency, including Custom Monthly values."""
+    rng = random.Random(seed)
+    expenses = []
+    for i in range(n):
+        frequency = OPEX_FREQUENCIES[i % len(OPEX_FREQUENCIES)]
+        monthly = float(rng.randrange(50, 20_000))
+        expense = {
+            'expense_name': f"Expense {i}",
+            'frequency': frequency,
+            'monthly_amount': monthly,
+            'annual_cost': monthly * 12,
+            'start_date': _MONTH_STARTS[rng.randrange(12, 30)],
+            'end_date': _MONTH_STARTS[rng.randrange(24, 36)] if rng.random() < 0.2 else None,
+        }
+        if frequency == 'Custom Monthly':
+            expense['monthly_values'] = [float(rng.randrange(0, 5_000)) for _ in range(12)]
+        expenses.append(expense)
+    return expenses
+
+
+def generate_deals(n: int, seed: int = 2) -> List[Dict]:
+    """Wholesale deals across 2026-2027; about half carry a client-provided total cost."""
+    rng = random.Random(seed)
+    deals = []
+    for i in range(n):
+        pairs = rng.randrange(10, 2_000)
+        price = float(rng.randrange(90, 200))
+        deal = {
+            'customer_name': f"Customer {i}",
+            'product_type': PRODUCTS[i % 2],
+            'num_pairs': pairs,
+            'wholesale_price': price,
+            'close_date': _MONTH_STARTS[rng.randrange(12, 36)],
+            'delivery_date': _MID_MONTHS[rng.randrange(0, 24)],
+        }
+        if rng.random() < 0.5:
+            deal['total_cost'] = round(pairs * price * 0.4, 2)
+        deals.append(deal)
+    return deals
+
+
+def generate_pos(n: int, seed: int = 3) -> List[Dict]:
+    """Purchase orders placed across 2026-2027."""
+    rng = random.Random(seed)
+    pos = []
+    for i in range(n):
+        pairs = rng.randrange(100, 5_000)
+        pos.append({
+            'name': f"PO {i}",
+            'product': PRODUCTS[i % 2],
+            'pairs': pairs,
+            'amount': pairs * 45.0,
+            'order_month': rng.randrange(1, 13),
+            'order_year': rng.choice((2026, 2027)),
+        })
+    return pos
+
+
+def generate_dataset(n: int, seed: int = 0) -> Dict[str, List[Dict]]:
+    return {
+        'team_members': generate_team(n, seed),
+        'opex_expenses': generate_opex(n, seed + 1),
+        'wholesale_deals': generate_deals(n, seed + 2),
+        'po_data': generate_pos(n, seed + 3),
+    }
+
+
+# ============================================================
+# BENCHMARK CASES
+# ============================================================
+
+def build_cases(data: Dict[str, List[Dict]], year: int = YEAR) -> Dict[str, Callable[[], object]]:
+    """Zero-argument callables, one per financial_calcs function."""
+    config = get_baseline_inventory_config()
+    lead_time = config['lead_time_months']
+    beg_inv = {'Beta': config['beg_inv_beta'], 'Alpha': config['beg_inv_alpha']}
+    demand = fc.get_dtc_demand_units(year)
+    balance = fc.calculate_inventory_balance(
+        data['po_data'], data['wholesale_deals'], lead_time, beg_inv, demand, year)
+
+    return {
+        'calculate_team_costs_monthly': lambda: fc.calculate_team_costs_monthly(data['team_members'], year),
+        'calculate_opex_monthly': lambda: fc.calculate_opex_monthly(data['opex_expenses'], year),
+        'calculate_wholesale_revenue_monthly': lambda: fc.calculate_wholesale_revenue_monthly(data['wholesale_deals'], year),
+        'calculate_dtc_revenue_monthly': lambda: fc.calculate_dtc_revenue_monthly(year, 0.1, 0.2),
+        'get_cogs_breakdown': lambda: fc.get_cogs_breakdown(100_000.0, year),
+        'get_dtc_demand_units': lambda: fc.get_dtc_demand_units(year),
+        'calculate_po_arrivals': lambda: fc.calculate_po_arrivals(data['po_data'], lead_time, year),
+        'calculate_ws_shipments': lambda: fc.calculate_ws_shipments(data['wholesale_deals'], year),
+        'calculate_inventory_balance': lambda: fc.calculate_inventory_balance(
+            data['po_data'], data['wholesale_deals'], lead_time, beg_inv, demand, year),
+        'calculate_constrained_dtc_revenue': lambda: fc.calculate_constrained_dtc_revenue(balance),
+        'calculate_po_payments': lambda: fc.calculate_po_payments(
+            data['po_data'], lead_time, config['payment_terms_months'], year),
+        'generate_monthly_pl': lambda: fc.generate_monthly_pl(
+            year, data['team_members'], data['opex_expenses'], data['wholesale_deals'],
+            po_data=data['po_data'], inventory_config=config),
+    }
+
+
+def time_case(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """
+    Run fn `repeat` times with GC paused; return min/median/max seconds.
+    Every model cache is cleared before each run, so the times are cold
+    computations rather than cache hits left by an earlier case or run.
+    """
+    times = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            model_cache.clear_all()
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'max_s': max(times),
+        'runs': len(times),
+    }
+
+
+def run_benchmarks(scales: List[int], repeat: int = 3, only: List[str] = None,
+                   seed: int = 0, verbose: bool = True) -> Dict:
+    results = {}
+    for n in scales:
+        label = format_scale(n)
+        t0 = time.perf_counter()
+        data = generate_dataset(n, seed)
+        if verbose:
+            print(f"[{label}] generated {4 * n:,} records in {time.perf_counter() - t0:.1f}s")
+
+        # Large scales take seconds per call; one run is enough to see the trend
+        runs = repeat if n < 100_000 else 1
+        results[label] = {}
+        for name, fn in build_cases(data).items():
+            if only and name not in only:
+                continue
+            stats = time_case(fn, runs)
+            stats['records'] = n
+            results[label][name] = stats
+            if verbose:
+                print(f"[{label}] {name:<38} {stats['median_s'] * 1000:>12.3f} ms")
+        del data
+        gc.collect()
+
+    return {
+        'created_at': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'seed': seed,
+        'results': results,
+    }
+
+
+# ============================================================
+# COMPARISON
+# ============================================================
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.10,
+                    min_seconds: float = 0.001) -> List[Dict]:
+    """
+    Compare median times of matching (scale, function) pairs.
+    A case regresses when it is more than `threshold` slower than the baseline;
+    cases under `min_seconds` in both runs are timer noise and never flagged.
+    """
+    rows = []
+    for scale, funcs in current.get('results', {}).items():
+        base_funcs = baseline.get('results', {}).get(scale, {})
+        for name, stats in funcs.items():
+            if name not in base_funcs:
+                continue
+            old = base_funcs[name]['median_s']
+            new = stats['median_s']
+            change = (new - old) / old if old > 0 else 0.0
+            noisy = max(old, new) < min_seconds
+            if change > threshold and not noisy:
+                status = 'REGRESSION'
+            elif change < -threshold and not noisy:
+                status = 'faster'
+            else:
+                status = 'ok'
+            rows.append({
+                'scale': scale, 'function': name,
+                'baseline_s': old, 'current_s': new,
+                'change_pct': change * 100, 'status': status,
+            })
+    return rows
+
+
+def print_comparison(rows: List[Dict]):
+    print(f"\n{'Scale':>6}  {'Function':<38} {'Baseline ms':>12} {'Current ms':>12} {'Change':>8}  Status")
+    for r in rows:
+        print(f"{r['scale']:>6}  {r['function']:<38} {r['baseline_s'] * 1000:>12.3f} "
+              f"{r['current_s'] * 1000:>12.3f} {r['change_pct']:>+7.1f}%  {r['status']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark financial_calcs on synthetic data")
+    parser.add_argument('--scales', default=DEFAULT_SCALES,
+                        help="Comma-separated record counts, e.g. 10,1k,100k,1M")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case below 100k records")
+    parser.add_argument('--only', default='', help="Comma-separated function names to run")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json', help="Where to save this run")
+    parser.add_argument('--input', help="Compare a saved run instead of running benchmarks")
+    parser.add_argument('--compare', help="Baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative slowdown that counts as a regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    # Read the baseline before this run can overwrite it
+    baseline = None
+    if args.compare:
+        if not args.input and os.path.realpath(args.compare) == os.path.realpath(args.output):
+            parser.error("--compare and --output are the same file; the run would be compared "
+                         "with itself. Save the baseline under another name or pass --output.")
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    if args.input:
+        with open(args.input) as f:
+            current = json.load(f)
+    else:
+        scales = [parse_scale(s) for s in args.scales.split(',') if s.strip()]
+        only = [s.strip() for s in args.only.split(',') if s.strip()]
+        current = run_benchmarks(scales, args.repeat, only, args.seed)
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if baseline is not None:
+        rows = compare_results(baseline, current, args.threshold)
+        print_comparison(rows)
+        regressions = [r for r in rows if r['status'] == 'REGRESSION']
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
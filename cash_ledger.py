@@ -0,0 +1,335 @@
+"""
+Cash Ledger Module
+Daily cash ledger for the rolling 13-week treasury forecast.
+
+Every cash event (payroll runs, OpEx due dates, PO payments, wholesale collections,
+DTC receipts, fundraising) is placed on a NumPy datetime64[D] day axis and summed
+into a (category x day) matrix with np.bincount. Weekly and monthly views come from
+np.add.reduceat over that matrix, so a multi-year horizon costs a handful of vector
+operations rather than a Python loop over days. The monthly calculators in
+financial_calcs stay the source of truth for amounts; this module only decides on
+which day each amount moves cash.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import inventory_engine
+import record_schema
+import wholesale_pipeline
+from financial_calcs import (
+    generate_monthly_pl,
+    calculate_inventory_balance,
+    get_dtc_demand_units,
+)
+
+# Ledger rows in display order. Inflows are positive, outflows negative.
+LEDGER_CATEGORIES = (
+    'DTC Receipts',
+    'Wholesale Collections',
+    'Funding',
+    'Opening AR/AP',
+    'Payroll',
+    'OpEx',
+    'PO Payments',
+    'DTC COGS',
+    'Wholesale COGS',
+)
+
+PAYROLL_DAYS = (15, 31)   # semi-monthly runs; 31 means the last day of the month
+DEFAULT_OPEX_DUE_DAY = 1
+DEFAULT_WS_COGS_DAY = 15
+DEFAULT_WS_TERMS_DAYS = 30
+DEFAULT_SETTLE_DAYS = 30
+FORECAST_WEEKS = 13
+
+Events = Tuple[np.ndarray, np.ndarray]  # (datetime64[D] dates, amounts)
+
+
+def to_day(value) -> np.datetime64:
+    """date / 'YYYY-MM-DD' / datetime64 -> datetime64[D]."""
+    return np.datetime64(value, 'D')
+
+
+# ============================================================
+# DAY PLACEMENT
+# ============================================================
+
+def month_axis(first_year: int, n_months: int) -> np.ndarray:
+    """datetime64[M] for each month from January of first_year."""
+    return np.datetime64(f'{first_year}-01', 'M') + np.arange(n_months)
+
+
+def days_in_month(months: np.ndarray) -> np.ndarray:
+    return ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+
+
+def on_day_of_month(months: np.ndarray, day: int) -> np.ndarray:
+    """Date of `day` in each month, clipped to the month's last day (31 -> month end)."""
+    first = months.astype('datetime64[D]')
+    return first + np.minimum(day, days_in_month(months)) - 1
+
+
+def place_monthly(months: np.ndarray, amounts: np.ndarray, day: int) -> Events:
+    """Each month's amount lands on one day of that month."""
+    return on_day_of_month(months, day), np.asarray(amounts, dtype=float)
+
+
+def split_monthly(months: np.ndarray, amounts: np.ndarray, days: Tuple[int, ...]) -> Events:
+    """Each month's amount is split evenly across several days (e.g. payroll runs)."""
+    amounts = np.asarray(amounts, dtype=float) / len(days)
+    dates = np.concatenate([on_day_of_month(months, d) for d in days])
+    return dates, np.tile(amounts, len(days))
+
+
+def spread_monthly(months: np.ndarray, amounts: np.ndarray) -> Events:
+    """Each month's amount is spread evenly over its calendar days (daily sales)."""
+    first_day = months[0].astype('datetime64[D]')
+    last_day = (months[-1] + 1).astype('datetime64[D]')
+    dates = np.arange(first_day, last_day, dtype='datetime64[D]')
+    idx = (dates.astype('datetime64[M]') - months[0]).astype(np.int64)
+    per_day = np.asarray(amounts, dtype=float) / days_in_month(months)
+    return dates, per_day[idx]
+
+
+def spread_days(start: np.datetime64, n_days: int, amount: float) -> Events:
+    """`amount` spread evenly over the n_days from start."""
+    n_days = max(int(n_days), 1)
+    return start + np.arange(n_days), np.full(n_days, amount / n_days)
+
+
+# ============================================================
+# EVENT SOURCES
+# ============================================================
+
+def wholesale_collection_events(wholesale_deals: List[Dict], terms_days: int = DEFAULT_WS_TERMS_DAYS) -> Events:
+    """Each deal's invoice (pairs x wholesale price) is collected terms_days after delivery."""
+    cols = record_schema.columns('wholesale_deals', wholesale_deals)
+    dates = wholesale_pipeline.delivery_dates(cols)
+    amounts = record_schema.filled(cols['num_pairs'], 0) * record_schema.filled(cols['wholesale_price'], 0)
+    keep = ~np.isnat(dates)
+    return dates[keep] + int(terms_days), amounts[keep]
+
+
+def po_payment_events(po_data: List[Dict], lead_time: int, payment_terms: int) -> Events:
+    """
+    PO amounts paid on the first day of order_month + lead_time + payment_terms,
+    the same month calculate_po_payments assigns.
+    """
+    cols = record_schema.columns('po_data', po_data)
+    amounts = record_schema.filled(cols['amount'], 0)
+    order = inventory_engine.order_months(cols)
+    keep = (amounts > 0) & (order != inventory_engine.NO_MONTH)
+    months = np.datetime64('2026-01', 'M') + (order[keep] + lead_time + payment_terms - 1)
+    return months.astype('datetime64[D]'), amounts[keep]
+
+
+def funding_events(fundraising_rounds: List[Dict]) -> Events:
+    """Each round lands on the first day of its month."""
+    cols = record_schema.columns('fundraising_rounds', fundraising_rounds or [])
+    month = record_schema.filled(cols['month'], 0)
+    amounts = record_schema.filled(cols['amount'], 0)
+    keep = (month >= 1) & (month <= 12) & ~np.isnan(cols['year']) & (amounts > 0)
+    months = np.datetime64('1970-01', 'M') + (
+        (cols['year'][keep] - 1970) * 12 + month[keep] - 1).astype(np.int64)
+    return months.astype('datetime64[D]'), amounts[keep]
+
+
+def monthly_model(
+    years: List[int],
+    team_members: List[Dict],
+    opex_expenses: List[Dict],
+    wholesale_deals: List[Dict],
+    po_data: List[Dict] = None,
+    inventory_config: Dict = None,
+    dtc_discount_rate: float = 0.0,
+    dtc_return_rate: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Monthly P&L for consecutive years stacked into one frame. In inventory mode the
+    ending stock of each year opens the next, and Fulfillment COGS is added.
+    """
+    use_inventory = bool(po_data) and bool(inventory_config)
+    frames = []
+    prior_end = None
+    for year in years:
+        kwargs = {}
+        if use_inventory:
+            kwargs = dict(po_data=po_data, inventory_config=inventory_config,
+                          prior_ending_inv=prior_end)
+        pl = generate_monthly_pl(year, team_members, opex_expenses, wholesale_deals,
+                                 dtc_discount_rate, dtc_return_rate, **kwargs)
+        if use_inventory:
+            fulfillment_rate = (inventory_config.get('cogs_total_rate', 0.40)
+                                - inventory_config.get('cogs_product_pct', 0.25))
+            pl['Fulfillment COGS'] = pl['DTC Gross Revenue'] * fulfillment_rate
+            beg_inv = {
+                "Beta": inventory_config.get('beg_inv_beta', 0),
+                "Alpha": inventory_config.get('beg_inv_alpha', 0),
+            }
+            balance = calculate_inventory_balance(
+                po_data, wholesale_deals, inventory_config.get('lead_time_months', 4),
+                beg_inv, get_dtc_demand_units(year), year, prior_ending=prior_end,
+            )
+            prior_end = {p: balance[p]['ending'][-1] for p in balance}
+        pl['Year'] = year
+        frames.append(pl)
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_cash_events(
+    years: List[int],
+    team_members: List[Dict],
+    opex_expenses: List[Dict],
+    wholesale_deals: List[Dict],
+    fundraising_rounds: List[Dict] = None,
+    po_data: List[Dict] = None,
+    inventory_config: Dict = None,
+    ws_terms_days: int = DEFAULT_WS_TERMS_DAYS,
+    opex_due_day: int = DEFAULT_OPEX_DUE_DAY,
+    dtc_discount_rate: float = 0.0,
+    dtc_return_rate: float = 0.0,
+) -> Dict[str, Events]:
+    """
+    Dated cash events for every ledger category over `years`, signed (+ in, - out).
+
+    With PO data, product cost is paid through PO payments and DTC COGS is only the
+    fulfillment share, matching the inventory split of calculate_cash_runway.
+    """
+    pl = monthly_model(years, team_members, opex_expenses, wholesale_deals,
+                       po_data, inventory_config, dtc_discount_rate, dtc_return_rate)
+    months = month_axis(years[0], len(pl))
+    use_inventory = 'Fulfillment COGS' in pl.columns
+
+    events = {
+        'DTC Receipts': spread_monthly(months, pl['DTC Revenue'].to_numpy()),
+        'Wholesale Collections': wholesale_collection_events(wholesale_deals, ws_terms_days),
+        'Funding': funding_events(fundraising_rounds),
+        'Payroll': split_monthly(months, -pl['Team Costs'].to_numpy(), PAYROLL_DAYS),
+        'OpEx': place_monthly(months, -pl['Other OpEx'].to_numpy(), opex_due_day),
+        'DTC COGS': spread_monthly(
+            months, -pl['Fulfillment COGS' if use_inventory else 'DTC COGS'].to_numpy()),
+        'Wholesale COGS': place_monthly(months, -pl['Wholesale COGS'].to_numpy(), DEFAULT_WS_COGS_DAY),
+    }
+    if use_inventory:
+        dates, amounts = po_payment_events(
+            po_data,
+            inventory_config.get('lead_time_months', 4),
+            inventory_config.get('payment_terms_months', 5),
+        )
+        events['PO Payments'] = (dates, -amounts)
+    return events
+
+
+# ============================================================
+# LEDGER & AGGREGATION
+# ============================================================
+
+def build_ledger(events: Dict[str, Events], start, n_days: int, opening_cash: float) -> Dict:
+    """
+    Sum dated events into a (category x day) matrix for the n_days from start.
+    Events before start are treated as already reflected in opening_cash.
+
+    Returns: {"start", "days", "categories", "flows", "net", "balance", "opening_cash"}
+    """
+    start = to_day(start)
+    categories = [c for c in LEDGER_CATEGORIES if c in events]
+    categories += [c for c in events if c not in categories]
+    flows = np.zeros((len(categories), n_days))
+    for i, cat in enumerate(categories):
+        dates, amounts = events[cat]
+        offset = (np.asarray(dates, dtype='datetime64[D]') - start).astype(np.int64)
+        keep = (offset >= 0) & (offset < n_days)
+        flows[i] = np.bincount(offset[keep], weights=np.asarray(amounts, dtype=float)[keep],
+                               minlength=n_days)
+    net = flows.sum(axis=0)
+    return {
+        'start': start,
+        'days': start + np.arange(n_days),
+        'categories': categories,
+        'flows': flows,
+        'net': net,
+        'balance': opening_cash + np.cumsum(net),
+        'opening_cash': opening_cash,
+    }
+
+
+def bucket_starts(ledger: Dict, freq: str = 'W') -> np.ndarray:
+    """Index of the first day of each bucket: 7-day weeks from the start, or calendar months."""
+    n_days = len(ledger['days'])
+    if freq == 'W':
+        return np.arange(0, n_days, 7)
+    if freq == 'M':
+        months = ledger['days'].astype('datetime64[M]')
+        return np.flatnonzero(np.concatenate([[True], months[1:] != months[:-1]]))
+    raise ValueError(f"Unknown frequency {freq!r}; use 'W' or 'M'")
+
+
+def aggregate_ledger(ledger: Dict, freq: str = 'W') -> pd.DataFrame:
+    """
+    Ledger summed into weekly ('W') or monthly ('M') buckets: one column per
+    category, then Net Cash Flow, Ending Cash and the lowest daily balance.
+    """
+    starts = bucket_starts(ledger, freq)
+    ends = np.append(starts[1:], len(ledger['days'])) - 1
+    days = ledger['days']
+
+    sums = np.add.reduceat(ledger['flows'], starts, axis=1)
+    if freq == 'W':
+        labels = [f"Wk {i + 1}" for i in range(len(starts))]
+    else:
+        labels = [str(m) for m in days[starts].astype('datetime64[M]')]
+
+    df = pd.DataFrame({
+        'Period': labels,
+        'Start': days[starts].astype('datetime64[ns]'),
+        'End': days[ends].astype('datetime64[ns]'),
+    })
+    for i, cat in enumerate(ledger['categories']):
+        df[cat] = sums[i]
+    df['Net Cash Flow'] = np.add.reduceat(ledger['net'], starts)
+    df['Ending Cash'] = ledger['balance'][ends]
+    df['Lowest Daily Cash'] = np.minimum.reduceat(ledger['balance'], starts)
+    return df
+
+
+def first_negative_day(ledger: Dict):
+    """First date the daily balance drops below zero, or None."""
+    below = np.flatnonzero(ledger['balance'] < 0)
+    return ledger['days'][below[0]].astype(object) if len(below) else None
+
+
+def build_13_week_forecast(
+    start,
+    starting_cash: float,
+    team_members: List[Dict],
+    opex_expenses: List[Dict],
+    wholesale_deals: List[Dict],
+    fundraising_rounds: List[Dict] = None,
+    po_data: List[Dict] = None,
+    inventory_config: Dict = None,
+    current_ar: float = 0.0,
+    current_ap: float = 0.0,
+    ws_terms_days: int = DEFAULT_WS_TERMS_DAYS,
+    settle_days: int = DEFAULT_SETTLE_DAYS,
+    weeks: int = FORECAST_WEEKS,
+) -> Dict:
+    """
+    Daily ledger for `weeks` weeks from start. Open AR is collected and open AP paid
+    evenly over the first settle_days. Deliveries shipped up to ws_terms_days before
+    start still produce collections inside the window.
+    """
+    start = to_day(start)
+    n_days = 7 * weeks
+    first_year = start.astype(object).year
+    last_year = (start + n_days).astype(object).year
+    # Model from 2026 so inventory carries over from the configured beginning stock
+    years = list(range(min(first_year, 2026), last_year + 1))
+
+    events = build_cash_events(years, team_members, opex_expenses, wholesale_deals,
+                               fundraising_rounds, po_data, inventory_config, ws_terms_days)
+    if current_ar or current_ap:
+        events['Opening AR/AP'] = spread_days(start, settle_days, current_ar - current_ap)
+    return build_ledger(events, start, n_days, starting_cash)
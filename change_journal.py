@@ -0,0 +1,278 @@
+"""
+Change Journal
+Append-only history of everything DataStore saves, with time travel.
+
+Each save appends one line per changed stream to the active journal segment: the
+field-level deltas of every record that was added, changed or removed, keyed by the
+record's stable id (team_member_id, expense_id, ...). Unchanged saves write
+nothing, so journaling on every auto-save costs one in-memory comparison against
+the current head state.
+
+Every CHECKPOINT_EVERY entries the head state is written as a checkpoint and a new
+segment starts. Any past state is the latest checkpoint at or before that time plus
+a replay of at most one segment. Only MAX_SEGMENTS checkpoint/segment pairs are
+kept; older ones are dropped, which bounds the journal's size.
+
+Layout under the data directory:
+  journal/checkpoint_<seq>.json   state after entry <seq>
+  journal/segment_<seq>.jsonl     entries <seq>+1 ... up to the next checkpoint
+"""
+
+import glob
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from data_persistence import team_member_id, expense_id, deal_id
+
+JOURNAL_DIR = "journal"
+CHECKPOINT_EVERY = 200
+MAX_SEGMENTS = 10
+
+# stream -> record id function; None marks a stream that is one dict (a single record)
+STREAMS = {
+    'team_members': team_member_id,
+    'opex_expenses': expense_id,
+    'wholesale_deals': deal_id,
+    'fundraising_rounds': lambda r: r.get('name', ''),
+    'po_data': lambda r: r.get('name', ''),
+    'assumptions': None,
+    'qbo_actuals': None,
+}
+SINGLE_RECORD = ''
+
+
+def _keyed(stream: str, records: Any) -> Dict[str, Dict]:
+    """{record id: record} for a stream's saved value (ids repeat as id#2, id#3, ...)."""
+    if STREAMS[stream] is None:
+        return {SINGLE_RECORD: records} if records else {}
+    keyed, seen = {}, {}
+    for record in records or []:
+        rid = STREAMS[stream](record)
+        seen[rid] = seen.get(rid, 0) + 1
+        keyed[rid if seen[rid] == 1 else f"{rid}#{seen[rid]}"] = record
+    return keyed
+
+
+def _normalized(stream: str, records: Any) -> Dict[str, Dict]:
+    """_keyed() in the JSON form the journal replays (tuples -> lists, etc.)."""
+    return json.loads(json.dumps(_keyed(stream, records), default=str))
+
+
+def _unkeyed(stream: str, keyed: Dict[str, Dict]) -> Any:
+    if STREAMS[stream] is None:
+        return keyed.get(SINGLE_RECORD, {})
+    return list(keyed.values())
+
+
+def diff_records(old: Dict[str, Dict], new: Dict[str, Dict]) -> Dict[str, Optional[Dict]]:
+    """
+    Field-level delta from old to new keyed records:
+    {id: None (removed) | {"set": {field: value}, "unset": [fields]}}, with
+    "added": True on records that are new.
+    """
+    changes = {}
+    for rid, record in new.items():
+        before = old.get(rid)
+        if before == record:
+            continue
+        if before is None:
+            changes[rid] = {'set': record, 'unset': [], 'added': True}
+            continue
+        changes[rid] = {
+            'set': {f: v for f, v in record.items() if before.get(f, object()) != v},
+            'unset': [f for f in before if f not in record],
+        }
+    for rid in old:
+        if rid not in new:
+            changes[rid] = None
+    return changes
+
+
+def apply_changes(keyed: Dict[str, Dict], changes: Dict[str, Optional[Dict]]):
+    """Replay one entry's deltas onto keyed records, in place."""
+    for rid, change in changes.items():
+        if change is None:
+            keyed.pop(rid, None)
+            continue
+        record = {} if change.get('added') else dict(keyed.get(rid, {}))
+        record.update(change['set'])
+        for field in change['unset']:
+            record.pop(field, None)
+        keyed[rid] = record
+
+
+class ChangeJournal:
+    """
+    Journal for one data directory. Use get_journal() to share it between stores.
+
+    seed returns {stream: saved value} for the data already on disk; it becomes
+    checkpoint 0 when the journal is first created, so history starts from the
+    existing records instead of an empty state.
+    """
+
+    def __init__(self, data_dir: str = "data", checkpoint_every: int = CHECKPOINT_EVERY,
+                 max_segments: int = MAX_SEGMENTS, seed: Callable[[], Dict[str, Any]] = None):
+        self.root = os.path.join(data_dir, JOURNAL_DIR)
+        self.checkpoint_every = checkpoint_every
+        self.max_segments = max_segments
+        self.seed = seed
+        self._lock = threading.Lock()
+        self._head = None          # {stream: keyed records}, loaded on first use
+        self._seq = 0
+        self._segment = 0          # checkpoint seq the active segment follows
+        self._segment_entries = 0
+
+    # Files
+    def _checkpoint_file(self, seq: int) -> str:
+        return os.path.join(self.root, f"checkpoint_{seq:08d}.json")
+
+    def _segment_file(self, seq: int) -> str:
+        return os.path.join(self.root, f"segment_{seq:08d}.jsonl")
+
+    def checkpoints(self) -> List[int]:
+        """Sequence numbers of the retained checkpoints, oldest first."""
+        files = glob.glob(os.path.join(self.root, "checkpoint_*.json"))
+        return sorted(int(os.path.basename(f)[11:-5]) for f in files)
+
+    def _read_checkpoint(self, seq: int) -> Dict:
+        with open(self._checkpoint_file(seq), 'r') as f:
+            return json.load(f)
+
+    def _read_segment(self, seq: int) -> List[Dict]:
+        if not os.path.exists(self._segment_file(seq)):
+            return []
+        with open(self._segment_file(seq), 'r') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _write_checkpoint(self, seq: int, timestamp: str):
+        with open(self._checkpoint_file(seq), 'w') as f:
+            json.dump({'seq': seq, 'timestamp': timestamp, 'state': self._head}, f,
+                      separators=(',', ':'))
+
+    def _load_head(self):
+        """Head state: latest checkpoint plus its segment (checkpoint 0 from the seed on first use)."""
+        if self._head is not None:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        seqs = self.checkpoints()
+        if not seqs:
+            initial = self.seed() if self.seed else {}
+            self._head = {stream: _normalized(stream, value) for stream, value in initial.items()}
+            self._write_checkpoint(0, datetime.now().isoformat())
+            seqs = [0]
+        checkpoint = self._read_checkpoint(seqs[-1])
+        self._head = checkpoint['state']
+        self._seq = self._segment = checkpoint['seq']
+        entries = self._read_segment(self._segment)
+        for entry in entries:
+            apply_changes(self._head.setdefault(entry['stream'], {}), entry['changes'])
+            self._seq = entry['seq']
+        self._segment_entries = len(entries)
+
+    # Writing
+    def record(self, stream: str, records: Any) -> Optional[Dict]:
+        """
+        Journal the saved value of one stream. Returns the appended entry, or None
+        when nothing changed since the last save.
+        """
+        new = _normalized(stream, records)
+        with self._lock:
+            self._load_head()
+            old = self._head.get(stream, {})
+            if old == new:
+                return None
+            self._seq += 1
+            entry = {'seq': self._seq, 'timestamp': datetime.now().isoformat(),
+                     'stream': stream, 'changes': diff_records(old, new)}
+            with open(self._segment_file(self._segment), 'a') as f:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            self._head[stream] = new
+            self._segment_entries += 1
+            if self._segment_entries >= self.checkpoint_every:
+                self._compact(entry['timestamp'])
+            return entry
+
+    def record_cleared(self):
+        """Journal every stream as emptied (DataStore.clear_all_data)."""
+        for stream in STREAMS:
+            self.record(stream, None)
+
+    def _compact(self, timestamp: str):
+        """Checkpoint the head, start a new segment and drop segments beyond the limit."""
+        self._write_checkpoint(self._seq, timestamp)
+        self._segment, self._segment_entries = self._seq, 0
+        for seq in self.checkpoints()[:-self.max_segments]:
+            for path in (self._checkpoint_file(seq), self._segment_file(seq)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    # Reading
+    def state_at(self, when: Any = None, streams: List[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Saved value of every stream (or `streams`) as of `when` (datetime or ISO
+        string; default now). None when `when` is older than the retained history.
+        """
+        when = when.isoformat() if isinstance(when, datetime) else when
+        with self._lock:
+            self._load_head()
+            if when is None:
+                state = json.loads(json.dumps(self._head))
+            else:
+                state = None
+                for seq in reversed(self.checkpoints()):
+                    checkpoint = self._read_checkpoint(seq)
+                    if checkpoint['timestamp'] <= when:
+                        state = checkpoint['state']
+                        for entry in self._read_segment(seq):
+                            if entry['timestamp'] > when:
+                                break
+                            apply_changes(state.setdefault(entry['stream'], {}), entry['changes'])
+                        break
+                if state is None:
+                    return None
+        streams = streams or list(STREAMS)
+        return {stream: _unkeyed(stream, state.get(stream, {})) for stream in streams}
+
+    def history(self, stream: str = None, limit: int = 500) -> List[Dict]:
+        """
+        Retained changes, newest first, one row per record change:
+        {"seq", "timestamp", "stream", "record", "change": added|changed|removed, "fields"}
+        """
+        with self._lock:
+            self._load_head()
+            seqs = self.checkpoints()
+            entries = [e for seq in seqs for e in self._read_segment(seq)]
+        rows = []
+        for entry in reversed(entries):
+            if stream and entry['stream'] != stream:
+                continue
+            for rid, change in entry['changes'].items():
+                if change is None:
+                    kind, fields = 'removed', {}
+                elif change.get('added'):
+                    kind, fields = 'added', change['set']
+                else:
+                    kind, fields = 'changed', {**change['set'], **{f: None for f in change['unset']}}
+                rows.append({'seq': entry['seq'], 'timestamp': entry['timestamp'],
+                             'stream': entry['stream'], 'record': rid or entry['stream'],
+                             'change': kind, 'fields': fields})
+                if len(rows) >= limit:
+                    return rows
+        return rows
+
+
+# Shared journals, one per data directory
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(data_dir: str = "data", seed: Callable[[], Dict[str, Any]] = None) -> ChangeJournal:
+    """Get or create the journal for a data directory (seed: see ChangeJournal)"""
+    key = os.path.abspath(data_dir)
+    with _journals_lock:
+        if key not in _journals:
+            _journals[key] = ChangeJournal(data_dir, seed=seed)
+        return _journals[key]
@@ -0,0 +1,151 @@
+"""
+DTC Cohort Model
+Customer cohorts and repeat purchases as an alternative source of DTC demand.
+
+Each month's Sales & Marketing spend divided by that month's CAC acquires a cohort
+of new customers. CAC starts at starting_cac and improves by cac_improvement_rate a
+year until it reaches cac_floor. Every customer places a first order in the month
+they are acquired and repeat orders after that along a retention curve:
+repeat_rate one month later, decaying by retention_decay each further month.
+
+Orders by month are the convolution of the cohort sizes with the retention curve;
+the full (cohort x month) matrix is the same product laid out as a lower
+triangle. Both are whole-array operations, so multi-year horizons with one cohort
+per month cost a few vector passes. Orders become units by product through the
+plan's unit mix and feed generate_monthly_pl through its dtc_demand parameter.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+import opex_engine
+from financial_calcs import get_dtc_demand_units
+from model_cache import FingerprintCache
+
+BASE_YEAR = 2026
+DEFAULT_YEARS = 3
+ACQUISITION_CATEGORY = 'Sales & Marketing'
+PLAN_YEARS = (2026, 2027)
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+DEFAULTS = {
+    'starting_cac': 250.0,
+    'cac_improvement_rate': 0.15,
+    'cac_floor': 30.0,
+    'repeat_rate': 0.05,
+    'retention_decay': 0.90,
+}
+
+_cache = FingerprintCache('cohort_model', max_entries=8)
+
+
+def month_index(year: int, month: int) -> int:
+    """Absolute month number: Jan 2026 = 1, Jan 2027 = 13."""
+    return (year - BASE_YEAR) * 12 + month
+
+
+def month_labels(n_months: int) -> List[str]:
+    """Labels like 'Jan 26' for n months from Jan 2026."""
+    return [f"{MONTHS[m % 12]} {(BASE_YEAR + m // 12) % 100:02d}" for m in range(n_months)]
+
+
+def retention_curve(n_months: int, repeat_rate: float, retention_decay: float) -> np.ndarray:
+    """Orders per acquired customer k months after acquisition (1.0 at k = 0)."""
+    curve = np.zeros(n_months)
+    if n_months:
+        curve[0] = 1.0
+        curve[1:] = repeat_rate * retention_decay ** np.arange(n_months - 1)
+    return curve
+
+
+def cac_curve(n_months: int, starting_cac: float, improvement_rate: float, floor: float) -> np.ndarray:
+    """CAC by month from Jan 2026, improving continuously at the annual rate down to the floor."""
+    months = np.arange(n_months)
+    return np.maximum(starting_cac * (1 - improvement_rate) ** (months / 12), floor)
+
+
+def acquisition_spend(opex_expenses: List[Dict], n_months: int) -> np.ndarray:
+    """Monthly Sales & Marketing OpEx from Jan 2026."""
+    totals = opex_engine.totals_by_category(opex_expenses, 1, n_months)
+    return totals.get(ACQUISITION_CATEGORY, np.zeros(n_months))
+
+
+def cohort_matrix(new_customers: np.ndarray, retention: np.ndarray) -> np.ndarray:
+    """
+    (cohort x month) orders: cohort c places new_customers[c] * retention[t - c]
+    orders in month t >= c, zero above the diagonal.
+    """
+    n = len(new_customers)
+    lag = np.arange(n)[None, :] - np.arange(n)[:, None]
+    return np.where(lag >= 0, new_customers[:, None] * retention[np.clip(lag, 0, None)], 0.0)
+
+
+def orders_by_month(new_customers: np.ndarray, retention: np.ndarray) -> np.ndarray:
+    """Column sums of cohort_matrix, as one convolution."""
+    return np.convolve(new_customers, retention)[:len(new_customers)]
+
+
+def build_cohorts(opex_expenses: List[Dict], assumptions: Dict = None, years: int = DEFAULT_YEARS,
+                  acquisition: np.ndarray = None) -> Dict[str, np.ndarray]:
+    """
+    Cohorts from Jan 2026 over `years` years. `acquisition` overrides the monthly
+    spend taken from OpEx. Parameters come from assumptions, falling back to DEFAULTS.
+
+    Returns: {"spend", "cac", "new_customers", "retention", "orders", "repeat_orders"}
+             arrays, one value per month
+    """
+    params = {**DEFAULTS, **{k: v for k, v in (assumptions or {}).items() if k in DEFAULTS}}
+    n = years * 12
+
+    def compute():
+        spend = np.asarray(acquisition, dtype=float)[:n] if acquisition is not None \
+            else acquisition_spend(opex_expenses, n)
+        cac = cac_curve(n, params['starting_cac'], params['cac_improvement_rate'], params['cac_floor'])
+        new_customers = spend / cac
+        retention = retention_curve(n, params['repeat_rate'], params['retention_decay'])
+        orders = orders_by_month(new_customers, retention)
+        return {
+            'spend': spend,
+            'cac': cac,
+            'new_customers': new_customers,
+            'retention': retention,
+            'orders': orders,
+            'repeat_orders': orders - new_customers,
+        }
+
+    key = [opex_expenses if acquisition is None else np.asarray(acquisition).tolist(), params, years]
+    return _cache.get_or_compute(key, compute)
+
+
+# ============================================================
+# DTC DEMAND
+# ============================================================
+
+def unit_mix(year: int) -> Dict[str, np.ndarray]:
+    """Monthly unit share per product from the plan (nearest plan year); all Beta when the plan has none."""
+    plan_year = min(max(year, PLAN_YEARS[0]), PLAN_YEARS[-1])
+    units = {sku: np.array(v, dtype=float) for sku, v in get_dtc_demand_units(plan_year).items()}
+    total = sum(units.values())
+    safe = np.where(total > 0, total, 1.0)
+    return {sku: np.where(total > 0, u / safe, 1.0 if sku == 'Beta' else 0.0) for sku, u in units.items()}
+
+
+def dtc_demand(cohorts: Dict[str, np.ndarray], year: int) -> Dict[str, List[int]]:
+    """
+    Units by product for one year ({"Beta": [12], "Alpha": [12]}), the format of
+    get_dtc_demand_units and generate_monthly_pl's dtc_demand.
+    """
+    start = month_index(year, 1) - 1
+    if start < 0 or start + 12 > len(cohorts['orders']):
+        raise ValueError(f"{year} is outside the cohort horizon")
+    orders = cohorts['orders'][start:start + 12]
+    return {sku: [int(u) for u in np.round(orders * share)] for sku, share in unit_mix(year).items()}
+
+
+def cohort_table(cohorts: Dict[str, np.ndarray], year: int) -> np.ndarray:
+    """(cohort x month) orders for cohorts acquired up to and during `year`, over its 12 months."""
+    end = month_index(year, 12)
+    matrix = cohort_matrix(cohorts['new_customers'][:end], cohorts['retention'][:end])
+    return matrix[:, end - 12:end]
@@ -0,0 +1,138 @@
+"""
+Entity Consolidation
+Per-entity forecasts and the consolidated roll-up.
+
+Each entity keeps its own data directory (see data_persistence.list_entities), and
+its P&L and cash runway are computed from that entity's inputs alone. Entity
+results are memoized on the digest of the entity's inputs, and the roll-up on the
+list of entity digests, so editing one entity recomputes only that entity and the
+sum. Entities that need computing run in parallel on a thread pool.
+
+The plan's DTC units and opening cash belong to the primary entity only; other
+entities forecast DTC from zero demand and start from their own QBO position (or
+zero), so adding an entity never counts the plan twice in the roll-up.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import pandas as pd
+
+from baseline_data import get_baseline_cash_position
+from data_persistence import DataStore, content_hash, list_entities
+from model_cache import FingerprintCache
+from reforecast import get_forecast, open_month_runway
+
+# Runway columns that add across entities; burn and days of cash are recomputed
+RUNWAY_SUM_COLUMNS = ['Cash Inflow', 'Funding', 'Cash Outflow', 'Net Cash Flow',
+                      'Ending Cash', 'Ending Cash (No Funding)']
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+_entity_cache = FingerprintCache('entity_model', max_entries=32)
+_rollup_cache = FingerprintCache('entity_rollup', max_entries=8)
+
+
+def compute_entity(inputs: Dict, year: int = 2026, use_baseline: bool = True) -> Dict:
+    """
+    P&L and cash runway for one entity's model inputs (DataStore.load_model_inputs).
+    Inventory mode applies when the entity has POs; the runway starts from the
+    entity's latest QBO cash and AP. use_baseline (the store's flag) selects the
+    plan's DTC units and, without actuals, the Cash Runway page's opening cash and
+    AP; otherwise DTC demand is zero and the opening position is zero.
+
+    Returns: {"pl": P&L DataFrame, "runway": runway DataFrame,
+              "starting_cash": float, "starting_ap": float}
+    """
+    po_data = inputs.get('po_data') or None
+    inventory_config = inputs.get('inventory_config') if po_data else None
+    dtc_demand = None if use_baseline else {'Beta': [0] * 12, 'Alpha': [0] * 12}
+    pl = get_forecast(year, inputs['team_members'], inputs['opex_expenses'],
+                      inputs['wholesale_deals'], po_data, inventory_config, dtc_demand)
+
+    qbo = inputs.get('qbo_actuals') or {}
+    default = get_baseline_cash_position() if use_baseline else {'cash': 0.0, 'ap': 0.0}
+    starting_cash = float(qbo.get('latest_cash', default['cash']) if qbo else default['cash'])
+    starting_ap = float(qbo.get('latest_ap', default['ap']) if qbo else default['ap'])
+    runway = open_month_runway(pl, 0, starting_cash, starting_ap, inputs.get('fundraising_rounds'),
+                               year, po_data, inventory_config)
+    return {'pl': pl, 'runway': runway, 'starting_cash': starting_cash, 'starting_ap': starting_ap}
+
+
+def _entity_result(entity: str, inputs: Dict, digest: str, year: int, use_baseline: bool) -> Dict:
+    return _entity_cache.get_or_compute([entity, digest, use_baseline],
+                                        lambda: compute_entity(inputs, year, use_baseline))
+
+
+# ============================================================
+# ROLL-UP
+# ============================================================
+
+def rollup_pl(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Sum of entity P&Ls by month: money columns add, margins are recomputed."""
+    money = [c for c in frames[0].columns
+             if c != 'Month' and not c.endswith('%') and pd.api.types.is_numeric_dtype(frames[0][c])]
+    total = sum(f.reindex(columns=money).fillna(0).astype(float).reset_index(drop=True) for f in frames)
+    total.insert(0, 'Month', frames[0]['Month'].to_numpy())
+    revenue = total['Total Revenue']
+    total['Gross Margin %'] = (total['Gross Profit'] / revenue.where(revenue > 0) * 100).fillna(0)
+    total['EBITDA Margin %'] = (total['EBITDA'] / revenue.where(revenue > 0) * 100).fillna(0)
+    return total
+
+
+def rollup_runway(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Sum of entity runways by month, with burn and days of cash on the combined cash."""
+    total = sum(f[RUNWAY_SUM_COLUMNS].astype(float).reset_index(drop=True) for f in frames)
+    total.insert(0, 'Month', frames[0]['Month'].to_numpy())
+    burn = (total['Cash Outflow'] - (total['Cash Inflow'] - total['Funding'])).clip(lower=0)
+    total['Monthly Burn Rate'] = burn
+    total['Days of Cash'] = (total['Ending Cash'] / (burn.where(burn > 0) / 30)).fillna(999).clip(upper=999)
+    return total
+
+
+def consolidate(entities: List[str] = None, year: int = 2026, data_dir: str = "data") -> Dict:
+    """
+    Load, compute and roll up every entity (default: all of them).
+
+    Returns: {"entities": {entity: compute_entity result}, "pl": consolidated P&L,
+              "runway": consolidated runway, "digests": {entity: input digest}}
+    """
+    entities = entities or list_entities(data_dir)
+    inputs, use_baseline = {}, {}
+    for entity in entities:
+        store = DataStore.for_entity(entity, data_dir)
+        inputs[entity] = store.load_model_inputs()
+        use_baseline[entity] = store.use_baseline
+    digests = {entity: content_hash([year, inputs[entity]]) for entity in entities}
+
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(entities))) as pool:
+        futures = {entity: pool.submit(_entity_result, entity, inputs[entity], digests[entity], year,
+                                       use_baseline[entity])
+                   for entity in entities}
+        results = {entity: future.result() for entity, future in futures.items()}
+
+    rollup = _rollup_cache.get_or_compute(
+        [year, [(entity, digests[entity]) for entity in entities]],
+        lambda: {'pl': rollup_pl([results[e]['pl'] for e in entities]),
+                 'runway': rollup_runway([results[e]['runway'] for e in entities])})
+    return {'entities': results, 'pl': rollup['pl'], 'runway': rollup['runway'], 'digests': digests}
+
+
+def entity_summary(consolidated: Dict) -> pd.DataFrame:
+    """One row per entity plus a Consolidated row: revenue, EBITDA, cash now and year-end."""
+    rows = []
+    named = list(consolidated['entities'].items()) + [('Consolidated', {
+        'pl': consolidated['pl'], 'runway': consolidated['runway'],
+        'starting_cash': sum(r['starting_cash'] for r in consolidated['entities'].values())})]
+    for entity, result in named:
+        runway = result['runway']
+        rows.append({
+            'Entity': entity,
+            'Revenue': result['pl']['Total Revenue'].sum(),
+            'Gross Profit': result['pl']['Gross Profit'].sum(),
+            'EBITDA': result['pl']['EBITDA'].sum(),
+            'Starting Cash': result['starting_cash'],
+            'Year-End Cash': runway['Ending Cash'].iloc[-1],
+            'Low Cash': runway['Ending Cash'].min(),
+        })
+    return pd.DataFrame(rows)
@@ -3,23 +3,86 @@ Data Persistence Module
 Handles saving and loading of dashboard data with baseline data support
 """
 
+import hashlib
 import json
 import os
+import re
+import threading
+import time
 from datetime import datetime
 from typing import Dict, List, Any
 from baseline_data import (
     get_baseline_team, 
     get_baseline_opex, 
-    get_baseline_wholesale
+    get_baseline_wholesale,
+    get_baseline_fundraising,
+    get_baseline_po_data,
+    get_baseline_inventory_config,
 )
+from instrumentation import timed
+from metrics import DATASTORE_BYTES, DATASTORE_SECONDS
+
+
+def content_hash(obj: Any) -> str:
+    """Stable SHA-256 digest of a JSON-serializable object.
+    Used as a cache key / ETag for model inputs and outputs."""
+    payload = json.dumps(obj, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# ============================================================
+# RECORD IDS
+# Stable keys for team members, expenses and deals. Used to tell baseline records
+# from custom ones on save and to label per-record model contributions.
+# ============================================================
+
+def team_member_id(member: Dict[str, Any]) -> str:
+    return f"{member.get('first_name', '')}_{member.get('last_name', '')}_{member.get('start_date', '')}"
+
+
+def expense_id(expense: Dict[str, Any]) -> str:
+    return f"{expense.get('expense_name', '')}_{expense.get('start_date', '')}"
+
+
+def deal_id(deal: Dict[str, Any]) -> str:
+    return f"{deal.get('customer_name', '')}_{deal.get('close_date', '')}"
+
+
+# ============================================================
+# ENTITIES
+# The primary entity lives in the data directory itself and builds on the baseline
+# records. Every other entity has its own directory under data/entities/ holding the
+# same files, with no baseline: all of its records are its own.
+# ============================================================
+
+DEFAULT_ENTITY = "Alma Mater Inc."
+ENTITIES_DIR = "entities"
+
+
+def entity_dir_name(entity: str) -> str:
+    """Directory name for an entity: letters, digits, '-' and '_' only."""
+    name = re.sub(r'[^A-Za-z0-9_-]+', '_', entity.strip()).strip('_')
+    if not name:
+        raise ValueError(f"Invalid entity name: {entity!r}")
+    return name
+
+
+def list_entities(data_dir: str = "data") -> List[str]:
+    """Primary entity first, then every entity directory, alphabetically."""
+    root = os.path.join(data_dir, ENTITIES_DIR)
+    others = sorted(d for d in os.listdir(root) if os.path.isdir(os.path.join(root, d))) \
+        if os.path.isdir(root) else []
+    return [DEFAULT_ENTITY] + others
 
 
 class DataStore:
     """Manages persistent storage for dashboard data"""
     
-    def __init__(self, data_dir: str = "data"):
-        """Initialize data store with directory path"""
+    def __init__(self, data_dir: str = "data", use_baseline: bool = True):
+        """Initialize data store with directory path.
+        use_baseline=False stores every record itself (entities other than the primary)."""
         self.data_dir = data_dir
+        self.use_baseline = use_baseline
         self.ensure_data_dir()
         
         # File paths (only for CUSTOM data, not baseline)
@@ -30,197 +93,298 @@ class DataStore:
         self.qbo_file = os.path.join(data_dir, "qbo_actuals.json")
         self.fundraising_file = os.path.join(data_dir, "fundraising_rounds.json")
         self.po_file = os.path.join(data_dir, "po_data.json")
+
+        # Row-level problems found by the last load of each collection
+        self.validation_errors: Dict[str, List[Dict[str, Any]]] = {}
     
+    @classmethod
+    def for_entity(cls, entity: str, data_dir: str = "data") -> 'DataStore':
+        """Store for one entity: the primary entity uses data_dir itself."""
+        if entity == DEFAULT_ENTITY:
+            return cls(data_dir)
+        return cls(os.path.join(data_dir, ENTITIES_DIR, entity_dir_name(entity)), use_baseline=False)
+
+    @property
+    def journal(self):
+        """
+        Change journal for this data directory (shared by every store on it).
+        Savers journal before they write, so a new journal is seeded from the
+        files as they were before the first save.
+        """
+        from change_journal import get_journal
+        return get_journal(self.data_dir, seed=self.saved_state)
+
+    def saved_state(self) -> Dict[str, Any]:
+        """Each journal stream's value as its saver would record it, read from the files on disk"""
+        from record_schema import validate
+
+        def stored(file_path, key, default, collection=None):
+            value = (self._read_json(file_path) or {}).get(key, default)
+            return validate(collection, value)[0] if collection else value
+
+        return {
+            'team_members': stored(self.team_file, 'custom_team_members', [], 'team_members'),
+            'opex_expenses': stored(self.opex_file, 'custom_expenses', [], 'opex_expenses'),
+            'wholesale_deals': stored(self.wholesale_file, 'custom_deals', [], 'wholesale_deals'),
+            'assumptions': stored(self.assumptions_file, 'assumptions', {}),
+            'qbo_actuals': stored(self.qbo_file, 'qbo_actuals', {}),
+            'fundraising_rounds': stored(self.fundraising_file, 'fundraising_rounds', [], 'fundraising_rounds'),
+            'po_data': stored(self.po_file, 'po_data', [], 'po_data'),
+        }
+
+    def _baseline(self, getter) -> List[Dict[str, Any]]:
+        """Baseline records for this store (none for non-primary entities)"""
+        return getter() if self.use_baseline else []
+
+    def _validated(self, collection: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Normalize a loaded collection once; rejected values go to validation_errors"""
+        from record_schema import validate
+        records, errors = validate(collection, records)
+        self.validation_errors[collection] = errors
+        return records
+
     def ensure_data_dir(self):
         """Create data directory if it doesn't exist"""
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
+
+    def _write_json(self, file_path: str, payload: Dict[str, Any]):
+        """Write a JSON file and record bytes/duration metrics"""
+        t0 = time.perf_counter()
+        text = json.dumps(payload, indent=2)
+        with open(file_path, 'w') as f:
+            f.write(text)
+        DATASTORE_BYTES.inc(len(text), op='write')
+        DATASTORE_SECONDS.observe(time.perf_counter() - t0, op='write')
+
+    def _read_json(self, file_path: str) -> Dict[str, Any]:
+        """Read a JSON file (None if missing) and record bytes/duration metrics"""
+        if not os.path.exists(file_path):
+            return None
+        t0 = time.perf_counter()
+        with open(file_path, 'r') as f:
+            text = f.read()
+        DATASTORE_BYTES.inc(len(text), op='read')
+        DATASTORE_SECONDS.observe(time.perf_counter() - t0, op='read')
+        return json.loads(text)
     
     # Team Members (Baseline + Custom)
+    @timed()
     def save_team_members(self, all_team_members: List[Dict[str, Any]]):
         """Save ONLY custom team members (not baseline)"""
-        baseline = get_baseline_team()
+        baseline = self._baseline(get_baseline_team)
         baseline_ids = set()
         
         # Create IDs for baseline members
         for member in baseline:
-            baseline_id = f"{member['first_name']}_{member['last_name']}_{member.get('start_date', '')}"
-            baseline_ids.add(baseline_id)
+            baseline_ids.add(team_member_id(member))
         
         # Filter out baseline members - only save custom additions
         custom_members = []
         for member in all_team_members:
-            member_id = f"{member['first_name']}_{member['last_name']}_{member.get('start_date', '')}"
-            if member_id not in baseline_ids:
+            if team_member_id(member) not in baseline_ids:
                 custom_members.append(member)
         
-        with open(self.team_file, 'w') as f:
-            json.dump({
-                'custom_team_members': custom_members,
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2)
+        self.journal.record('team_members', custom_members)
+        self._write_json(self.team_file, {
+            'custom_team_members': custom_members,
+            'last_updated': datetime.now().isoformat()
+        })
     
+    @timed()
     def load_team_members(self) -> List[Dict[str, Any]]:
         """Load baseline + custom team members"""
         # Start with baseline
-        all_members = get_baseline_team()
+        all_members = self._baseline(get_baseline_team)
         
         # Add custom members
-        if os.path.exists(self.team_file):
-            with open(self.team_file, 'r') as f:
-                data = json.load(f)
-                custom_members = data.get('custom_team_members', [])
-                all_members.extend(custom_members)
+        data = self._read_json(self.team_file)
+        if data:
+            all_members.extend(data.get('custom_team_members', []))
         
-        return all_members
+        return self._validated('team_members', all_members)
     
     # OpEx Expenses (Baseline + Custom)
+    @timed()
     def save_opex_expenses(self, all_expenses: List[Dict[str, Any]]):
         """Save ONLY custom expenses (not baseline)"""
-        baseline = get_baseline_opex()
+        baseline = self._baseline(get_baseline_opex)
         baseline_ids = set()
         
         # Create IDs for baseline expenses
         for expense in baseline:
-            baseline_id = f"{expense['expense_name']}_{expense.get('start_date', '')}"
-            baseline_ids.add(baseline_id)
+            baseline_ids.add(expense_id(expense))
         
         # Filter out baseline expenses - only save custom additions
         custom_expenses = []
         for expense in all_expenses:
-            expense_id = f"{expense['expense_name']}_{expense.get('start_date', '')}"
-            if expense_id not in baseline_ids:
+            if expense_id(expense) not in baseline_ids:
                 custom_expenses.append(expense)
         
-        with open(self.opex_file, 'w') as f:
-            json.dump({
-                'custom_expenses': custom_expenses,
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2)
+        self.journal.record('opex_expenses', custom_expenses)
+        self._write_json(self.opex_file, {
+            'custom_expenses': custom_expenses,
+            'last_updated': datetime.now().isoformat()
+        })
     
+    @timed()
     def load_opex_expenses(self) -> List[Dict[str, Any]]:
         """Load baseline + custom OpEx expenses"""
         # Start with baseline
-        all_expenses = get_baseline_opex()
+        all_expenses = self._baseline(get_baseline_opex)
         
         # Add custom expenses
-        if os.path.exists(self.opex_file):
-            with open(self.opex_file, 'r') as f:
-                data = json.load(f)
-                custom_expenses = data.get('custom_expenses', [])
-                all_expenses.extend(custom_expenses)
+        data = self._read_json(self.opex_file)
+        if data:
+            all_expenses.extend(data.get('custom_expenses', []))
         
-        return all_expenses
+        return self._validated('opex_expenses', all_expenses)
     
     # Wholesale Deals (Baseline + Custom)
+    @timed()
     def save_wholesale_deals(self, all_deals: List[Dict[str, Any]]):
         """Save ONLY custom deals (not baseline)"""
-        baseline = get_baseline_wholesale()
+        baseline = self._baseline(get_baseline_wholesale)
         baseline_ids = set()
         
         # Create IDs for baseline deals
         for deal in baseline:
-            baseline_id = f"{deal['customer_name']}_{deal.get('close_date', '')}"
-            baseline_ids.add(baseline_id)
+            baseline_ids.add(deal_id(deal))
         
         # Filter out baseline deals - only save custom additions
         custom_deals = []
         for deal in all_deals:
-            deal_id = f"{deal['customer_name']}_{deal.get('close_date', '')}"
-            if deal_id not in baseline_ids:
+            if deal_id(deal) not in baseline_ids:
                 custom_deals.append(deal)
         
-        with open(self.wholesale_file, 'w') as f:
-            json.dump({
-                'custom_deals': custom_deals,
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2)
+        self.journal.record('wholesale_deals', custom_deals)
+        self._write_json(self.wholesale_file, {
+            'custom_deals': custom_deals,
+            'last_updated': datetime.now().isoformat()
+        })
     
+    @timed()
     def load_wholesale_deals(self) -> List[Dict[str, Any]]:
         """Load baseline + custom wholesale deals"""
         # Start with baseline
-        all_deals = get_baseline_wholesale()
+        all_deals = self._baseline(get_baseline_wholesale)
         
         # Add custom deals
-        if os.path.exists(self.wholesale_file):
-            with open(self.wholesale_file, 'r') as f:
-                data = json.load(f)
-                custom_deals = data.get('custom_deals', [])
-                all_deals.extend(custom_deals)
+        data = self._read_json(self.wholesale_file)
+        if data:
+            all_deals.extend(data.get('custom_deals', []))
         
-        return all_deals
+        return self._validated('wholesale_deals', all_deals)
     
     # Assumptions
+    @timed()
     def save_assumptions(self, assumptions: Dict[str, Any]):
         """Save model assumptions to file"""
-        with open(self.assumptions_file, 'w') as f:
-            json.dump({
-                'assumptions': assumptions,
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2)
+        self.journal.record('assumptions', assumptions)
+        self._write_json(self.assumptions_file, {
+            'assumptions': assumptions,
+            'last_updated': datetime.now().isoformat()
+        })
     
+    @timed()
     def load_assumptions(self) -> Dict[str, Any]:
         """Load model assumptions from file"""
-        if os.path.exists(self.assumptions_file):
-            with open(self.assumptions_file, 'r') as f:
-                data = json.load(f)
-                return data.get('assumptions', {})
+        data = self._read_json(self.assumptions_file)
+        if data:
+            return data.get('assumptions', {})
         return {}
     
     # QBO Actuals
+    @timed()
     def save_qbo_actuals(self, qbo_data: Dict[str, Any]):
         """Save QBO actuals data to file"""
-        with open(self.qbo_file, 'w') as f:
-            json.dump({
-                'qbo_actuals': qbo_data,
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2)
+        self.journal.record('qbo_actuals', qbo_data)
+        self._write_json(self.qbo_file, {
+            'qbo_actuals': qbo_data,
+            'last_updated': datetime.now().isoformat()
+        })
 
+    @timed()
     def load_qbo_actuals(self) -> Dict[str, Any]:
         """Load QBO actuals data from file"""
-        if os.path.exists(self.qbo_file):
-            with open(self.qbo_file, 'r') as f:
-                data = json.load(f)
-                return data.get('qbo_actuals', {})
+        data = self._read_json(self.qbo_file)
+        if data:
+            return data.get('qbo_actuals', {})
         return {}
 
     # Fundraising
+    @timed()
     def save_fundraising(self, rounds: List[Dict[str, Any]]):
         """Save fundraising rounds to file"""
-        with open(self.fundraising_file, 'w') as f:
-            json.dump({
-                'fundraising_rounds': rounds,
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2)
+        self.journal.record('fundraising_rounds', rounds)
+        self._write_json(self.fundraising_file, {
+            'fundraising_rounds': rounds,
+            'last_updated': datetime.now().isoformat()
+        })
 
+    @timed()
     def load_fundraising(self) -> List[Dict[str, Any]]:
         """Load fundraising rounds from file"""
-        if os.path.exists(self.fundraising_file):
-            with open(self.fundraising_file, 'r') as f:
-                data = json.load(f)
-                return data.get('fundraising_rounds', [])
+        data = self._read_json(self.fundraising_file)
+        if data:
+            return self._validated('fundraising_rounds', data.get('fundraising_rounds', []))
         return []
 
     # Purchase Orders
+    @timed()
     def save_po_data(self, po_list: List[Dict[str, Any]]):
         """Save purchase order data to file"""
-        with open(self.po_file, 'w') as f:
-            json.dump({
-                'po_data': po_list,
-                'last_updated': datetime.now().isoformat()
-            }, f, indent=2)
+        self.journal.record('po_data', po_list)
+        self._write_json(self.po_file, {
+            'po_data': po_list,
+            'last_updated': datetime.now().isoformat()
+        })
 
+    @timed()
     def load_po_data(self) -> List[Dict[str, Any]]:
         """Load purchase order data from file"""
-        if os.path.exists(self.po_file):
-            with open(self.po_file, 'r') as f:
-                data = json.load(f)
-                return data.get('po_data', [])
+        data = self._read_json(self.po_file)
+        if data:
+            return self._validated('po_data', data.get('po_data', []))
         return []
 
+    # Model inputs
+    def load_model_inputs(self) -> Dict[str, Any]:
+        """Load everything the forecast model needs, with the same baseline
+        fallbacks app_client applies when a session starts."""
+        assumptions = self.load_assumptions()
+
+        inventory_config = get_baseline_inventory_config()
+        for key in inventory_config:
+            if key in assumptions:
+                inventory_config[key] = assumptions[key]
+
+        return {
+            'team_members': self.load_team_members(),
+            'opex_expenses': self.load_opex_expenses(),
+            'wholesale_deals': self.load_wholesale_deals(),
+            'assumptions': assumptions,
+            'qbo_actuals': self.load_qbo_actuals(),
+            'fundraising_rounds': self.load_fundraising() or self._baseline(get_baseline_fundraising),
+            'po_data': self.load_po_data() or self._baseline(get_baseline_po_data),
+            'inventory_config': inventory_config,
+        }
+
+    def get_file_signature(self) -> tuple:
+        """(path, mtime, size) for every data file; changes whenever any file is written."""
+        signature = []
+        for file_path in [self.team_file, self.opex_file, self.wholesale_file, self.assumptions_file, self.qbo_file, self.fundraising_file, self.po_file]:
+            if os.path.exists(file_path):
+                st = os.stat(file_path)
+                signature.append((file_path, st.st_mtime_ns, st.st_size))
+            else:
+                signature.append((file_path, None, None))
+        return tuple(signature)
+
     # Utility
     def clear_all_data(self):
         """Clear all stored data (use with caution!)"""
+        self.journal.record_cleared()
         for file_path in [self.team_file, self.opex_file, self.wholesale_file, self.assumptions_file, self.qbo_file, self.fundraising_file, self.po_file]:
             if os.path.exists(file_path):
                 os.remove(file_path)
@@ -242,12 +406,23 @@ class DataStore:
         return 'Never'
 
 
-# Global instance
-_store = None
+# Global instances, one per entity
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_data_store(entity: str = None) -> DataStore:
+    """Get or create the data store for an entity (default: the primary entity)"""
+    entity = entity or DEFAULT_ENTITY
+    with _stores_lock:
+        if entity not in _stores:
+            _stores[entity] = DataStore.for_entity(entity)
+        return _stores[entity]
+
 
-def get_data_store() -> DataStore:
-    """Get or create global data store instance"""
-    global _store
-    if _store is None:
-        _store = DataStore()
-    return _store
+def create_entity(name: str, data_dir: str = "data") -> str:
+    """Create an empty entity directory; returns the entity name as listed."""
+    entity = entity_dir_name(name)
+    if entity in list_entities(data_dir):
+        raise ValueError(f"Entity '{entity}' already exists")
+    DataStore.for_entity(entity, data_dir)
+    return entity
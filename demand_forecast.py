@@ -0,0 +1,245 @@
+"""
+DTC Demand Forecast
+Holt-Winters forecasts of DTC demand from the QBO actuals history.
+
+The plan's DTC unit lists only exist for 2026 and 2027. This module fits additive
+exponential smoothing (damped trend, plus 12-month seasonality once two years of
+history exist) to monthly QBO lines and projects any future month with prediction
+intervals. The smoothing parameters are chosen by grid search, and every series and
+grid point is filtered together as one (series x grid) array, one month per step.
+Fitted models are cached per actuals digest. Revenue forecasts become unit demand by
+product through the plan's product mix and AOVs.
+"""
+
+from itertools import product
+from statistics import NormalDist
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from financial_calcs import get_dtc_demand_units
+from model_cache import FingerprintCache
+
+SEASON = 12
+MIN_HISTORY_MONTHS = 6
+MIN_SEASONAL_MONTHS = 2 * SEASON
+DEFAULT_INTERVAL = 0.80
+PLAN_YEARS = (2026, 2027)
+
+# Smoothing grid (error-correction form: beta <= alpha, gamma <= 1 - alpha)
+ALPHAS = (0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.0, 0.02, 0.05, 0.1, 0.2)
+GAMMAS = (0.0, 0.05, 0.1, 0.2, 0.3)
+PHIS = (0.85, 0.9, 0.95, 0.98)
+GRID = np.array([
+    (a, b, g, p) for a, b, g, p in product(ALPHAS, BETAS, GAMMAS, PHIS)
+    if b <= a and g <= 1 - a
+])
+
+_cache = FingerprintCache('demand_forecast', max_entries=8)
+
+
+def month_index(year: int, month: int) -> int:
+    """Absolute month number: Jan 2026 = 1, Jan 2027 = 13."""
+    return (year - 2026) * 12 + month
+
+
+def history_series(qbo_actuals: Dict, label: str = 'DTC Revenue') -> Tuple[int, np.ndarray]:
+    """
+    Monthly values of one serialized QBO P&L line (keys like "2025_7"), from the first
+    non-zero month on. Returns (absolute month of the first value, values).
+    """
+    series = (qbo_actuals or {}).get('pl_data', {}).get(label, {})
+    points = sorted(
+        (month_index(int(yr), int(mo)), float(val))
+        for yr, mo, val in ((*key.split('_'), val) for key, val in series.items())
+    )
+    if not points:
+        return 0, np.zeros(0)
+    first, last = points[0][0], points[-1][0]
+    values = np.zeros(last - first + 1)
+    for abs_month, val in points:
+        values[abs_month - first] = val
+    nonzero = np.flatnonzero(values)
+    if not len(nonzero):
+        return 0, np.zeros(0)
+    return first + int(nonzero[0]), values[nonzero[0]:]
+
+
+# ============================================================
+# FITTING
+# ============================================================
+
+def _initial_states(y: np.ndarray, seasonal: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Level, trend and seasonal indices before the first observation, for a (series x
+    months) block: a line through the first year (two years when seasonal) and the
+    mean detrended value per calendar position.
+    """
+    window = MIN_SEASONAL_MONTHS if seasonal else min(y.shape[1], SEASON)
+    t = np.arange(window)
+    slope, intercept = np.polyfit(t, y[:, :window].T, 1)
+    season = np.zeros((y.shape[0], SEASON))
+    if seasonal:
+        detrended = y[:, :window] - (intercept[:, None] + slope[:, None] * t)
+        season = detrended.reshape(y.shape[0], -1, SEASON).mean(axis=1)
+        season -= season.mean(axis=1, keepdims=True)
+    return intercept - slope, slope, season
+
+
+def _filter(y: np.ndarray, level: np.ndarray, trend: np.ndarray, season: np.ndarray,
+            alpha: np.ndarray, beta: np.ndarray, gamma: np.ndarray, phi: np.ndarray) -> Dict:
+    """
+    Run the damped additive Holt-Winters recursions over every row at once.
+    All state and parameter arrays share the leading (row) axis.
+    """
+    level, trend, season = level.copy(), trend.copy(), season.copy()
+    sse = np.zeros(len(level))
+    rows = np.arange(len(level))
+    for t in range(y.shape[1]):
+        pos = t % SEASON
+        forecast = level + phi * trend + season[:, pos]
+        error = y[:, t] - forecast
+        sse += error ** 2
+        level = level + phi * trend + alpha * error
+        trend = phi * trend + beta * error
+        season[rows, pos] += gamma * error
+    return {'sse': sse, 'level': level, 'trend': trend, 'season': season}
+
+
+def fit_many(series: Dict[str, Tuple[int, np.ndarray]]) -> Dict[str, Dict]:
+    """
+    Fit every series ({name: (first absolute month, values)}) with the best grid
+    parameters. Series of equal length are filtered in one (series x grid) pass.
+    Series shorter than MIN_HISTORY_MONTHS are skipped.
+
+    Returns: {name: {"alpha", "beta", "gamma", "phi", "level", "trend", "season",
+              "sigma", "seasonal", "first_abs", "last_abs", "n", "history"}}
+    """
+    by_length = {}
+    for name, (first_abs, values) in series.items():
+        if len(values) >= MIN_HISTORY_MONTHS:
+            by_length.setdefault(len(values), []).append(name)
+
+    models = {}
+    n_grid = len(GRID)
+    for length, names in by_length.items():
+        y = np.array([series[name][1] for name in names], dtype=float)
+        seasonal = length >= MIN_SEASONAL_MONTHS
+        level0, trend0, season0 = _initial_states(y, seasonal)
+
+        # Rows: series-major, one row per grid point
+        rep = lambda a: np.repeat(a, n_grid, axis=0)
+        alpha, beta, gamma, phi = (np.tile(GRID[:, k], len(names)) for k in range(4))
+        if not seasonal:
+            gamma = np.zeros_like(gamma)
+        out = _filter(rep(y), rep(level0), rep(trend0), rep(season0), alpha, beta, gamma, phi)
+
+        best = out['sse'].reshape(len(names), n_grid).argmin(axis=1) + np.arange(len(names)) * n_grid
+        n_params = 4 if seasonal else 3
+        for i, name in enumerate(names):
+            row = best[i]
+            models[name] = {
+                'alpha': float(alpha[row]), 'beta': float(beta[row]),
+                'gamma': float(gamma[row]), 'phi': float(phi[row]),
+                'level': float(out['level'][row]), 'trend': float(out['trend'][row]),
+                'season': out['season'][row],
+                'sigma': float(np.sqrt(out['sse'][row] / max(length - n_params, 1))),
+                'seasonal': seasonal,
+                'first_abs': series[name][0],
+                'last_abs': series[name][0] + length - 1,
+                'n': length,
+                'history': y[i],
+            }
+    return models
+
+
+def forecast(model: Dict, first_abs: int, n_months: int = 12,
+             interval: float = DEFAULT_INTERVAL) -> Dict[str, np.ndarray]:
+    """
+    Mean and prediction interval for n_months from absolute month first_abs (which
+    must come after the history). Values are floored at zero.
+
+    The h-step variance is sigma^2 * (1 + sum_{j<h} c_j^2) with
+    c_j = alpha + beta * (phi + ... + phi^j) + gamma * [j is a multiple of 12].
+    """
+    steps = first_abs + np.arange(n_months) - model['last_abs']        # h >= 1
+    if steps[0] < 1:
+        raise ValueError("Forecast months must come after the fitted history")
+    h_max = int(steps[-1])
+    phi = model['phi']
+    damp = np.cumsum(phi ** np.arange(1, h_max + 1))                   # phi + ... + phi^h
+    positions = (first_abs + np.arange(n_months) - model['first_abs']) % SEASON
+    mean = model['level'] + damp[steps - 1] * model['trend'] + model['season'][positions]
+
+    j = np.arange(1, h_max)
+    c = model['alpha'] + model['beta'] * damp[:h_max - 1] + model['gamma'] * (j % SEASON == 0)
+    var_factor = 1.0 + np.concatenate([[0.0], np.cumsum(c ** 2)])
+    spread = NormalDist().inv_cdf(0.5 + interval / 2) * model['sigma'] * np.sqrt(var_factor[steps - 1])
+    return {
+        'mean': np.maximum(mean, 0.0),
+        'lower': np.maximum(mean - spread, 0.0),
+        'upper': np.maximum(mean + spread, 0.0),
+    }
+
+
+def fit_actuals(qbo_actuals: Dict, labels: List[str] = ('DTC Revenue',)) -> Dict[str, Dict]:
+    """fit_many over QBO lines, reused while the actuals are unchanged."""
+    series = {label: history_series(qbo_actuals, label) for label in labels}
+    key = [{label: (first, values.tolist()) for label, (first, values) in series.items()}]
+    return _cache.get_or_compute(key, lambda: fit_many(series))
+
+
+# ============================================================
+# DEMAND CURVES
+# ============================================================
+
+def product_mix(year: int, inventory_config: Dict = None) -> Dict[str, np.ndarray]:
+    """
+    Monthly revenue share and AOV per product from the plan's unit lists (nearest
+    plan year outside 2026-2027). Months without planned sales go all to Beta.
+    """
+    inventory_config = inventory_config or {}
+    plan_year = min(max(year, PLAN_YEARS[0]), PLAN_YEARS[-1])
+    units = get_dtc_demand_units(plan_year)
+    aov = {'Beta': inventory_config.get('beta_aov', 250), 'Alpha': inventory_config.get('alpha_aov', 450)}
+    revenue = {sku: np.array(units[sku], dtype=float) * aov[sku] for sku in units}
+    total = sum(revenue.values())
+    shares = {}
+    for sku in units:
+        default = 1.0 if sku == 'Beta' else 0.0
+        shares[sku] = np.where(total > 0, revenue[sku] / np.where(total > 0, total, 1.0), default)
+    return {'shares': shares, 'aov': aov}
+
+
+def demand_forecast(qbo_actuals: Dict, year: int, inventory_config: Dict = None,
+                    interval: float = DEFAULT_INTERVAL) -> Dict:
+    """
+    Statistical DTC demand for `year` from QBO 'DTC Revenue' history.
+
+    Returns None without enough history, else {"revenue": {"mean", "lower", "upper"},
+    "units": {sku: {"mean", "lower", "upper"}}, "model": fitted model}. QBO revenue
+    is net of discounts and returns, so units are a floor on gross demand.
+    """
+    model = fit_actuals(qbo_actuals).get('DTC Revenue')
+    if model is None:
+        return None
+    # Months already in the history keep their actuals; the rest are forecast
+    months = month_index(year, 1) + np.arange(12)
+    past = months <= model['last_abs']
+    offset = months[past] - model['first_abs']
+    actual = np.where(offset >= 0, model['history'][np.clip(offset, 0, None)], 0.0)
+    revenue = {key: np.zeros(12) for key in ('mean', 'lower', 'upper')}
+    if (~past).any():
+        projected = forecast(model, int(months[~past][0]), int((~past).sum()), interval)
+    for key in revenue:
+        revenue[key][past] = actual
+        if (~past).any():
+            revenue[key][~past] = projected[key]
+
+    mix = product_mix(year, inventory_config)
+    units = {
+        sku: {key: np.round(revenue[key] * share / mix['aov'][sku]) for key in revenue}
+        for sku, share in mix['shares'].items()
+    }
+    return {'revenue': revenue, 'units': units, 'model': model}
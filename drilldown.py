@@ -0,0 +1,151 @@
+"""
+P&L Drill-Down Index
+Answers "which records drove this number?" for any monthly P&L cell.
+
+The team, OpEx and wholesale calculators return sparse (record x month) contribution
+matrices when asked. This module merges them per P&L line and sorts the entries by
+(month, largest absolute amount first), with offsets marking where each month
+starts. A query for a cell reads one contiguous slice, so drill-downs cost
+O(contributors) and never rerun the model. Lines without a record behind them
+(DTC revenue and COGS come from the demand model) appear as a single model row.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from data_persistence import content_hash
+from financial_calcs import (
+    calculate_team_costs_monthly,
+    calculate_opex_monthly,
+    calculate_wholesale_revenue_monthly,
+)
+
+# Composite P&L lines and the record-level lines they are built from
+LINE_PARTS = {
+    'Team Costs': ['Team Costs'],
+    'Other OpEx': ['Other OpEx'],
+    'Total OpEx': ['Team Costs', 'Other OpEx'],
+    'DTC Revenue': ['DTC Revenue'],
+    'Wholesale Revenue': ['Wholesale Revenue'],
+    'Total Revenue': ['DTC Revenue', 'Wholesale Revenue'],
+    'DTC COGS': ['DTC COGS'],
+    'Wholesale COGS': ['Wholesale COGS'],
+    'Total COGS': ['DTC COGS', 'Wholesale COGS'],
+}
+SOURCES = {
+    'Team Costs': 'Team',
+    'Other OpEx': 'OpEx',
+    'Wholesale Revenue': 'Wholesale',
+    'Wholesale COGS': 'Wholesale',
+    'DTC Revenue': 'DTC model',
+    'DTC COGS': 'DTC model',
+}
+
+
+def _member_name(member: Dict) -> str:
+    name = f"{member.get('first_name', '')} {member.get('last_name', '')}".strip()
+    return f"{name} ({member['title']})" if member.get('title') else name
+
+
+def _deal_name(deal: Dict) -> str:
+    return deal.get('customer_name') or deal.get('club_name') or 'Unnamed deal'
+
+
+def _model_row(monthly_pl: pd.DataFrame, column: str) -> Dict:
+    """Single-record contributions for a P&L column without per-record detail."""
+    values = monthly_pl[column].to_numpy(dtype=float)
+    months = np.flatnonzero(values) + 1
+    return {
+        'ids': [f"model:{column}"],
+        'record': np.zeros(len(months), dtype=np.int64),
+        'month': months,
+        'value': values[months - 1],
+    }
+
+
+def _sorted_line(parts: List[Dict]) -> Dict:
+    """Concatenate contribution parts and sort by month, then by |value| descending."""
+    month = np.concatenate([p['month'] for p in parts])
+    value = np.concatenate([p['value'] for p in parts])
+    part = np.concatenate([np.full(len(p['month']), i) for i, p in enumerate(parts)])
+    record = np.concatenate([p['record'] for p in parts])
+    order = np.lexsort((-np.abs(value), month))
+    month = month[order]
+    return {
+        'part': part[order],
+        'record': record[order],
+        'value': value[order],
+        'offsets': np.searchsorted(month, np.arange(1, 14)),
+    }
+
+
+def build_drilldown_index(year: int, team_members: List[Dict], opex_expenses: List[Dict],
+                          wholesale_deals: List[Dict], monthly_pl: pd.DataFrame = None) -> Dict:
+    """
+    Contributions of every record to every month of `year`, indexed per P&L line.
+    Pass the year's monthly P&L to include the DTC lines as model rows.
+    """
+    _, team = calculate_team_costs_monthly(team_members, year, return_contributions=True)
+    _, opex = calculate_opex_monthly(opex_expenses, year, return_contributions=True)
+    _, _, wholesale = calculate_wholesale_revenue_monthly(wholesale_deals, year, return_contributions=True)
+
+    base = {**team, **opex, **wholesale}
+    names = {
+        'Team Costs': [_member_name(m) for m in team_members],
+        'Other OpEx': [e.get('expense_name', '') for e in opex_expenses],
+        'Wholesale Revenue': [_deal_name(d) for d in wholesale_deals],
+        'Wholesale COGS': [_deal_name(d) for d in wholesale_deals],
+    }
+    if monthly_pl is not None:
+        for column in ('DTC Revenue', 'DTC COGS'):
+            base[column] = _model_row(monthly_pl, column)
+            names[column] = [f"{column} (demand model)"]
+
+    lines = {}
+    for line, part_names in LINE_PARTS.items():
+        part_names = [p for p in part_names if p in base]
+        if part_names:
+            lines[line] = {
+                'parts': part_names,
+                **_sorted_line([base[p] for p in part_names]),
+            }
+    return {'year': year, 'lines': lines, 'base': base, 'names': names}
+
+
+def drilldown_key(year: int, team_members: List[Dict], opex_expenses: List[Dict],
+                  wholesale_deals: List[Dict], monthly_pl: pd.DataFrame = None) -> str:
+    """Cache key for an index: changes whenever any input changes."""
+    pl_part = None if monthly_pl is None else monthly_pl.to_dict('list')
+    return content_hash([year, team_members, opex_expenses, wholesale_deals, pl_part])
+
+
+def top_contributors(index: Dict, line: str, month: int, n: int = 10) -> pd.DataFrame:
+    """
+    Records behind one P&L cell, largest first, with their share of the cell.
+    Reads only the slice of entries for that month.
+    """
+    entry = index['lines'][line]
+    lo, hi = entry['offsets'][month - 1], entry['offsets'][month]
+    total = float(entry['value'][lo:hi].sum())
+    rows = []
+    for k in range(lo, min(hi, lo + n)):
+        part = entry['parts'][entry['part'][k]]
+        record = int(entry['record'][k])
+        value = float(entry['value'][k])
+        rows.append({
+            'Source': SOURCES.get(part, part),
+            'Record': index['names'][part][record],
+            'Record ID': index['base'][part]['ids'][record],
+            'Amount': value,
+            'Share': value / total if total else 0.0,
+        })
+    return pd.DataFrame(rows, columns=['Source', 'Record', 'Record ID', 'Amount', 'Share'])
+
+
+def cell_summary(index: Dict, line: str, month: int) -> Dict:
+    """Total and contributor count for one cell."""
+    entry = index['lines'][line]
+    lo, hi = entry['offsets'][month - 1], entry['offsets'][month]
+    return {'total': float(entry['value'][lo:hi].sum()), 'contributors': int(hi - lo)}
@@ -5,194 +5,154 @@ Integrates team costs, OpEx, wholesale, and DTC revenue
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, date
 from typing import Dict, List, Tuple
 from baseline_data import get_rippling_burdens
+from instrumentation import timed
+from data_persistence import team_member_id, expense_id, deal_id
+import inventory_engine
+import opex_engine
+import record_schema
+import wholesale_pipeline
 
 
-def calculate_team_costs_monthly(team_members: List[Dict], year: int = 2026) -> Dict[int, float]:
+def _contributions(ids: List[str], cells: List[Tuple[int, int, float]]) -> Dict:
+    """
+    Sparse (record x month) contribution matrix in coordinate form: entry k says
+    record ids[record[k]] added value[k] to month[k]. Zero cells are left out.
+    """
+    cells = [c for c in cells if c[2] != 0]
+    return {
+        'ids': ids,
+        'record': np.array([c[0] for c in cells], dtype=np.int64),
+        'month': np.array([c[1] for c in cells], dtype=np.int64),
+        'value': np.array([c[2] for c in cells], dtype=float),
+    }
+
+
+def calculate_team_costs_monthly(team_members: List[Dict], year: int = 2026,
+                                 return_contributions: bool = False, rippling: Dict = None):
     """
     Calculate monthly team costs including Rippling burdens starting May 2026.
     Matches Excel model Team Costs tab formula logic exactly.
+    rippling overrides the baseline burden rates (same keys as get_rippling_burdens).
+
+    Works on the typed columns from record_schema: members without a salary are
+    skipped, a missing or invalid start date counts as January of `year` and an
+    invalid termination date as none.
 
     Returns: Dict of {month: total_cost}
+             with return_contributions: (monthly_costs, {"Team Costs": contributions})
     """
-    monthly_costs = {month: 0.0 for month in range(1, 13)}
-    rippling = get_rippling_burdens()
+    rippling = rippling or get_rippling_burdens()
     pre_rippling_rate = rippling.get('pre_rippling_rate', 0.185)
-
-    for member in team_members:
-        if not member.get('annual_salary'):
-            continue
-
-        monthly_salary = member['annual_salary'] / 12
-
-        # Parse start date
-        start_date_str = member.get('start_date', f'{year}-01-01')
-        try:
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-        except:
-            start_date = date(year, 1, 1)
-
-        # Parse end date if exists
-        end_date = None
-        if member.get('termination_date'):
-            try:
-                end_date = datetime.strptime(member['termination_date'], '%Y-%m-%d').date()
-            except:
-                pass
-
-        # Calculate active months
-        for month in range(1, 13):
-            month_date = date(year, month, 1)
-
-            # Check if employee is active this month
-            if month_date.year == start_date.year and month_date.month < start_date.month:
-                continue
-            if end_date and month_date > end_date:
-                continue
-
-            # Base salary
-            cost = monthly_salary
-
-            # Add burdens (matches Excel formula exactly)
-            if member.get('employment_type') == 'Contractor (1099)':
-                # No burdens for 1099 contractors
-                pass
-            else:
-                # W2 employees get burdens
-                if month >= rippling['start_month']:
-                    # Rippling PEO starts in May
-                    cost += rippling['rippling']      # $137/month
-                    cost += rippling['healthcare']     # $697.91/month
-                    cost += rippling['futa']           # $3.50/month
-                    cost += monthly_salary * rippling['medicare']   # 1.45%
-                    cost += monthly_salary * rippling['soc_secur']  # 6.2%
-                    cost += monthly_salary * rippling['ca_ett']     # 0.1%
-                else:
-                    # Pre-Rippling: flat 18.5% burden rate
-                    cost += monthly_salary * pre_rippling_rate
-
-            monthly_costs[month] += cost
-
+    cols = record_schema.columns('team_members', team_members)
+    months = np.arange(1, 13)
+
+    salary = cols['annual_salary']
+    has_salary = ~np.isnan(salary) & (salary != 0)
+    monthly_salary = np.where(has_salary, salary, 0.0)[:, None] / 12
+
+    # Active: not before the start month (in the start year), not after termination
+    start = cols['start_date']
+    start_year = start.astype('datetime64[Y]').astype(np.int64) + 1970
+    start_month = start.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    not_started = (~np.isnat(start) & (start_year == year))[:, None] & (months[None, :] < start_month[:, None])
+    month_dates = np.arange(f'{year}-01', f'{year + 1}-01', dtype='datetime64[M]').astype('datetime64[D]')
+    end = cols['termination_date']
+    terminated = ~np.isnat(end)[:, None] & (month_dates[None, :] > end[:, None])
+    active = has_salary[:, None] & ~not_started & ~terminated
+
+    # Burdens (matches Excel formula exactly): none for 1099 contractors,
+    # flat pre-Rippling rate before the Rippling PEO starts, then fixed fees plus payroll taxes
+    rippling_cost = (monthly_salary + rippling['rippling'] + rippling['healthcare'] + rippling['futa']
+                     + monthly_salary * rippling['medicare'] + monthly_salary * rippling['soc_secur']
+                     + monthly_salary * rippling['ca_ett'])
+    pre_rippling_cost = monthly_salary + monthly_salary * pre_rippling_rate
+    w2_cost = np.where(months[None, :] >= rippling['start_month'], rippling_cost, pre_rippling_cost)
+    contractor = (cols['employment_type'] == 'Contractor (1099)')[:, None]
+    cost = np.where(active, np.where(contractor, monthly_salary, w2_cost), 0.0)
+
+    totals = cost.sum(axis=0)
+    monthly_costs = {month: float(totals[month - 1]) for month in range(1, 13)}
+
+    if return_contributions:
+        ids = [team_member_id(m) for m in team_members]
+        rows, month_cols = np.nonzero(cost)
+        return monthly_costs, {'Team Costs': {
+            'ids': ids,
+            'record': rows,
+            'month': month_cols + 1,
+            'value': cost[rows, month_cols],
+        }}
     return monthly_costs
 
 
-def calculate_opex_monthly(opex_expenses: List[Dict], year: int = 2026) -> Dict[int, float]:
+def calculate_opex_monthly(opex_expenses: List[Dict], year: int = 2026,
+                           return_contributions: bool = False):
     """
     Calculate monthly OpEx costs.
     Supports 'Custom Monthly' items with per-month values (from Matt Econ Roadmap)
     as well as Monthly, Quarterly, Annual, and One-Time frequencies.
 
+    Slices one year out of the multi-year matrix compiled by opex_engine, so
+    recurring expenses continue past their start year, 'Custom Monthly' values are
+    anchored at the start date and growth_rate compounds each year.
+
     Returns: Dict of {month: total_cost}
+             with return_contributions: (monthly_costs, {"Other OpEx": contributions})
     """
-    monthly_costs = {month: 0.0 for month in range(1, 13)}
-
-    for expense in opex_expenses:
-        frequency = expense.get('frequency', 'Monthly')
-
-        # Custom Monthly: each month has its own value (from baseline_data)
-        if frequency == 'Custom Monthly':
-            monthly_vals = expense.get('monthly_values', [])
-            for month in range(1, 13):
-                if month - 1 < len(monthly_vals):
-                    monthly_costs[month] += monthly_vals[month - 1]
-            continue
-
-        amount = expense.get('monthly_amount', 0) or expense.get('annual_cost', 0) / 12
-
-        # Parse start date
-        start_date_str = expense.get('start_date', f'{year}-01-01')
-        try:
-            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-        except:
-            start_date = date(year, 1, 1)
-
-        # Parse end date if exists
-        end_date = None
-        if expense.get('end_date'):
-            try:
-                end_date = datetime.strptime(expense['end_date'], '%Y-%m-%d').date()
-            except:
-                pass
-
-        # Allocate to months based on frequency
-        if frequency == 'Monthly':
-            for month in range(1, 13):
-                month_date = date(year, month, 1)
-                if month_date.year == start_date.year and month_date.month >= start_date.month:
-                    if not end_date or month_date <= end_date:
-                        monthly_costs[month] += amount
-
-        elif frequency == 'Quarterly':
-            for month in [3, 6, 9, 12]:
-                month_date = date(year, month, 1)
-                if month_date >= start_date:
-                    if not end_date or month_date <= end_date:
-                        monthly_costs[month] += amount * 3
-
-        elif frequency == 'Annual':
-            annual_amount = expense.get('annual_cost', amount * 12)
-            for month in range(1, 13):
-                month_date = date(year, month, 1)
-                if month_date >= start_date:
-                    if not end_date or month_date <= end_date:
-                        monthly_costs[month] += annual_amount / 12
-
-        elif frequency == 'One-Time':
-            if start_date.year == year:
-                monthly_costs[start_date.month] += amount
-
-    return monthly_costs
-
-
-def calculate_wholesale_revenue_monthly(deals: List[Dict], year: int = 2026) -> Tuple[Dict[int, float], Dict[int, float]]:
+    monthly_costs = opex_engine.monthly_totals(opex_expenses, year)
+    if not return_contributions:
+        return monthly_costs
+    ids = [expense_id(e) for e in opex_expenses]
+    if not opex_expenses:
+        return monthly_costs, {'Other OpEx': _contributions(ids, [])}
+    block = opex_engine.opex_for_year(opex_expenses, year)
+    rows, cols = np.nonzero(block)
+    return monthly_costs, {'Other OpEx': {
+        'ids': ids,
+        'record': rows,
+        'month': cols + 1,
+        'value': block[rows, cols],
+    }}
+
+
+def calculate_wholesale_revenue_monthly(deals: List[Dict], year: int = 2026,
+                                        return_contributions: bool = False):
     """
     Calculate monthly wholesale revenue and COGS
     
+    Revenue is recognized in the month of the delivery date (else the close date)
+    read from record_schema's typed columns; deals with neither are left out.
+    COGS is total_cost when given, else revenue x the COGS rates.
+    
     Returns: (revenue_dict, cogs_dict) where each is {month: amount}
+             with return_contributions: (revenue_dict, cogs_dict,
+             {"Wholesale Revenue": contributions, "Wholesale COGS": contributions})
     """
-    monthly_revenue = {month: 0.0 for month in range(1, 13)}
-    monthly_cogs = {month: 0.0 for month in range(1, 13)}
-    
-    for deal in deals:
-        # Parse delivery date (revenue recognition date)
-        delivery_date_str = deal.get('delivery_date') or deal.get('close_date')
-        if not delivery_date_str:
-            continue
-        
-        try:
-            delivery_date = datetime.strptime(delivery_date_str, '%Y-%m-%d').date()
-        except:
-            continue
-        
-        if delivery_date.year != year:
-            continue
-        
-        # Calculate revenue
-        num_pairs = deal.get('num_pairs', 0)
-        wholesale_price = deal.get('wholesale_price', 0)
-        revenue = num_pairs * wholesale_price
-        
-        # Calculate COGS
-        if 'total_cost' in deal:
-            # Use client-provided total cost
-            cogs = deal['total_cost']
-        else:
-            # Calculate from COGS components
-            cogs_product = deal.get('cogs_product', 0.25)
-            cogs_warehousing = deal.get('cogs_warehousing', 0.06)
-            cogs_freight = deal.get('cogs_freight', 0.06)
-            cogs_merchant = deal.get('cogs_merchant', 0.03)
-            
-            total_cogs_rate = cogs_product + cogs_warehousing + cogs_freight + cogs_merchant
-            cogs = revenue * total_cogs_rate
-        
-        # Add to month
-        month = delivery_date.month
-        monthly_revenue[month] += revenue
-        monthly_cogs[month] += cogs
+    cols = record_schema.columns('wholesale_deals', deals)
+    delivery = wholesale_pipeline.delivery_dates(cols)
+    in_year = ~np.isnat(delivery) & (delivery.astype('datetime64[Y]').astype(np.int64) + 1970 == year)
+    month = delivery.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    revenue, cogs = wholesale_pipeline.deal_values(cols)
+
+    rows = np.flatnonzero(in_year)
+    revenue_totals = np.bincount(month[rows], weights=revenue[rows], minlength=13)
+    cogs_totals = np.bincount(month[rows], weights=cogs[rows], minlength=13)
+    monthly_revenue = {m: float(revenue_totals[m]) for m in range(1, 13)}
+    monthly_cogs = {m: float(cogs_totals[m]) for m in range(1, 13)}
     
+    if return_contributions:
+        ids = [deal_id(d) for d in deals]
+
+        def contributions(values):
+            keep = rows[values[rows] != 0]
+            return {'ids': ids, 'record': keep, 'month': month[keep], 'value': values[keep]}
+
+        return monthly_revenue, monthly_cogs, {
+            'Wholesale Revenue': contributions(revenue),
+            'Wholesale COGS': contributions(cogs),
+        }
     return monthly_revenue, monthly_cogs
 
 
@@ -257,6 +217,27 @@ def calculate_dtc_revenue_monthly(year: int = 2026, discount_rate: float = 0.0,
     return monthly_revenue, monthly_cogs
 
 
+def calculate_dtc_revenue_from_units(dtc_demand: Dict[str, List[float]], discount_rate: float = 0.0,
+                                     return_rate: float = 0.0, beta_aov: float = 250, alpha_aov: float = 450,
+                                     cogs_rate: float = 0.40) -> Tuple[Dict[int, float], Dict[int, float]]:
+    """
+    Monthly DTC revenue and COGS for given unit demand ({"Beta": [12], "Alpha": [12]},
+    e.g. from cohort_model), with the same discount, returns and COGS treatment as
+    calculate_dtc_revenue_monthly.
+
+    Returns: (revenue_dict, cogs_dict)
+    """
+    monthly_revenue = {month: 0.0 for month in range(1, 13)}
+    monthly_cogs = {month: 0.0 for month in range(1, 13)}
+    beta = dtc_demand.get("Beta", [0] * 12)
+    alpha = dtc_demand.get("Alpha", [0] * 12)
+    for month in range(1, 13):
+        gross_revenue = beta[month - 1] * beta_aov + alpha[month - 1] * alpha_aov
+        monthly_revenue[month] = gross_revenue * (1 - discount_rate) * (1 - return_rate)
+        monthly_cogs[month] = gross_revenue * cogs_rate
+    return monthly_revenue, monthly_cogs
+
+
 def get_cogs_breakdown(revenue: float, year: int = 2026, channel: str = 'DTC') -> Dict[str, float]:
     """
     Get COGS breakdown by component
@@ -318,47 +299,17 @@ def calculate_po_arrivals(po_data: List[Dict], lead_time: int, year: int) -> Dic
     """Calculate monthly PO arrivals by product for a given year.
     Returns {"Beta": {1:0, 2:2000, ...}, "Alpha": {1:0, ...}}
     """
-    arrivals = {"Beta": {m: 0 for m in range(1, 13)}, "Alpha": {m: 0 for m in range(1, 13)}}
-    year_offset = (year - 2026) * 12  # 0 for 2026, 12 for 2027
-
-    for po in po_data:
-        pairs = po.get('pairs', 0)
-        if pairs <= 0:
-            continue
-        arrival_abs = (po['order_year'] - 2026) * 12 + po['order_month'] + lead_time
-        # Check if arrival falls in target year (1-12 for 2026, 13-24 for 2027)
-        month_in_year = arrival_abs - year_offset
-        if 1 <= month_in_year <= 12:
-            product = po.get('product', 'Beta')
-            if product in arrivals:
-                arrivals[product][month_in_year] += pairs
-
-    return arrivals
+    matrix = inventory_engine.po_arrival_matrix(po_data, lead_time, year)
+    return inventory_engine.matrix_to_dict(matrix, inventory_engine.DEFAULT_SKUS)
 
 
 def calculate_ws_shipments(wholesale_deals: List[Dict], year: int) -> Dict[str, Dict[int, int]]:
     """Calculate monthly wholesale shipments by product for a given year."""
-    shipments = {"Beta": {m: 0 for m in range(1, 13)}, "Alpha": {m: 0 for m in range(1, 13)}}
-
-    for deal in wholesale_deals:
-        delivery_str = deal.get('delivery_date') or deal.get('close_date')
-        if not delivery_str:
-            continue
-        try:
-            delivery_date = datetime.strptime(delivery_str, '%Y-%m-%d').date()
-        except:
-            continue
-        if delivery_date.year != year:
-            continue
-
-        pairs = deal.get('num_pairs', 0)
-        product = deal.get('product_type', 'Beta')
-        if product in shipments:
-            shipments[product][delivery_date.month] += pairs
-
-    return shipments
+    matrix = inventory_engine.ws_shipment_matrix(wholesale_deals, year)
+    return inventory_engine.matrix_to_dict(matrix, inventory_engine.DEFAULT_SKUS)
 
 
+@timed()
 def calculate_inventory_balance(
     po_data: List[Dict],
     wholesale_deals: List[Dict],
@@ -375,55 +326,11 @@ def calculate_inventory_balance(
                   "demand":[...], "dtc_sales":[...], "ending":[...]},
          "Alpha": {...}}
     """
-    arrivals = calculate_po_arrivals(po_data, lead_time, year)
-    shipments = calculate_ws_shipments(wholesale_deals, year)
-
-    result = {}
-    for product in ["Beta", "Alpha"]:
-        begin_list = []
-        arrive_list = []
-        ws_list = []
-        avail_list = []
-        demand_list = []
-        dtc_list = []
-        end_list = []
-
-        for m in range(1, 13):
-            # Beginning inventory
-            if m == 1:
-                if prior_ending and product in prior_ending:
-                    begin = prior_ending[product]
-                else:
-                    begin = beg_inv.get(product, 0)
-            else:
-                begin = end_list[-1]
-
-            arrive = arrivals[product].get(m, 0)
-            ws = shipments[product].get(m, 0)
-            available = begin + arrive - ws
-            demand = dtc_demand.get(product, [0]*12)[m - 1]
-            dtc_sales = min(demand, max(available, 0))
-            ending = available - dtc_sales
-
-            begin_list.append(begin)
-            arrive_list.append(arrive)
-            ws_list.append(ws)
-            avail_list.append(available)
-            demand_list.append(demand)
-            dtc_list.append(dtc_sales)
-            end_list.append(ending)
-
-        result[product] = {
-            "begin": begin_list,
-            "arrive": arrive_list,
-            "ws": ws_list,
-            "available": avail_list,
-            "demand": demand_list,
-            "dtc_sales": dtc_list,
-            "ending": end_list,
-        }
-
-    return result
+    skus, result = inventory_engine.inventory_balance(
+        po_data, wholesale_deals, lead_time, beg_inv, dtc_demand, year,
+        prior_ending=prior_ending,
+    )
+    return inventory_engine.balance_to_dict(result, skus)
 
 
 def calculate_constrained_dtc_revenue(
@@ -455,21 +362,17 @@ def calculate_po_payments(
     Payment hits cash at: order_month + lead_time + payment_terms (in absolute months).
     Returns {1:0, 2:0, ..., 12:amount}
     """
-    payments = {m: 0.0 for m in range(1, 13)}
-    year_offset = (year - 2026) * 12
-
-    for po in po_data:
-        amount = po.get('amount', 0)
-        if amount <= 0:
-            continue
-        payment_abs = (po['order_year'] - 2026) * 12 + po['order_month'] + lead_time + payment_terms
-        month_in_year = payment_abs - year_offset
-        if 1 <= month_in_year <= 12:
-            payments[month_in_year] += amount
-
-    return payments
+    cols = record_schema.columns('po_data', po_data)
+    amount = record_schema.filled(cols['amount'], 0)
+    order = inventory_engine.order_months(cols)
+    dated = order != inventory_engine.NO_MONTH
+    month_in_year = np.where(dated, order, 0) + lead_time + payment_terms - (year - 2026) * 12
+    rows = np.flatnonzero(dated & (amount > 0) & (month_in_year >= 1) & (month_in_year <= 12))
+    totals = np.bincount(month_in_year[rows], weights=amount[rows], minlength=13)
+    return {m: float(totals[m]) for m in range(1, 13)}
 
 
+@timed()
 def generate_monthly_pl(
     year: int,
     team_members: List[Dict],
@@ -480,12 +383,15 @@ def generate_monthly_pl(
     po_data: List[Dict] = None,
     inventory_config: Dict = None,
     prior_ending_inv: Dict[str, int] = None,
+    dtc_demand: Dict[str, List[float]] = None,
 ) -> pd.DataFrame:
     """
     Generate complete monthly P&L integrating all data sources.
 
     When po_data and inventory_config are provided, DTC revenue is constrained
     by available inventory and DTC Gross Revenue is included for cash flow split.
+    dtc_demand replaces the plan's DTC units ({"Beta": [12], "Alpha": [12]}, e.g.
+    cohort_model.dtc_demand) in either mode.
 
     Returns: DataFrame with monthly P&L
     """
@@ -503,7 +409,8 @@ def generate_monthly_pl(
             "Beta": inventory_config.get('beg_inv_beta', 0),
             "Alpha": inventory_config.get('beg_inv_alpha', 0),
         }
-        dtc_demand = get_dtc_demand_units(year)
+        if dtc_demand is None:
+            dtc_demand = get_dtc_demand_units(year)
         inv_balance = calculate_inventory_balance(
             po_data, wholesale_deals, lead_time, beg_inv, dtc_demand, year,
             prior_ending=prior_ending_inv,
@@ -518,6 +425,9 @@ def generate_monthly_pl(
         dtc_gross_revenue = constr_rev["gross"]
         cogs_rate = inventory_config.get('cogs_total_rate', 0.40)
         dtc_cogs = {m: dtc_gross_revenue[m] * cogs_rate for m in range(1, 13)}
+    elif dtc_demand is not None:
+        dtc_revenue, dtc_cogs = calculate_dtc_revenue_from_units(dtc_demand, dtc_discount_rate, dtc_return_rate)
+        dtc_gross_revenue = None
     else:
         dtc_revenue, dtc_cogs = calculate_dtc_revenue_monthly(year, dtc_discount_rate, dtc_return_rate)
         dtc_gross_revenue = None
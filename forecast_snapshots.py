@@ -0,0 +1,170 @@
+"""
+Forecast Snapshots
+Frozen, versioned copies of the forecast for "actuals vs. the March board forecast".
+
+A snapshot stores the computed P&L and cash runway as dense (metric x month) float
+arrays under a version tag, together with the inputs that produced them. Inputs are
+stored once per content hash (inputs/<digest>.json) and the arrays once per year and
+input digest (arrays/<year>_<digest>.npz), so tagging an unchanged forecast again
+adds only an index entry. Variance against any version is a subtraction against the
+stored arrays; old model states are never recomputed.
+
+Layout under the entity's data directory:
+  snapshots/index.json           tag, created, note, year, input digest per version
+  snapshots/inputs/<digest>.json model inputs (DataStore.load_model_inputs keys)
+  snapshots/arrays/<year>_<digest>.npz
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+import variance_engine
+from consolidation import compute_entity
+from data_persistence import DataStore, content_hash
+
+SNAPSHOT_DIR = "snapshots"
+# Model inputs frozen with each snapshot (same keys as DataStore.load_model_inputs)
+INPUT_KEYS = ['team_members', 'opex_expenses', 'wholesale_deals', 'assumptions',
+              'qbo_actuals', 'fundraising_rounds', 'po_data', 'inventory_config']
+
+
+class SnapshotStore:
+    """Versioned forecast snapshots for one entity's data directory."""
+
+    def __init__(self, data_dir: str = "data", use_baseline: bool = True):
+        self.root = os.path.join(data_dir, SNAPSHOT_DIR)
+        self.use_baseline = use_baseline
+        self.index_file = os.path.join(self.root, "index.json")
+        for sub in ("inputs", "arrays"):
+            os.makedirs(os.path.join(self.root, sub), exist_ok=True)
+
+    @classmethod
+    def for_store(cls, store: DataStore) -> 'SnapshotStore':
+        return cls(store.data_dir, store.use_baseline)
+
+    # Index
+    def list_snapshots(self) -> List[Dict]:
+        """Index entries, oldest first: {"tag", "created", "note", "year", "inputs"}"""
+        if not os.path.exists(self.index_file):
+            return []
+        with open(self.index_file, 'r') as f:
+            return json.load(f).get('snapshots', [])
+
+    def _write_index(self, entries: List[Dict]):
+        with open(self.index_file, 'w') as f:
+            json.dump({'snapshots': entries, 'last_updated': datetime.now().isoformat()}, f, indent=2)
+
+    def _entry(self, tag: str) -> Dict:
+        for entry in self.list_snapshots():
+            if entry['tag'] == tag:
+                return entry
+        raise KeyError(f"No snapshot tagged '{tag}'")
+
+    def _arrays_file(self, year: int, digest: str) -> str:
+        return os.path.join(self.root, "arrays", f"{year}_{digest}.npz")
+
+    def _inputs_file(self, digest: str) -> str:
+        return os.path.join(self.root, "inputs", f"{digest}.json")
+
+    # Save / load
+    def save(self, tag: str, inputs: Dict, year: int = 2026, note: str = "") -> Dict:
+        """
+        Compute the forecast for `inputs` and freeze it under `tag`. Inputs and arrays
+        already stored under the same digest are reused. Returns the index entry.
+        """
+        tag = tag.strip()
+        if not tag:
+            raise ValueError("Snapshot tag is required")
+        entries = self.list_snapshots()
+        if any(entry['tag'] == tag for entry in entries):
+            raise ValueError(f"Snapshot '{tag}' already exists")
+
+        inputs = {key: inputs.get(key) for key in INPUT_KEYS}
+        digest = content_hash(inputs)
+        if not os.path.exists(self._inputs_file(digest)):
+            with open(self._inputs_file(digest), 'w') as f:
+                json.dump(inputs, f, separators=(',', ':'), default=str)
+        if not os.path.exists(self._arrays_file(year, digest)):
+            result = compute_entity(inputs, year, self.use_baseline)
+            pl_metrics, pl = _to_array(result['pl'])
+            runway_metrics, runway = _to_array(result['runway'])
+            np.savez_compressed(self._arrays_file(year, digest),
+                                months=result['pl']['Month'].to_numpy(dtype=str),
+                                pl_metrics=np.array(pl_metrics), pl=pl,
+                                runway_metrics=np.array(runway_metrics), runway=runway)
+
+        entry = {'tag': tag, 'created': datetime.now().isoformat(timespec='seconds'),
+                 'note': note, 'year': year, 'inputs': digest}
+        self._write_index(entries + [entry])
+        return entry
+
+    def load(self, tag: str) -> Dict:
+        """
+        Stored arrays for one version.
+
+        Returns: {"tag", "year", "created", "note", "inputs" (digest), "months",
+                  "pl_metrics", "pl" (metric x month), "runway_metrics", "runway"}
+        """
+        entry = self._entry(tag)
+        with np.load(self._arrays_file(entry['year'], entry['inputs'])) as arrays:
+            return {**entry,
+                    'months': arrays['months'].tolist(),
+                    'pl_metrics': arrays['pl_metrics'].tolist(), 'pl': arrays['pl'],
+                    'runway_metrics': arrays['runway_metrics'].tolist(), 'runway': arrays['runway']}
+
+    def load_inputs(self, tag: str) -> Dict:
+        """The model inputs a version was computed from."""
+        with open(self._inputs_file(self._entry(tag)['inputs']), 'r') as f:
+            return json.load(f)
+
+    def delete(self, tag: str):
+        """Remove a version; its inputs and arrays go once no other version uses them."""
+        entry = self._entry(tag)
+        remaining = [e for e in self.list_snapshots() if e['tag'] != tag]
+        self._write_index(remaining)
+        if not any(e['inputs'] == entry['inputs'] and e['year'] == entry['year'] for e in remaining):
+            os.remove(self._arrays_file(entry['year'], entry['inputs']))
+        if not any(e['inputs'] == entry['inputs'] for e in remaining):
+            os.remove(self._inputs_file(entry['inputs']))
+
+
+def _to_array(df: pd.DataFrame):
+    """(numeric column names, metric x month float array) for a monthly frame."""
+    metrics = [c for c in df.columns if c != 'Month' and pd.api.types.is_numeric_dtype(df[c])]
+    return metrics, df[metrics].to_numpy(dtype=float).T
+
+
+# ============================================================
+# VARIANCE
+# ============================================================
+
+def frame(snapshot: Dict, kind: str = 'pl') -> pd.DataFrame:
+    """A stored P&L or runway as a monthly DataFrame (Month column plus metrics)."""
+    df = pd.DataFrame(snapshot[kind].T, columns=snapshot[f'{kind}_metrics'])
+    df.insert(0, 'Month', snapshot['months'])
+    return df
+
+
+def variance_vs_actuals(snapshot: Dict, actual_df: pd.DataFrame, closed: int) -> pd.DataFrame:
+    """variance_engine variances of actuals against a stored version's P&L."""
+    return variance_engine.analyze(actual_df, frame(snapshot, 'pl'), closed)
+
+
+def compare(old: Dict, new: Dict, kind: str = 'pl') -> pd.DataFrame:
+    """
+    Change from one version to another (new - old) for every metric both store.
+    Returns a (metric x month) DataFrame; P&L comparisons add a full-year Total column.
+    """
+    old_rows = {m: i for i, m in enumerate(old[f'{kind}_metrics'])}
+    metrics = [m for m in new[f'{kind}_metrics'] if m in old_rows]
+    new_rows = {m: i for i, m in enumerate(new[f'{kind}_metrics'])}
+    diff = new[kind][[new_rows[m] for m in metrics]] - old[kind][[old_rows[m] for m in metrics]]
+    out = pd.DataFrame(diff, index=metrics, columns=new['months'])
+    if kind == 'pl':
+        out['Total'] = diff.sum(axis=1)
+    return out
@@ -0,0 +1,162 @@
+"""
+Goal Seek
+Solve for the parameter value that makes a model output hit a target.
+
+Questions like "how much must we raise in month X to keep cash above $Y" or "what
+Beta AOV breaks even on Q4 EBITDA" are monotone in one parameter. solve() brackets
+the answer and narrows it with a batched search: each round evaluates a grid of
+candidates plus a secant estimate in a single scenario_model pass, so a linear
+target (funding vs. cash) resolves in one or two rounds and a non-linear one
+(AOV through the inventory constraint) in a handful. The year's scenario base
+comes from the shared fingerprint cache, so repeated solves on unchanged inputs
+skip the record-level calculators entirely.
+"""
+
+from typing import Callable, Dict, List
+
+import numpy as np
+
+import scenario_model
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+QUARTER_MONTHS = {1: (1, 2, 3), 2: (4, 5, 6), 3: (7, 8, 9), 4: (10, 11, 12)}
+
+DEFAULT_CANDIDATES = 8
+MAX_ROUNDS = 25
+MAX_EXPANSIONS = 4
+
+
+def _evaluate(base: Dict, base_params: Dict, param: str, values: np.ndarray,
+              metric: Callable[[Dict], np.ndarray]) -> np.ndarray:
+    """Metric for each candidate value of one parameter, in one batched pass."""
+    results = scenario_model.evaluate_scenarios(base, {**base_params, param: values})
+    return np.asarray(metric(results), dtype=float)
+
+
+def solve(base: Dict, base_params: Dict, param: str, metric: Callable[[Dict], np.ndarray],
+          target: float, lo: float, hi: float, tol: float = 1.0,
+          n_candidates: int = DEFAULT_CANDIDATES, max_rounds: int = MAX_ROUNDS) -> Dict:
+    """
+    Smallest value of `param` in [lo, hi] with metric >= target, for a metric that is
+    monotone in the parameter (either direction; decreasing metrics return the
+    largest value still meeting the target). `hi` is doubled, in one batch, if the
+    target is not reached inside the bracket.
+
+    Returns: {"status": "solved" | "already_met" | "unreachable", "value", "metric",
+              "evaluations", "rounds"}
+    """
+    ends = _evaluate(base, base_params, param, np.array([lo, hi], dtype=float), metric)
+    evaluations = 2
+    sign = 1.0 if ends[1] >= ends[0] else -1.0
+    # g = metric - target rises from the `bad` end to the `good` end; g >= 0 meets the target
+    g_lo, g_hi = ends - target
+    bad, g_bad, good, g_good = (lo, g_lo, hi, g_hi) if sign > 0 else (hi, g_hi, lo, g_lo)
+
+    if g_bad >= 0:
+        return {'status': 'already_met', 'value': float(bad), 'metric': float(target + g_bad),
+                'evaluations': evaluations, 'rounds': 0}
+
+    if g_good < 0 and sign > 0:
+        # Widen upwards in one pass: the bracket's width doubled, quadrupled, ...
+        wider = hi + max(hi - lo, tol) * (2.0 ** np.arange(1, MAX_EXPANSIONS + 1) - 1)
+        g_wide = _evaluate(base, base_params, param, wider, metric) - target
+        evaluations += len(wider)
+        met = np.flatnonzero(g_wide >= 0)
+        if not len(met):
+            return {'status': 'unreachable', 'value': None, 'metric': float(target + g_wide[-1]),
+                    'evaluations': evaluations, 'rounds': 0}
+        k = met[0]
+        bad, g_bad = (hi, g_hi) if k == 0 else (wider[k - 1], g_wide[k - 1])
+        good, g_good = wider[k], g_wide[k]
+    elif g_good < 0:
+        return {'status': 'unreachable', 'value': None, 'metric': float(target + g_good),
+                'evaluations': evaluations, 'rounds': 0}
+
+    rounds = 0
+    while abs(good - bad) > tol and rounds < max_rounds:
+        rounds += 1
+        # Secant estimate of the crossing, and the point one tolerance short of it
+        secant = bad + (good - bad) * (-g_bad) / (g_good - g_bad) if g_good != g_bad else good
+        step = tol if good > bad else -tol
+        grid = np.linspace(bad, good, n_candidates + 2)[1:-1]
+        candidates = np.concatenate([grid, [secant, secant - step]])
+        g = _evaluate(base, base_params, param, candidates, metric) - target
+        evaluations += len(candidates)
+
+        # Narrowest interval between a failing and a passing candidate
+        points = np.concatenate([[bad], candidates, [good]])
+        scores = np.concatenate([[g_bad], g, [g_good]])
+        order = np.argsort(points) if good > bad else np.argsort(-points)
+        points, scores = points[order], scores[order]
+        first_met = np.flatnonzero(scores >= 0)[0]
+        bad, g_bad = points[first_met - 1], scores[first_met - 1]
+        good, g_good = points[first_met], scores[first_met]
+
+    return {'status': 'solved', 'value': float(good), 'metric': float(target + g_good),
+            'evaluations': evaluations, 'rounds': rounds}
+
+
+# ============================================================
+# COMMON QUESTIONS
+# ============================================================
+
+def cash_metric(from_month: int = 1) -> Callable[[Dict], np.ndarray]:
+    """Lowest month-end cash from `from_month` through December, per scenario."""
+    return lambda results: results['ending_cash'][:, from_month - 1:].min(axis=1)
+
+
+def ebitda_metric(months: List[int]) -> Callable[[Dict], np.ndarray]:
+    """Total EBITDA over the given months, per scenario."""
+    cols = [m - 1 for m in months]
+    return lambda results: results['ebitda'][:, cols].sum(axis=1)
+
+
+def minimum_fundraise(base: Dict, base_params: Dict, month: int, cash_floor: float = 0.0,
+                      tol: float = 100.0) -> Dict:
+    """
+    Smallest extra raise landing in `month` that keeps month-end cash at or above
+    cash_floor for the whole year. Unreachable when cash already dips below the
+    floor before the money arrives.
+    """
+    params = {**base_params, 'extra_funding_month': month}
+    current = scenario_model.evaluate_scenarios(base, params)
+    before = current['ending_cash'][0, :month - 1]
+    if len(before) and before.min() < cash_floor:
+        short = int(np.argmin(before)) + 1
+        return {'status': 'unreachable', 'value': None, 'metric': float(before.min()),
+                'evaluations': 1, 'rounds': 0,
+                'reason': f"Cash is already below the floor in {MONTHS[short - 1]}, before the raise"}
+
+    gap = max(cash_floor - float(current['ending_cash'][0].min()), 0.0)
+    result = solve(base, params, 'extra_funding', cash_metric(1), cash_floor,
+                   0.0, max(gap * 1.25, tol), tol=tol)
+    result['evaluations'] += 1
+    return result
+
+
+def breakeven_value(base: Dict, base_params: Dict, param: str = 'beta_aov', months: List[int] = None,
+                    lo: float = None, hi: float = None, tol: float = 0.01) -> Dict:
+    """
+    Value of `param` (an AOV by default) at which EBITDA over `months` (Q4 by
+    default) reaches zero. The search bracket defaults to 0 .. 3x the current value.
+    """
+    months = list(months or QUARTER_MONTHS[4])
+    current = base_params[param]
+    lo = 0.0 if lo is None else lo
+    hi = max(current * 3, 1.0) if hi is None else hi
+    return solve(base, base_params, param, ebitda_metric(months), 0.0, lo, hi, tol=tol)
+
+
+def cash_zero_month(base: Dict, base_params: Dict, threshold: float = 0.0) -> Dict:
+    """
+    First month whose month-end cash falls below threshold, read off one model
+    evaluation. Returns: {"month": 1-12 or None, "ending_cash", "min_cash"}
+    """
+    ending = scenario_model.evaluate_scenarios(base, base_params)['ending_cash'][0]
+    below = np.flatnonzero(ending < threshold)
+    return {
+        'month': int(below[0]) + 1 if len(below) else None,
+        'ending_cash': ending,
+        'min_cash': float(ending.min()),
+    }
@@ -0,0 +1,130 @@
+"""
+Instrumentation Module
+Lightweight timing spans for the hot paths of a page render.
+
+Spans are collected into a RenderTrace for the current Streamlit rerun (each session
+reruns on its own thread, so the active trace is thread-local). Outside a render the
+spans are still timed and passed to listeners, but nothing is recorded.
+"""
+
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+_local = threading.local()
+_listeners: List[Callable[[str, float], None]] = []
+
+
+class RenderTrace:
+    """All spans recorded during one page render."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started_at = datetime.now().isoformat()
+        self.duration_ms = None
+        self.spans: List[Dict] = []
+        self._t0 = time.perf_counter()
+        self._stack: List[int] = []
+
+    def _open(self, name: str) -> int:
+        idx = len(self.spans)
+        self.spans.append({
+            'name': name,
+            'start_ms': (time.perf_counter() - self._t0) * 1000,
+            'duration_ms': None,
+            'depth': len(self._stack),
+            'parent': self._stack[-1] if self._stack else None,
+        })
+        self._stack.append(idx)
+        return idx
+
+    def _close(self, idx: int, seconds: float):
+        self.spans[idx]['duration_ms'] = seconds * 1000
+        if self._stack and self._stack[-1] == idx:
+            self._stack.pop()
+
+    def finish(self):
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000
+
+    def summary(self) -> List[Dict]:
+        """Aggregate spans by name, slowest total first."""
+        agg = {}
+        for s in self.spans:
+            if s['duration_ms'] is None:
+                continue
+            row = agg.setdefault(s['name'], {'Span': s['name'], 'Calls': 0, 'Total (ms)': 0.0, 'Max (ms)': 0.0})
+            row['Calls'] += 1
+            row['Total (ms)'] += s['duration_ms']
+            row['Max (ms)'] = max(row['Max (ms)'], s['duration_ms'])
+        return sorted(agg.values(), key=lambda r: r['Total (ms)'], reverse=True)
+
+    def to_dict(self) -> Dict:
+        return {
+            'page': self.page,
+            'started_at': self.started_at,
+            'duration_ms': self.duration_ms,
+            'spans': self.spans,
+            'summary': self.summary(),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+
+def add_listener(listener: Callable[[str, float], None]):
+    """Register a callback invoked as listener(span_name, seconds) for every finished span."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def start_render(page: str) -> RenderTrace:
+    """Begin collecting spans for a page render on this thread."""
+    trace = RenderTrace(page)
+    _local.trace = trace
+    return trace
+
+
+def end_render() -> Optional[RenderTrace]:
+    """Stop collecting and return the finished trace for this thread."""
+    trace = getattr(_local, 'trace', None)
+    _local.trace = None
+    if trace is not None:
+        trace.finish()
+    return trace
+
+
+def current_trace() -> Optional[RenderTrace]:
+    return getattr(_local, 'trace', None)
+
+
+@contextmanager
+def span(name: str):
+    """Time a block of code: `with span('figure.cash_balance'): ...`"""
+    trace = getattr(_local, 'trace', None)
+    idx = trace._open(name) if trace is not None else None
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - t0
+        if trace is not None:
+            trace._close(idx, seconds)
+        for listener in _listeners:
+            listener(name, seconds)
+
+
+def timed(name: str = None):
+    """Decorator form of span(). Defaults the span name to module.qualname."""
+    def decorator(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
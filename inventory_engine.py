@@ -0,0 +1,269 @@
+"""
+Inventory Engine
+SKU-generic inventory simulation over (sku x month) NumPy arrays.
+
+PO arrivals and wholesale shipments are bucketed into months with np.bincount from
+absolute month indices ((year - 2026) * 12 + month), and the clamped DTC sell-through
+recurrence runs for every SKU at once. simulate_inventory_batch extends the same
+recurrence over leading scenario axes to evaluate many PO plans or demand scenarios
+in one call. The two-product functions in financial_calcs delegate here and return
+exactly the same numbers as before.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+import record_schema
+import wholesale_pipeline
+
+DEFAULT_SKUS = ("Beta", "Alpha")
+BASE_YEAR = 2026
+# Absolute month of a missing or invalid date; outside every real month
+NO_MONTH = np.iinfo(np.int64).min
+
+# Row names of a simulation result, in display order
+BALANCE_ROWS = ("begin", "arrive", "ws", "available", "demand", "dtc_sales", "ending")
+
+
+def month_index(year: int, month: int) -> int:
+    """Absolute month number: Jan 2026 = 1, Jan 2027 = 13."""
+    return (year - BASE_YEAR) * 12 + month
+
+
+def discover_skus(po_data: List[Dict] = (), wholesale_deals: List[Dict] = (),
+                  dtc_demand: Dict[str, List] = None) -> List[str]:
+    """All SKUs referenced by POs, deals or demand, the default products first."""
+    skus = list(DEFAULT_SKUS)
+    seen = set(skus)
+    names = [po.get('product', 'Beta') for po in po_data]
+    names += [d.get('product_type', 'Beta') for d in wholesale_deals]
+    names += list(dtc_demand or {})
+    for name in names:
+        if name not in seen:
+            seen.add(name)
+            skus.append(name)
+    return skus
+
+
+def bucket_by_month(sku_idx: np.ndarray, abs_month: np.ndarray, qty: np.ndarray,
+                    n_skus: int, year: int, n_months: int = 12) -> np.ndarray:
+    """
+    Sum quantities into an (n_skus x n_months) matrix starting at January of `year`.
+    Rows with sku_idx < 0, no month (NO_MONTH) or a month outside the window are dropped.
+    """
+    abs_month = np.asarray(abs_month, dtype=np.int64)
+    dated = abs_month != NO_MONTH
+    col = np.where(dated, abs_month, 0) - month_index(year, 1)
+    sku_idx = np.asarray(sku_idx, dtype=np.int64)
+    keep = dated & (sku_idx >= 0) & (col >= 0) & (col < n_months)
+    flat = sku_idx[keep] * n_months + col[keep]
+    weights = np.asarray(qty, dtype=float)[keep]
+    return np.bincount(flat, weights=weights, minlength=n_skus * n_months).reshape(n_skus, n_months)
+
+
+def sku_indices(names: Sequence[str], skus: Sequence[str], default: str = 'Beta') -> np.ndarray:
+    """Row of each product name in skus, -1 when unknown; a missing name is the default product."""
+    lookup = {sku: i for i, sku in enumerate(skus)}
+    return np.fromiter((lookup.get(default if n is None else n, -1) for n in names),
+                       dtype=np.int64, count=len(names))
+
+
+def abs_months(days: np.ndarray) -> np.ndarray:
+    """Absolute month of each datetime64 day; NO_MONTH where NaT."""
+    months = days.astype('datetime64[M]').astype(np.int64) - (BASE_YEAR - 1970) * 12 + 1
+    return np.where(np.isnat(days), NO_MONTH, months)
+
+
+def order_months(po_columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Absolute order month of each PO from record_schema columns; NO_MONTH without year/month."""
+    year, month = po_columns['order_year'], po_columns['order_month']
+    known = ~np.isnan(year) & ~np.isnan(month)
+    abs_month = ((np.nan_to_num(year) - BASE_YEAR) * 12 + np.nan_to_num(month)).astype(np.int64)
+    return np.where(known, abs_month, NO_MONTH)
+
+
+# ============================================================
+# INPUT MATRICES
+# ============================================================
+
+def po_arrival_matrix(po_data: List[Dict], lead_time: int, year: int,
+                      skus: Sequence[str] = DEFAULT_SKUS, n_months: int = 12) -> np.ndarray:
+    """Pairs arriving per (sku, month). POs with no pairs or no order month are ignored."""
+    cols = record_schema.columns('po_data', po_data)
+    order = order_months(cols)
+    pairs = record_schema.filled(cols['pairs'], 0)
+    rows = np.where(pairs > 0, sku_indices(cols['product'], skus), -1)
+    arrival = np.where(order == NO_MONTH, NO_MONTH, order + lead_time)
+    return bucket_by_month(rows, arrival, pairs, len(skus), year, n_months)
+
+
+def ws_shipment_matrix(wholesale_deals: List[Dict], year: int,
+                       skus: Sequence[str] = DEFAULT_SKUS, n_months: int = 12) -> np.ndarray:
+    """Wholesale pairs shipped per (sku, month), dated by delivery (else close) date."""
+    cols = record_schema.columns('wholesale_deals', wholesale_deals)
+    return bucket_by_month(
+        sku_indices(cols['product_type'], skus),
+        abs_months(wholesale_pipeline.delivery_dates(cols)),
+        record_schema.filled(cols['num_pairs'], 0), len(skus), year, n_months)
+
+
+def demand_matrix(dtc_demand: Dict[str, List], skus: Sequence[str] = DEFAULT_SKUS,
+                  n_months: int = 12) -> np.ndarray:
+    """DTC demand units per (sku, month); SKUs without a forecast have zero demand."""
+    out = np.zeros((len(skus), n_months))
+    for i, sku in enumerate(skus):
+        values = dtc_demand.get(sku)
+        if values is not None:
+            out[i] = values[:n_months]
+    return out
+
+
+def opening_vector(skus: Sequence[str], beg_inv: Dict[str, float],
+                   prior_ending: Dict[str, float] = None) -> np.ndarray:
+    """Opening stock per SKU: prior year's ending where given, else configured beginning."""
+    prior_ending = prior_ending or {}
+    return np.array([
+        prior_ending[sku] if sku in prior_ending else beg_inv.get(sku, 0)
+        for sku in skus
+    ], dtype=float)
+
+
+# ============================================================
+# SIMULATION
+# ============================================================
+
+def simulate_inventory(opening: np.ndarray, arrivals: np.ndarray, shipments: np.ndarray,
+                       demand: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Run the monthly balance for all SKUs at once. Inputs are (skus x months), opening
+    is (skus,). Each month: available = begin + arrive - ws, DTC sales are demand
+    clamped to non-negative available stock, and ending carries into next month.
+    """
+    return simulate_inventory_batch(opening, arrivals, shipments, demand)
+
+
+def simulate_inventory_batch(opening: np.ndarray, arrivals: np.ndarray, shipments: np.ndarray,
+                             demand: np.ndarray,
+                             outputs: Sequence[str] = BALANCE_ROWS) -> Dict[str, np.ndarray]:
+    """
+    Batched form of simulate_inventory over any leading scenario axes.
+
+    Inputs broadcast against each other: month series are (..., skus, months) and
+    opening is (..., skus), so e.g. arrivals of shape (n_plans, skus, months) can be
+    run against a single (skus, months) demand, or one PO plan against
+    (n_scenarios, skus, months) demand draws. The (scenarios x skus) state advances
+    one month at a time with vectorized min/max, so one call evaluates thousands of
+    scenarios.
+
+    outputs: rows to return; ask for fewer (e.g. ("dtc_sales", "ending")) to save
+             memory on large batches.
+
+    Returns: {row: array of shape (..., skus, months)}
+    """
+    arrivals = np.asarray(arrivals, dtype=float)
+    shipments = np.asarray(shipments, dtype=float)
+    demand = np.asarray(demand, dtype=float)
+    opening = np.asarray(opening, dtype=float)
+    shape = np.broadcast_shapes(arrivals.shape, shipments.shape, demand.shape, opening.shape + (1,))
+    n_months = shape[-1]
+
+    net_in = np.broadcast_to(arrivals - shipments, shape)
+    demand_b = np.broadcast_to(demand, shape)
+    state = np.broadcast_to(opening, shape[:-1]).copy()
+
+    track_begin = 'begin' in outputs or 'available' in outputs
+    begin = np.empty(shape) if track_begin else None
+    dtc_sales = np.empty(shape) if 'dtc_sales' in outputs else None
+    ending = np.empty(shape) if 'ending' in outputs else None
+
+    # Ending stock feeds next month's clamp, so months run in order; everything
+    # inside a month is one vector op over all scenarios and SKUs
+    for m in range(n_months):
+        if track_begin:
+            begin[..., m] = state
+        available = state + net_in[..., m]
+        sold = np.minimum(demand_b[..., m], np.maximum(available, 0))
+        if dtc_sales is not None:
+            dtc_sales[..., m] = sold
+        state = available - sold
+        if ending is not None:
+            ending[..., m] = state
+
+    rows = {
+        'begin': lambda: begin,
+        'arrive': lambda: np.broadcast_to(arrivals, shape),
+        'ws': lambda: np.broadcast_to(shipments, shape),
+        'available': lambda: begin + net_in,
+        'demand': lambda: demand_b,
+        'dtc_sales': lambda: dtc_sales,
+        'ending': lambda: ending,
+    }
+    return {row: rows[row]() for row in outputs}
+
+
+def arrivals_from_orders(orders: np.ndarray, lead_time: int) -> np.ndarray:
+    """
+    Shift an order-quantity series (..., skus, months) by the lead time so that
+    arrivals[..., m] = orders[..., m - lead_time]. Orders landing past the window drop off.
+    """
+    orders = np.asarray(orders, dtype=float)
+    arrivals = np.zeros_like(orders)
+    if lead_time < orders.shape[-1]:
+        arrivals[..., lead_time:] = orders[..., :orders.shape[-1] - lead_time]
+    return arrivals
+
+
+def lost_sales(result: Dict[str, np.ndarray]) -> np.ndarray:
+    """Unmet DTC demand per (..., sku, month) for a result holding demand and dtc_sales."""
+    return result['demand'] - result['dtc_sales']
+
+
+def _to_list(row: np.ndarray) -> List:
+    # Pair counts are whole numbers; keep them as ints like the list-based model did
+    if np.all(row == np.round(row)):
+        return [int(v) for v in row]
+    return row.tolist()
+
+
+def balance_to_dict(result: Dict[str, np.ndarray], skus: Sequence[str]) -> Dict[str, Dict[str, List]]:
+    """{"Beta": {"begin": [...], ..., "ending": [...]}, ...} for the existing pages."""
+    return {
+        sku: {row: _to_list(result[row][i]) for row in BALANCE_ROWS}
+        for i, sku in enumerate(skus)
+    }
+
+
+def matrix_to_dict(matrix: np.ndarray, skus: Sequence[str]) -> Dict[str, Dict[int, float]]:
+    """(skus x 12) -> {"Beta": {1: ..., 12: ...}, ...}"""
+    return {
+        sku: dict(zip(range(1, matrix.shape[1] + 1), _to_list(matrix[i])))
+        for i, sku in enumerate(skus)
+    }
+
+
+def inventory_balance(
+    po_data: List[Dict],
+    wholesale_deals: List[Dict],
+    lead_time: int,
+    beg_inv: Dict[str, float],
+    dtc_demand: Dict[str, List],
+    year: int,
+    prior_ending: Dict[str, float] = None,
+    skus: Sequence[str] = DEFAULT_SKUS,
+    n_months: int = 12,
+) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """
+    Build the input matrices for `skus` and simulate `n_months` from January of `year`.
+    Pass skus=discover_skus(...) to include every product found in the data.
+
+    Returns: (skus, {"begin": array, ..., "ending": array}) with (skus x months) arrays
+    """
+    skus = list(skus)
+    result = simulate_inventory(
+        opening_vector(skus, beg_inv, prior_ending),
+        po_arrival_matrix(po_data, lead_time, year, skus, n_months),
+        ws_shipment_matrix(wholesale_deals, year, skus, n_months),
+        demand_matrix(dtc_demand, skus, n_months),
+    )
+    return skus, result
@@ -0,0 +1,203 @@
+"""
+Inventory Policy Module
+Safety stock, reorder points and months of cover per product and month.
+
+Works on the (sku x month) arrays of inventory_engine, so every quantity is a window
+sum over cumulative arrays rather than a per-cell loop, and the same code handles many
+SKUs over a multi-year horizon. Demand variability is a coefficient of variation
+estimated from QBO DTC revenue history when enough months exist, else a default.
+"""
+
+from statistics import NormalDist
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import inventory_engine
+from financial_calcs import get_dtc_demand_units
+
+DEFAULT_SERVICE_LEVEL = 0.95
+DEFAULT_DEMAND_CV = 0.30
+MIN_HISTORY_MONTHS = 6
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def z_score(service_level: float) -> float:
+    """Standard normal quantile for a cycle service level (0.95 -> 1.645)."""
+    return NormalDist().inv_cdf(service_level)
+
+
+def estimate_demand_cv(qbo_actuals: Dict = None, label: str = 'DTC Revenue',
+                       default: float = DEFAULT_DEMAND_CV) -> Tuple[float, str]:
+    """
+    Coefficient of variation of monthly demand around its growth trend.
+
+    Uses the serialized QBO P&L line (keys like "2025_7"): fits a log-linear trend to
+    the positive months and takes the std of the residuals, which approximates the CV
+    for moderate noise without counting growth as volatility.
+
+    Returns: (cv, source) where source is 'qbo' or 'default'
+    """
+    series = (qbo_actuals or {}).get('pl_data', {}).get(label, {})
+    points = sorted(
+        (int(yr) * 12 + int(mo), val)
+        for yr, mo, val in ((*key.split('_'), val) for key, val in series.items())
+    )
+    values = np.array([val for _, val in points], dtype=float)
+    values = values[values > 0]
+    if len(values) < MIN_HISTORY_MONTHS:
+        return default, 'default'
+
+    t = np.arange(len(values))
+    logs = np.log(values)
+    slope, intercept = np.polyfit(t, logs, 1)
+    residual_std = float(np.std(logs - (slope * t + intercept), ddof=2))
+    return float(np.clip(residual_std, 0.05, 1.0)), 'qbo'
+
+
+# ============================================================
+# WINDOW HELPERS
+# ============================================================
+
+def _cumulative(values: np.ndarray) -> np.ndarray:
+    """(..., H) -> (..., H + 1) running totals starting at 0."""
+    zeros = np.zeros(values.shape[:-1] + (1,))
+    return np.concatenate([zeros, np.cumsum(values, axis=-1)], axis=-1)
+
+
+def forward_sum(values: np.ndarray, length: int) -> np.ndarray:
+    """
+    Sum of values over the `length` months after each month t (t+1 .. t+length),
+    truncated at the end of the horizon.
+    """
+    n_months = values.shape[-1]
+    cum = _cumulative(values)
+    t = np.arange(n_months)
+    lo = np.minimum(t + 1, n_months)
+    hi = np.minimum(t + 1 + length, n_months)
+    return cum[..., hi] - cum[..., lo]
+
+
+def months_of_cover(stock: np.ndarray, need: np.ndarray) -> np.ndarray:
+    """
+    How many future months (fractional) the stock at the end of each month covers,
+    consuming need[t+1], need[t+2], ... in order. np.inf when the stock outlasts the
+    horizon. stock and need are (skus x months); need must be non-negative.
+    """
+    n_skus, n_months = need.shape
+    cum = _cumulative(need)
+    start = cum[:, 1:]                       # consumed through month t
+    target = start + np.maximum(stock, 0)    # ...plus what is on hand
+
+    # Row-wise searchsorted in one call: shift each row above the previous one
+    span = cum[:, -1].max() + np.maximum(stock, 0).max() + 1
+    offsets = (np.arange(n_skus) * span)[:, None]
+    flat = (cum + offsets).ravel()
+    j = np.searchsorted(flat, (target + offsets).ravel(), side='right').reshape(n_skus, n_months)
+    j = j - 1 - np.arange(n_skus)[:, None] * (n_months + 1)
+
+    t = np.arange(n_months)[None, :]
+    whole = j - (t + 1)
+    inside = j < n_months
+    j_safe = np.minimum(j, n_months - 1)
+    partial_need = np.take_along_axis(need, j_safe, axis=1)
+    partial = np.where(
+        inside & (partial_need > 0),
+        (target - np.take_along_axis(cum, j, axis=1)) / np.where(partial_need > 0, partial_need, 1),
+        0.0,
+    )
+    return np.where(inside, whole + partial, np.inf)
+
+
+# ============================================================
+# POLICY
+# ============================================================
+
+def compute_inventory_policy(balance: Dict[str, np.ndarray], lead_time: int,
+                             service_level: float = DEFAULT_SERVICE_LEVEL,
+                             demand_cv: float = DEFAULT_DEMAND_CV) -> Dict[str, np.ndarray]:
+    """
+    Policy quantities for every (sku, month) of an inventory_engine balance.
+
+    At the end of month t:
+      lead-time demand = DTC demand + wholesale shipments over t+1 .. t+lead_time
+      safety stock     = z(service level) x CV x sqrt(sum of squared monthly DTC demand
+                         over the lead time)  (wholesale is contracted, so no variance)
+      reorder point    = lead-time demand + safety stock
+      position         = ending stock + PO arrivals already due within the lead time
+      months of cover  = ending stock against future DTC + wholesale need
+
+    Returns: {"lead_demand", "safety_stock", "reorder_point", "position",
+              "months_of_cover", "reorder"} arrays of shape (skus x months)
+    """
+    demand = np.asarray(balance['demand'], dtype=float)
+    shipments = np.asarray(balance['ws'], dtype=float)
+    need = demand + shipments
+
+    lead_demand = forward_sum(need, lead_time)
+    sigma = demand_cv * np.sqrt(forward_sum(demand ** 2, lead_time))
+    safety_stock = z_score(service_level) * sigma
+    reorder_point = lead_demand + safety_stock
+    position = balance['ending'] + forward_sum(np.asarray(balance['arrive'], dtype=float), lead_time)
+
+    return {
+        'lead_demand': lead_demand,
+        'safety_stock': safety_stock,
+        'reorder_point': reorder_point,
+        'position': position,
+        'months_of_cover': months_of_cover(balance['ending'], np.maximum(need, 0)),
+        'reorder': position < reorder_point,
+    }
+
+
+def multi_year_demand(years: Sequence[int]) -> Dict[str, List[float]]:
+    """DTC demand units per product concatenated across consecutive years."""
+    demand: Dict[str, List[float]] = {}
+    for year in years:
+        for sku, units in get_dtc_demand_units(year).items():
+            demand.setdefault(sku, []).extend(units)
+    return demand
+
+
+def build_inventory_policy(
+    po_data: List[Dict],
+    wholesale_deals: List[Dict],
+    inventory_config: Dict,
+    years: Sequence[int] = (2026, 2027),
+    service_level: float = DEFAULT_SERVICE_LEVEL,
+    demand_cv: float = DEFAULT_DEMAND_CV,
+    skus: Sequence[str] = inventory_engine.DEFAULT_SKUS,
+) -> pd.DataFrame:
+    """
+    Simulate the inventory balance across `years` (ending stock carries over) and
+    return the policy as a long table: one row per product and month.
+    """
+    years = list(years)
+    n_months = 12 * len(years)
+    lead_time = inventory_config.get('lead_time_months', 4)
+    beg_inv = {
+        "Beta": inventory_config.get('beg_inv_beta', 0),
+        "Alpha": inventory_config.get('beg_inv_alpha', 0),
+    }
+    skus, balance = inventory_engine.inventory_balance(
+        po_data, wholesale_deals, lead_time, beg_inv, multi_year_demand(years),
+        years[0], skus=skus, n_months=n_months,
+    )
+    policy = compute_inventory_policy(balance, lead_time, service_level, demand_cv)
+
+    labels = [f"{MONTHS[m]} {y}" for y in years for m in range(12)]
+    columns = {
+        'Product': np.repeat(skus, n_months),
+        'Month': np.tile(labels, len(skus)),
+        'DTC Demand': balance['demand'],
+        'Ending Inventory': balance['ending'],
+        'Lead-Time Demand': policy['lead_demand'],
+        'Safety Stock': policy['safety_stock'],
+        'Reorder Point': policy['reorder_point'],
+        'Inventory Position': policy['position'],
+        'Months of Cover': policy['months_of_cover'],
+        'Reorder': policy['reorder'],
+    }
+    return pd.DataFrame({k: np.ravel(v) for k, v in columns.items()})
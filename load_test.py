@@ -0,0 +1,294 @@
+"""
+Load Test Harness
+Drives N concurrent simulated dashboard sessions through app_client.main with
+Streamlit's AppTest. Each session navigates the sidebar pages and makes edits in the
+trackers against one shared copy of the data directory.
+
+Reports p50/p95/p99 rerun latency, peak RSS and DataStore bytes written per page.
+Every session runs in its own process, so RSS and write counters are attributed to
+exactly one session.
+
+    python load_test.py --sessions 8 --rounds 2
+    python load_test.py --sessions 16 --output load.json --fail-p95 5
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+PAGES = [
+    "Management Dashboard",
+    "Cash Flow & Runway",
+    "Monthly P&L Detail",
+    "Fundraising",
+    "QBO Import",
+    "Assumptions",
+    "Team Tracker",
+    "OpEx Tracker",
+    "Wholesale Tracker",
+    "Inventory Tracker",
+    "Consolidation",
+    "Export to PDF",
+]
+
+
+def _session_script():
+    # Executed by AppTest as the app script; must be self-contained
+    import app_client
+    app_client.main()
+
+
+# ============================================================
+# TRACKER EDITS
+# ============================================================
+
+def _widget(widgets, label):
+    for w in widgets:
+        if w.label == label:
+            return w
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def _edit_team(at, session_id: int, n: int):
+    _widget(at.text_input, "First Name").input(f"Load{session_id}")
+    _widget(at.text_input, "Last Name").input(f"User{n}")
+    _widget(at.button, "Save Team Member").click()
+
+
+def _edit_opex(at, session_id: int, n: int):
+    _widget(at.text_input, "Expense Name").input(f"Load test {session_id}-{n}")
+    _widget(at.number_input, "Monthly Amount ($)").set_value(100.0 + n)
+    _widget(at.button, "Save Expense").click()
+
+
+def _edit_wholesale(at, session_id: int, n: int):
+    _widget(at.text_input, "Club/Customer Name*").input(f"Load Club {session_id}-{n}")
+    _widget(at.number_input, "Number of Pairs*").set_value(40 + n)
+    _widget(at.button, "💾 Save Deal").click()
+
+
+def _edit_inventory(at, session_id: int, n: int):
+    _widget(at.button, "Add New PO").click()
+
+
+# Page -> (action name, edit function)
+EDITS = {
+    "Team Tracker": ("add_team_member", _edit_team),
+    "OpEx Tracker": ("add_expense", _edit_opex),
+    "Wholesale Tracker": ("add_deal", _edit_wholesale),
+    "Inventory Tracker": ("add_po", _edit_inventory),
+}
+
+
+# ============================================================
+# SESSION WORKER
+# ============================================================
+
+def run_session(session_id: int, data_root: str, pages: List[str], rounds: int,
+                edits: bool, seed: int, timeout: float) -> List[Dict]:
+    """Run one simulated user in this process; return one sample per rerun."""
+    os.environ['ALMA_METRICS_PORT'] = '0'  # sessions must not race for the metrics port
+    os.chdir(data_root)
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+
+    import logging
+    import warnings
+    logging.disable(logging.WARNING)
+    warnings.filterwarnings('ignore')
+
+    from streamlit.testing.v1 import AppTest
+    from metrics import DATASTORE_BYTES
+
+    rng = random.Random(seed + session_id)
+    samples = []
+    at = AppTest.from_function(_session_script, default_timeout=timeout)
+
+    def rerun(page: str, action: str, step):
+        written = DATASTORE_BYTES.get(op='write')
+        error = None
+        t0 = time.perf_counter()
+        try:
+            step()
+            if at.exception:
+                error = at.exception[0].value
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        seconds = time.perf_counter() - t0
+        samples.append({
+            'session': session_id,
+            'page': page,
+            'action': action,
+            'seconds': seconds,
+            'write_bytes': DATASTORE_BYTES.get(op='write') - written,
+            'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'error': error,
+        })
+        return error is None
+
+    if not rerun(PAGES[0], 'startup', at.run):
+        return samples
+
+    edit_count = 0
+    for _ in range(rounds):
+        order = list(pages)
+        rng.shuffle(order)
+        for page in order:
+            ok = rerun(page, 'navigate', lambda: at.sidebar.radio[0].set_value(page).run())
+            if ok and edits and page in EDITS:
+                action, edit = EDITS[page]
+                edit_count += 1
+
+                def step():
+                    edit(at, session_id, edit_count)
+                    at.run()
+                rerun(page, action, step)
+
+    return samples
+
+
+def _run_session_safe(*args) -> List[Dict]:
+    try:
+        return run_session(*args)
+    except Exception:
+        return [{'session': args[0], 'page': '-', 'action': 'crash', 'seconds': 0.0,
+                 'write_bytes': 0, 'rss_kb': 0, 'error': traceback.format_exc()}]
+
+
+# ============================================================
+# ORCHESTRATION & REPORTING
+# ============================================================
+
+def run_load_test(sessions: int, rounds: int = 1, pages: List[str] = None, edits: bool = True,
+                  data_dir: str = None, seed: int = 0, timeout: float = 120) -> Dict:
+    """Start all sessions at once against a temporary copy of the data directory."""
+    pages = pages or PAGES
+    data_dir = data_dir or os.path.join(PROJECT_ROOT, 'data')
+    work_dir = tempfile.mkdtemp(prefix='alma_load_')
+    if os.path.isdir(data_dir):
+        shutil.copytree(data_dir, os.path.join(work_dir, 'data'))
+
+    started = time.perf_counter()
+    try:
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=sessions, mp_context=ctx) as pool:
+            futures = [
+                pool.submit(_run_session_safe, i, work_dir, pages, rounds, edits, seed, timeout)
+                for i in range(sessions)
+            ]
+            samples = [s for f in futures for s in f.result()]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'created_at': datetime.now().isoformat(),
+        'sessions': sessions,
+        'rounds': rounds,
+        'edits': edits,
+        'wall_seconds': time.perf_counter() - started,
+        'summary': summarize(samples),
+        'samples': samples,
+    }
+
+
+def _latency_row(rows: List[Dict]) -> Dict:
+    ok = [r['seconds'] for r in rows if not r['error']]
+    p50, p95, p99 = np.percentile(ok, [50, 95, 99]) if ok else (float('nan'),) * 3
+    return {
+        'reruns': len(rows),
+        'errors': sum(1 for r in rows if r['error']),
+        'p50_s': float(p50),
+        'p95_s': float(p95),
+        'p99_s': float(p99),
+        'peak_rss_mb': max((r['rss_kb'] for r in rows), default=0) / 1024,
+        'write_bytes_total': int(sum(r['write_bytes'] for r in rows)),
+        'write_bytes_per_rerun': float(np.mean([r['write_bytes'] for r in rows])) if rows else 0.0,
+    }
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    """Latency percentiles, peak RSS and bytes written, overall and per page/action."""
+    by_key: Dict[str, List[Dict]] = {}
+    for s in samples:
+        key = s['page'] if s['action'] == 'navigate' else f"{s['page']} [{s['action']}]"
+        by_key.setdefault(key, []).append(s)
+
+    per_page = {key: _latency_row(rows) for key, rows in sorted(by_key.items())}
+    steady = [s for s in samples if s['action'] not in ('startup', 'crash')]
+    return {
+        'overall': _latency_row(steady),
+        'pages': per_page,
+        'errors': sorted({s['error'].strip().splitlines()[-1] for s in samples if s['error']}),
+    }
+
+
+def print_report(report: Dict):
+    summary = report['summary']
+    print(f"\n{report['sessions']} sessions x {report['rounds']} round(s) "
+          f"in {report['wall_seconds']:.1f}s")
+    print(f"\n{'Page':<42} {'Runs':>5} {'Err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'RSS MB':>8} {'KB written/run':>15}")
+    rows = list(summary['pages'].items()) + [('ALL (excluding startup)', summary['overall'])]
+    for name, r in rows:
+        print(f"{name:<42} {r['reruns']:>5} {r['errors']:>4} {r['p50_s'] * 1000:>9.0f} "
+              f"{r['p95_s'] * 1000:>9.0f} {r['p99_s'] * 1000:>9.0f} {r['peak_rss_mb']:>8.0f} "
+              f"{r['write_bytes_per_rerun'] / 1024:>15.1f}")
+    if summary['errors']:
+        print("\nErrors:")
+        for err in summary['errors']:
+            print(f"  - {err}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the dashboard")
+    parser.add_argument('--sessions', type=int, default=4, help="Concurrent simulated users")
+    parser.add_argument('--rounds', type=int, default=1, help="Passes over the page list per session")
+    parser.add_argument('--pages', default='', help="Comma-separated page names (default: all)")
+    parser.add_argument('--no-edits', action='store_true', help="Only navigate, never edit trackers")
+    parser.add_argument('--data-dir', default=os.path.join(PROJECT_ROOT, 'data'),
+                        help="Data directory copied as the shared starting state")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120, help="Per-rerun timeout (seconds)")
+    parser.add_argument('--output', help="Write the full report (incl. raw samples) as JSON")
+    parser.add_argument('--fail-p95', type=float,
+                        help="Exit non-zero when overall p95 rerun latency exceeds this many seconds")
+    args = parser.parse_args()
+
+    pages = [p.strip() for p in args.pages.split(',') if p.strip()] or PAGES
+    unknown = [p for p in pages if p not in PAGES]
+    if unknown:
+        parser.error(f"Unknown page(s): {', '.join(unknown)}")
+
+    report = run_load_test(args.sessions, args.rounds, pages, not args.no_edits,
+                           args.data_dir, args.seed, args.timeout)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved report to {args.output}")
+
+    failed = report['summary']['overall']['errors'] > 0
+    if args.fail_p95 is not None and report['summary']['overall']['p95_s'] > args.fail_p95:
+        print(f"\np95 {report['summary']['overall']['p95_s']:.2f}s exceeds {args.fail_p95:.2f}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Metrics Module
+In-process counters, gauges and histograms rendered in the Prometheus text format,
+plus a small side HTTP endpoint (/metrics) started once per dashboard process.
+
+Instrumented spans (see instrumentation.py) are routed into the matching histograms
+automatically, so decorated hot paths need no extra metrics code.
+"""
+
+import bisect
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Tuple
+
+from instrumentation import add_listener
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[k]) for k in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, val in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(val)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (e.g. durations in seconds)."""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+                self._values[key] = state
+            state['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), state['counts']):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state['sum'])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric of the process and renders the /metrics payload."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# ============================================================
+# DASHBOARD METRICS
+# ============================================================
+
+REGISTRY = MetricsRegistry()
+
+PAGE_RENDERS = REGISTRY.counter(
+    'alma_page_renders_total', 'Page renders by page name.', ('page',))
+PAGE_RENDER_SECONDS = REGISTRY.histogram(
+    'alma_page_render_seconds', 'Wall time of a full page render.', ('page',))
+LAST_RENDER_SECONDS = REGISTRY.gauge(
+    'alma_last_page_render_seconds', 'Duration of the most recent render of each page.', ('page',))
+MODEL_SECONDS = REGISTRY.histogram(
+    'alma_model_compute_seconds', 'Model computation time by function.', ('function',))
+SPAN_SECONDS = REGISTRY.histogram(
+    'alma_span_seconds', 'Duration of every instrumented span.', ('span',))
+CACHE_REQUESTS = REGISTRY.counter(
+    'alma_cache_requests_total', 'Cache lookups by cache and result (hit/miss).', ('cache', 'result'))
+CACHE_ENTRIES = REGISTRY.gauge(
+    'alma_cache_entries', 'Current number of entries held by each cache.', ('cache',))
+DATASTORE_BYTES = REGISTRY.counter(
+    'alma_datastore_io_bytes_total', 'Bytes read/written by DataStore.', ('op',))
+DATASTORE_SECONDS = REGISTRY.histogram(
+    'alma_datastore_io_seconds', 'DataStore file read/write duration.', ('op',))
+QBO_PARSE_SECONDS = REGISTRY.histogram(
+    'alma_qbo_parse_seconds', 'Time to parse an uploaded QBO export.')
+PDF_SECONDS = REGISTRY.histogram(
+    'alma_pdf_generate_seconds', 'Time to build the management report PDF.')
+PROCESS_START = REGISTRY.gauge(
+    'alma_process_start_time_seconds', 'Unix time the dashboard process started.')
+PROCESS_START.set(time.time())
+
+# Span name prefix -> histogram the duration is routed to
+_MODEL_SPAN_PREFIXES = ('financial_calcs.',)
+
+
+def record_cache(cache: str, hit: bool):
+    """Count one cache lookup."""
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def record_page_render(page: str, seconds: float):
+    PAGE_RENDERS.inc(page=page)
+    PAGE_RENDER_SECONDS.observe(seconds, page=page)
+    LAST_RENDER_SECONDS.set(seconds, page=page)
+
+
+def _on_span(name: str, seconds: float):
+    SPAN_SECONDS.observe(seconds, span=name)
+    if name.startswith(_MODEL_SPAN_PREFIXES):
+        MODEL_SECONDS.observe(seconds, function=name.rsplit('.', 1)[-1])
+    elif name.endswith('parse_qbo_file'):
+        QBO_PARSE_SECONDS.observe(seconds)
+    elif name.endswith('generate_pdf_report'):
+        PDF_SECONDS.observe(seconds)
+
+
+add_listener(_on_span)
+
+
+# ============================================================
+# SIDE HTTP ENDPOINT
+# ============================================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = None, host: str = None):
+    """
+    Start the /metrics endpoint on a daemon thread (once per process).
+    Port comes from ALMA_METRICS_PORT (default 9464); set it to 0 to disable.
+    Host comes from ALMA_METRICS_HOST (default 127.0.0.1, loopback only; the
+    endpoint has no authentication).
+    Returns the server, or None when disabled or the port is taken.
+    """
+    global _server
+    if port is None:
+        port = int(os.environ.get('ALMA_METRICS_PORT', 9464))
+    if host is None:
+        host = os.environ.get('ALMA_METRICS_HOST', '127.0.0.1')
+    if port == 0:
+        return None
+
+    with _server_lock:
+        if _server is not None:
+            return _server or None
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError:
+            # Another dashboard process already serves this port; don't retry every rerun
+            _server = False
+            return None
+        _server.daemon_threads = True
+        thread = threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True)
+        thread.start()
+        return _server
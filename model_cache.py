@@ -0,0 +1,64 @@
+"""
+Model Cache
+Small thread-safe LRU caches keyed on the content hash of model inputs.
+
+Used by the engines that compile or evaluate something expensive from plain
+dict/list inputs (OpEx matrix, scenario bases, sensitivity runs) so reruns and
+other pages with the same inputs reuse the result. Hit/miss counts and entry
+counts are exported to the metrics endpoint under the cache's name.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable
+
+from data_persistence import content_hash
+from metrics import record_cache, CACHE_ENTRIES
+
+# Every cache created, so clear_all() can reset them (e.g. between benchmark runs)
+_caches = weakref.WeakSet()
+
+
+class FingerprintCache:
+    """LRU of computed values keyed by content_hash(key)."""
+
+    def __init__(self, name: str, max_entries: int = 16):
+        self.name = name
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        _caches.add(self)
+
+    def get_or_compute(self, key: Any, compute: Callable[[], Any]) -> Any:
+        digest = content_hash(key)
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                value = self._entries[digest]
+                hit = True
+            else:
+                hit = False
+        record_cache(self.name, hit=hit)
+        if hit:
+            return value
+
+        value = compute()
+        with self._lock:
+            self._entries[digest] = value
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            CACHE_ENTRIES.set(0, cache=self.name)
+
+
+def clear_all():
+    """Empty every FingerprintCache, so the next call of each engine computes from scratch."""
+    for cache in list(_caches):
+        cache.clear()
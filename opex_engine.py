@@ -0,0 +1,198 @@
+"""
+OpEx Engine
+Compiles every operating expense into a dense (expense x absolute month) matrix.
+
+Each expense becomes one row over a multi-year month axis (absolute months, Jan 2026
+= 1) with its frequency, start/end dates and annual growth_rate applied: growth
+compounds on each anniversary of the start month. A year, a quarter or any other
+horizon is then a column slice, and per-category or per-expense views are row
+selections. Compiled matrices are cached on the content hash of the expense list,
+so the pages and calculators that ask for different years share one compile.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import record_schema
+from model_cache import FingerprintCache
+
+BASE_YEAR = 2026
+DEFAULT_FIRST_ABS = 1          # Jan 2026
+DEFAULT_HORIZON_MONTHS = 36    # 2026-2028
+FREQUENCIES = ('Monthly', 'Quarterly', 'Annual', 'One-Time', 'Custom Monthly')
+QUARTER_END_MONTHS = (3, 6, 9, 12)
+
+_cache = FingerprintCache('opex_matrix')
+
+
+def month_index(year: int, month: int) -> int:
+    """Absolute month number: Jan 2026 = 1, Jan 2027 = 13."""
+    return (year - BASE_YEAR) * 12 + month
+
+
+def _months_and_days(days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """datetime64[D] column -> (absolute month, day of month); NaT rows get month 0, day 1."""
+    months = days.astype('datetime64[M]')
+    abs_month = months.astype(np.int64) - (BASE_YEAR - 1970) * 12 + 1
+    day = (days - months.astype('datetime64[D]')).astype(np.int64) + 1
+    valid = ~np.isnat(days)
+    return np.where(valid, abs_month, 0), np.where(valid, day, 1)
+
+
+# ============================================================
+# COMPILE
+# ============================================================
+
+def compile_opex(opex_expenses: List[Dict], first_abs: int = DEFAULT_FIRST_ABS,
+                 n_months: int = DEFAULT_HORIZON_MONTHS) -> Dict:
+    """
+    Build the (expense x month) cost matrix for n_months starting at first_abs.
+
+    Per frequency, over the months the expense is active:
+      Monthly         monthly_amount (or annual_cost / 12) every month
+      Quarterly       3 x amount in Mar / Jun / Sep / Dec
+      Annual          annual_cost / 12 every month
+      One-Time        amount in the start month (no growth)
+      Custom Monthly  monthly_values from the start month on; a profile of up to
+                      12 values repeats every year
+    Recurring costs grow by (1 + growth_rate) on each anniversary of the start month.
+    Quarterly and Annual costs begin with the first month starting on or after the
+    start date; everything stops after the month containing end_date. An expense with
+    no parseable start date is active from January 2026.
+
+    Returns: {"matrix", "first_abs", "names", "categories", "frequencies"}
+    """
+    n = len(opex_expenses)
+    months = first_abs + np.arange(n_months)                  # absolute months
+    cal_month = (months - 1) % 12 + 1
+
+    cols = record_schema.columns('opex_expenses', opex_expenses)
+    freq = np.array([e.get('frequency', 'Monthly') for e in opex_expenses], dtype=object)
+    monthly_amount = record_schema.filled(cols['monthly_amount'], 0)
+    amount = np.where(monthly_amount != 0, monthly_amount, record_schema.filled(cols['annual_cost'], 0) / 12)
+    annual = np.where(np.isnan(cols['annual_cost']), amount * 12, cols['annual_cost'])
+    growth = record_schema.filled(cols['growth_rate'], 0.0)
+
+    has_start, has_end = ~np.isnat(cols['start_date']), ~np.isnat(cols['end_date'])
+    start_abs, start_day = _months_and_days(cols['start_date'])
+    end_abs, _ = _months_and_days(cols['end_date'])
+    start_abs = np.where(has_start, start_abs, DEFAULT_FIRST_ABS)
+    start_day = np.where(has_start, start_day, 1)
+
+    is_monthly = freq == 'Monthly'
+    is_quarterly = freq == 'Quarterly'
+    is_annual = freq == 'Annual'
+    is_one_time = freq == 'One-Time'
+    is_custom = freq == 'Custom Monthly'
+
+    # First active month: Quarterly/Annual compare the 1st of the month to the start date
+    first_active = start_abs + ((is_quarterly | is_annual) & (start_day > 1))
+    last_active = np.where(has_end, end_abs, np.iinfo(np.int64).max)
+
+    m = months[None, :]
+    active = (m >= first_active[:, None]) & (m <= last_active[:, None])
+
+    base = np.zeros(n)
+    base[is_monthly] = amount[is_monthly]
+    base[is_quarterly] = amount[is_quarterly] * 3
+    base[is_annual] = annual[is_annual] / 12
+    matrix = np.where(active, base[:, None], 0.0)
+    matrix[is_quarterly] *= np.isin(cal_month, QUARTER_END_MONTHS)[None, :]
+
+    # Full years since the start month; only rows that need it, to keep memory at n x months
+    def years_elapsed(rows):
+        return np.maximum((m - start_abs[rows, None]) // 12, 0)
+
+    grown = np.flatnonzero((growth != 0) & ~is_one_time & ~is_custom)
+    if len(grown):
+        matrix[grown] *= (1.0 + growth[grown, None]) ** years_elapsed(grown)
+
+    one_time = np.flatnonzero(is_one_time)
+    if len(one_time):
+        matrix[one_time] = np.where(m == start_abs[one_time, None], amount[one_time, None], 0.0)
+
+    custom = np.flatnonzero(is_custom)
+    if len(custom):
+        matrix[custom] = _custom_rows(
+            [opex_expenses[i].get('monthly_values', []) for i in custom],
+            m - start_abs[custom, None], active[custom],
+            (1.0 + growth[custom, None]) ** years_elapsed(custom))
+
+    return {
+        'matrix': matrix,
+        'first_abs': first_abs,
+        'names': [e.get('expense_name', '') for e in opex_expenses],
+        'categories': [e.get('category', 'Other') for e in opex_expenses],
+        'frequencies': list(freq),
+    }
+
+
+def _custom_rows(values: List[List[float]], elapsed: np.ndarray, active: np.ndarray,
+                 growth_factor: np.ndarray) -> np.ndarray:
+    """Rows for Custom Monthly expenses from their per-month value lists."""
+    width = max([len(v) for v in values] + [12])
+    profile = np.zeros((len(values), width))
+    for row, vals in enumerate(values):
+        profile[row, :len(vals)] = vals
+    repeats = np.array([len(v) <= 12 for v in values])
+
+    # Position in the value list: cycles every 12 months for a one-year profile
+    pos = np.where(repeats[:, None], elapsed % 12, elapsed)
+    inside = (elapsed >= 0) & (pos < width)
+    picked = np.take_along_axis(profile, np.clip(pos, 0, width - 1), axis=1)
+    # A one-year profile grows each year; a longer explicit schedule is used as given
+    factor = np.where(repeats[:, None], growth_factor, 1.0)
+    return np.where(inside & active, picked * factor, 0.0)
+
+
+# ============================================================
+# CACHED ACCESS
+# ============================================================
+
+def get_opex_matrix(opex_expenses: List[Dict], first_abs: int = None, last_abs: int = None) -> Dict:
+    """
+    Compiled matrix covering at least first_abs..last_abs (default 2026-2028),
+    reused while the expense list is unchanged.
+    """
+    lo = DEFAULT_FIRST_ABS if first_abs is None else min(first_abs, DEFAULT_FIRST_ABS)
+    hi = DEFAULT_FIRST_ABS + DEFAULT_HORIZON_MONTHS - 1
+    if last_abs is not None:
+        hi = max(hi, last_abs)
+    return _cache.get_or_compute(
+        [opex_expenses, lo, hi], lambda: compile_opex(opex_expenses, lo, hi - lo + 1))
+
+
+def slice_months(compiled: Dict, first_abs: int, n_months: int) -> np.ndarray:
+    """(expense x n_months) view starting at absolute month first_abs."""
+    start = first_abs - compiled['first_abs']
+    return compiled['matrix'][:, start:start + n_months]
+
+
+def opex_for_months(opex_expenses: List[Dict], first_abs: int, n_months: int) -> np.ndarray:
+    """(expense x month) costs for any horizon."""
+    compiled = get_opex_matrix(opex_expenses, first_abs, first_abs + n_months - 1)
+    return slice_months(compiled, first_abs, n_months)
+
+
+def opex_for_year(opex_expenses: List[Dict], year: int) -> np.ndarray:
+    """(expense x 12) costs for one calendar year."""
+    return opex_for_months(opex_expenses, month_index(year, 1), 12)
+
+
+def monthly_totals(opex_expenses: List[Dict], year: int) -> Dict[int, float]:
+    """{1..12: total cost} for one year, the calculate_opex_monthly format."""
+    if not opex_expenses:
+        return {month: 0.0 for month in range(1, 13)}
+    totals = opex_for_year(opex_expenses, year).sum(axis=0)
+    return {month: float(totals[month - 1]) for month in range(1, 13)}
+
+
+def totals_by_category(opex_expenses: List[Dict], first_abs: int, n_months: int) -> Dict[str, np.ndarray]:
+    """{category: per-month totals} over any horizon."""
+    compiled = get_opex_matrix(opex_expenses, first_abs, first_abs + n_months - 1)
+    block = slice_months(compiled, first_abs, n_months)
+    codes, index = np.unique(compiled['categories'], return_inverse=True)
+    sums = np.zeros((len(codes), n_months))
+    np.add.at(sums, index, block)
+    return {cat: sums[i] for i, cat in enumerate(codes)}
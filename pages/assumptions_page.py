@@ -5,6 +5,15 @@ Configure all model parameters and inputs
 
 import streamlit as st
 import json
+from datetime import datetime
+import pandas as pd
+import plotly.graph_objects as go
+
+import cohort_model
+import sensitivity
+from data_persistence import get_data_store
+from financial_calcs import generate_monthly_pl, get_dtc_demand_units
+from instrumentation import span
 
 
 DEFAULTS = {
@@ -27,6 +36,9 @@ DEFAULTS = {
     # CAC and Marketing
     'cac_improvement_rate': 0.15,
     'cac_floor': 30,
+    'starting_cac': 250,
+    'repeat_rate': 0.05,
+    'retention_decay': 0.90,
     # Starting values
     'starting_cash_2026': 93412,
     # Inventory & PO defaults
@@ -65,6 +77,233 @@ def load_assumptions():
         st.warning("No saved assumptions found. Using defaults.")
 
 
+def show_sensitivity():
+    """Tornado chart of each assumption's impact on 2026 EBITDA and minimum cash"""
+    st.markdown("### 2026 Sensitivity (Tornado)")
+    st.caption("Each assumption is moved down and up by its delta with everything else held "
+               "at current values. All scenarios run in one batched pass of the model.")
+
+    deltas = {}
+    with st.expander("Deltas"):
+        cols = st.columns(3)
+        for i, (name, (label, kind, default, _, integer)) in enumerate(sensitivity.PARAMETERS.items()):
+            with cols[i % 3]:
+                if kind == 'pct':
+                    deltas[name] = st.number_input(
+                        f"{label} (±%)", min_value=0.0, max_value=100.0, value=default * 100,
+                        step=5.0, key=f"sens_{name}") / 100
+                elif integer:
+                    deltas[name] = int(st.number_input(
+                        f"{label} (±)", min_value=0, max_value=12, value=int(default),
+                        step=1, key=f"sens_{name}"))
+                else:
+                    deltas[name] = st.number_input(
+                        f"{label} (± points)", min_value=0.0, max_value=50.0, value=default * 100,
+                        step=1.0, key=f"sens_{name}") / 100
+
+    qbo = st.session_state.get('qbo_actuals')
+    starting_cash = qbo.get('latest_cash', 41422.0) if qbo else 41422.0
+    current_ap = qbo.get('latest_ap', 8414.0) if qbo else 8414.0
+
+    with span("model.sensitivity"):
+        df = sensitivity.cached_sensitivity(
+            2026,
+            st.session_state.get('team_members', []),
+            st.session_state.get('opex_expenses', []),
+            st.session_state.get('wholesale_deals', []),
+            st.session_state.get('po_data') or [],
+            st.session_state.get('inventory_config') or {},
+            st.session_state.get('fundraising_rounds', []),
+            starting_cash, current_ap, deltas,
+        )
+
+    metric = st.radio("Impact on", list(sensitivity.METRICS.values()), horizontal=True, key="sens_metric")
+    base_value = df.attrs['base'][metric]
+    st.metric(f"Base Case {metric}", f"${base_value:,.0f}")
+
+    ranked = df.sort_values(f"{metric} Swing", ascending=True)
+    ranked = ranked[ranked[f"{metric} Swing"] > 0]
+    if ranked.empty:
+        st.info("No assumption moves this metric with the current deltas.")
+        return
+
+    with span("figure.tornado"):
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            name='Low', y=ranked['Parameter'], x=ranked[f"{metric} Low"], orientation='h',
+            marker_color='#F8766D',
+            customdata=ranked['Low Value'],
+            hovertemplate="%{y}<br>Value: %{customdata:,.3g}<br>Change: $%{x:,.0f}<extra></extra>",
+        ))
+        fig.add_trace(go.Bar(
+            name='High', y=ranked['Parameter'], x=ranked[f"{metric} High"], orientation='h',
+            marker_color='#00BA38',
+            customdata=ranked['High Value'],
+            hovertemplate="%{y}<br>Value: %{customdata:,.3g}<br>Change: $%{x:,.0f}<extra></extra>",
+        ))
+        fig.update_layout(
+            title=f"Change in {metric} vs Base (${base_value:,.0f})",
+            barmode='overlay', height=max(350, 32 * len(ranked) + 120),
+            xaxis_title="Change ($)", legend=dict(orientation='h'),
+        )
+    st.plotly_chart(fig, use_container_width=True)
+
+    table = df[['Parameter', 'Base Value', 'Low Value', 'High Value',
+                f"{metric} Low", f"{metric} High", f"{metric} Swing"]].copy()
+    for col in [f"{metric} Low", f"{metric} High", f"{metric} Swing"]:
+        table[col] = table[col].apply(lambda x: f"${x:,.0f}")
+    for col in ['Base Value', 'Low Value', 'High Value']:
+        table[col] = table[col].apply(lambda x: f"{x:,.4g}")
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+
+def show_cohorts():
+    """Cohort model: new customers from marketing spend and CAC, repeat orders via retention"""
+    st.markdown("### DTC Cohort Model")
+    st.caption("New customers each month = Sales & Marketing OpEx / CAC. Each customer orders once "
+               "when acquired, then repeats along the retention curve.")
+    assumptions = st.session_state.assumptions
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        assumptions['starting_cac'] = st.number_input(
+            "Starting CAC ($)", min_value=1.0, value=float(assumptions['starting_cac']), step=10.0,
+            help="Jan 2026 cost to acquire one customer", key="cohort_starting_cac")
+    with col2:
+        assumptions['repeat_rate'] = st.number_input(
+            "Month-1 Repeat Rate (%)", min_value=0.0, max_value=100.0,
+            value=float(assumptions['repeat_rate'] * 100), step=0.5,
+            help="Share of a cohort ordering again the month after acquisition",
+            key="cohort_repeat_rate") / 100
+    with col3:
+        assumptions['retention_decay'] = st.number_input(
+            "Monthly Retention Decay", min_value=0.0, max_value=0.99,
+            value=float(assumptions['retention_decay']), step=0.01,
+            help="Each further month's repeat rate as a multiple of the previous month's",
+            key="cohort_retention_decay")
+    with col4:
+        years = st.selectbox("Horizon", [1, 2, 3, 5], index=2, format_func=lambda y: f"{y} years",
+                             key="cohort_years")
+
+    opex = st.session_state.get('opex_expenses', [])
+    with span("model.cohorts"):
+        cohorts = cohort_model.build_cohorts(opex, assumptions, years)
+    months = cohort_model.month_labels(len(cohorts['orders']))
+
+    rr, decay = assumptions['repeat_rate'], assumptions['retention_decay']
+    lifetime = 1 + (rr / (1 - decay) if decay < 1 else 0)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("New Customers (2026)", f"{cohorts['new_customers'][:12].sum():,.0f}")
+    with col2:
+        st.metric("Orders per Customer (lifetime)", f"{lifetime:.2f}")
+    with col3:
+        st.metric(f"Repeat Share of Orders ({years}y)",
+                  f"{cohorts['repeat_orders'].sum() / max(cohorts['orders'].sum(), 1):.0%}")
+
+    with span("figure.cohorts"):
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=months, y=cohorts['new_customers'], name='First Orders',
+                             marker_color='#2E86AB'))
+        fig.add_trace(go.Bar(x=months, y=cohorts['repeat_orders'], name='Repeat Orders',
+                             marker_color='#A23B72'))
+        fig.add_trace(go.Scatter(x=months, y=cohorts['cac'], name='CAC', yaxis='y2',
+                                 mode='lines', line=dict(color='#F18F01')))
+        fig.update_layout(barmode='stack', height=400, hovermode='x unified',
+                          yaxis=dict(title='Orders'),
+                          yaxis2=dict(title='CAC ($)', overlaying='y', side='right'))
+        st.plotly_chart(fig, use_container_width=True)
+
+    # 2026 P&L on cohort demand vs the plan's unit lists
+    demand = cohort_model.dtc_demand(cohorts, 2026)
+    inputs = dict(year=2026, team_members=st.session_state.get('team_members', []),
+                  opex_expenses=opex, wholesale_deals=st.session_state.get('wholesale_deals', []))
+    plan_pl = generate_monthly_pl(**inputs)
+    cohort_pl = generate_monthly_pl(**inputs, dtc_demand=demand)
+    comparison = pd.DataFrame({
+        'Plan Units': [sum(v[m] for v in get_dtc_demand_units(2026).values()) for m in range(12)],
+        'Cohort Units': [demand['Beta'][m] + demand['Alpha'][m] for m in range(12)],
+        'Plan DTC Revenue': plan_pl['DTC Revenue'].to_numpy(),
+        'Cohort DTC Revenue': cohort_pl['DTC Revenue'].to_numpy(),
+        'Plan EBITDA': plan_pl['EBITDA'].to_numpy(),
+        'Cohort EBITDA': cohort_pl['EBITDA'].to_numpy(),
+    }, index=plan_pl['Month']).T
+    comparison['Total'] = comparison.sum(axis=1)
+    st.markdown("#### 2026: Cohort Demand vs Plan")
+    st.dataframe(comparison.style.format("{:,.0f}"), use_container_width=True)
+
+    with st.expander("Cohort Matrix (2026)"):
+        table = cohort_model.cohort_table(cohorts, 2026)
+        matrix = pd.DataFrame(table, index=months[:len(table)], columns=months[:12])
+        matrix = matrix[matrix.sum(axis=1) > 0]
+        st.dataframe(matrix.style.format("{:,.1f}"), use_container_width=True)
+        st.caption("Rows: acquisition month. Columns: orders placed each month.")
+
+
+HISTORY_STREAMS = {
+    'assumptions': "Assumptions",
+    'team_members': "Team (custom)",
+    'opex_expenses': "OpEx (custom)",
+    'wholesale_deals': "Wholesale Deals (custom)",
+    'fundraising_rounds': "Fundraising Rounds",
+    'po_data': "Purchase Orders",
+}
+# Streams saved whole, so a past version can replace the session value directly
+RESTORABLE = {'assumptions', 'fundraising_rounds', 'po_data'}
+
+
+def show_history():
+    """Change journal: recent field-level changes and any past saved state"""
+    journal = get_data_store(st.session_state.get('entity')).journal
+    st.markdown("### Change History")
+    st.caption("Every save is journaled field by field. Pick a time to see what was saved then.")
+
+    stream = st.selectbox("Data", list(HISTORY_STREAMS), format_func=HISTORY_STREAMS.get,
+                          key="history_stream")
+
+    changes = journal.history(stream, limit=200)
+    if changes:
+        log = pd.DataFrame([{
+            'When': c['timestamp'][:19].replace('T', ' '),
+            'Record': c['record'],
+            'Change': c['change'].title(),
+            'Fields': ", ".join(f"{k}={v}" for k, v in c['fields'].items())[:200],
+        } for c in changes])
+        st.dataframe(log, use_container_width=True, hide_index=True)
+    else:
+        st.info("No changes recorded yet.")
+
+    st.markdown("#### As Of")
+    col1, col2 = st.columns(2)
+    with col1:
+        day = st.date_input("Date", value=datetime.now().date(), key="history_date")
+    with col2:
+        moment = st.time_input("Time", value=datetime.now().time().replace(microsecond=0),
+                               key="history_time")
+    past = journal.state_at(datetime.combine(day, moment), [stream])
+    if past is None:
+        st.warning("That is older than the retained history.")
+        return
+    value = past[stream]
+
+    if stream == 'assumptions':
+        current = st.session_state.get('assumptions', {})
+        rows = [{'Assumption': k, 'Then': value.get(k), 'Now': current.get(k)}
+                for k in sorted(set(value) | set(current)) if value.get(k) != current.get(k)]
+        if rows:
+            st.dataframe(pd.DataFrame(rows).astype(str), use_container_width=True, hide_index=True)
+        else:
+            st.success("Same as the current assumptions.")
+    elif value:
+        st.dataframe(pd.DataFrame(value).astype(str), use_container_width=True, hide_index=True)
+    else:
+        st.info("Nothing saved at that time.")
+
+    if stream in RESTORABLE and value and st.button("Restore This Version", key="history_restore"):
+        st.session_state[stream] = value
+        st.success(f"Restored {HISTORY_STREAMS[stream]} as of {day} {moment}.")
+
+
 def show():
     """Display assumptions page"""
     
@@ -74,13 +313,15 @@ def show():
     initialize_assumptions()
     
     # Tabs for different categories
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
         "Revenue & Pricing",
         "COGS Components",
         "Team & Payroll",
         "Marketing & CAC",
         "Inventory & POs",
         "Other Assumptions",
+        "Sensitivity",
+        "History",
     ])
     
     # --- REVENUE TAB ---
@@ -306,6 +547,9 @@ def show():
             f"CAC will improve {st.session_state.assumptions['cac_improvement_rate']*100:.0f}% annually "
             f"until reaching floor of ${st.session_state.assumptions['cac_floor']:.0f}"
         )
+
+        st.divider()
+        show_cohorts()
     
     # --- INVENTORY TAB ---
     with tab5:
@@ -391,6 +635,14 @@ def show():
                 help="From 12/31/2025 balance sheet"
             )
     
+    # --- SENSITIVITY TAB ---
+    with tab7:
+        show_sensitivity()
+
+    # --- HISTORY TAB ---
+    with tab8:
+        show_history()
+
     # --- ACTION BUTTONS ---
     st.divider()
     
@@ -5,6 +5,7 @@ Track current cash position, burn rate, and runway projections
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, date
@@ -24,18 +25,41 @@ from financial_calcs import (
     calculate_constrained_dtc_revenue,
     get_dtc_demand_units,
 )
+from baseline_data import get_baseline_cash_position
+from instrumentation import span
+import aging_engine
+import cash_ledger
+import goal_seek
+import record_schema
+import scenario_model
+import wholesale_pipeline
 
 
 def get_monthly_funding(fundraising_rounds: list, year: int = 2026) -> Dict[int, float]:
     """Calculate monthly funding inflows from fundraising rounds for a given year."""
-    monthly = {m: 0.0 for m in range(1, 13)}
-    for rnd in (fundraising_rounds or []):
-        rnd_year = rnd.get('year', 0)
-        rnd_month = rnd.get('month', 0)
-        amount = rnd.get('amount', 0)
-        if rnd_year == year and 1 <= rnd_month <= 12 and amount > 0:
-            monthly[rnd_month] += amount
-    return monthly
+    cols = record_schema.columns('fundraising_rounds', fundraising_rounds or [])
+    month = record_schema.filled(cols['month'], 0).astype(np.int64)
+    amount = record_schema.filled(cols['amount'], 0)
+    rows = np.flatnonzero((cols['year'] == year) & (month >= 1) & (month <= 12) & (amount > 0))
+    totals = np.bincount(month[rows], weights=amount[rows], minlength=13)
+    return {m: float(totals[m]) for m in range(1, 13)}
+
+
+def calculate_fulfillment_cogs(monthly_pl_df: pd.DataFrame, inventory_config: Dict) -> Dict[int, float]:
+    """
+    Fulfillment COGS = DTC gross revenue * (total_cogs_rate - product_cost_rate)
+    i.e. warehousing + freight + merchant = 15% of gross DTC revenue at sale time.
+    Product cost is paid through PO payments instead.
+    """
+    cogs_total = inventory_config.get('cogs_total_rate', 0.40)
+    cogs_product = inventory_config.get('cogs_product_pct', 0.25)
+    fulfillment_rate = cogs_total - cogs_product  # 0.15
+
+    fulfill_cogs = {m: 0.0 for m in range(1, 13)}
+    if 'DTC Gross Revenue' in monthly_pl_df.columns:
+        for idx_r, row_r in monthly_pl_df.iterrows():
+            fulfill_cogs[idx_r + 1] = row_r['DTC Gross Revenue'] * fulfillment_rate
+    return fulfill_cogs
 
 
 def calculate_cash_runway(
@@ -47,6 +71,8 @@ def calculate_cash_runway(
     year: int = 2026,
     po_payments: Dict[int, float] = None,
     fulfillment_cogs: Dict[int, float] = None,
+    ar_terms: Dict[int, float] = None,
+    ap_terms: Dict[int, float] = None,
 ) -> pd.DataFrame:
     """
     Calculate month-by-month cash runway.
@@ -55,11 +81,26 @@ def calculate_cash_runway(
     the inventory-aware COGS split instead of the P&L COGS column:
       Cash COGS = po_payments[month] + fulfillment_cogs[month] + ws_cogs[month]
 
+    ar_terms / ap_terms ({days: share}, e.g. {30: 0.6, 60: 0.4}) age wholesale
+    revenue and Other OpEx through aging_engine: they hit cash when collected or
+    paid, and the open AR / AP balances settle over the same terms instead of
+    counting in the starting position. Without them cash moves in the month
+    recognized, as before.
+
     Returns DataFrame with monthly cash flow detail.
     """
+    # Aged receivables / payables: wholesale revenue and vendor OpEx
+    ar_aging = ap_aging = None
+    if ar_terms:
+        ar_aging = aging_engine.age_flows(
+            monthly_pl_df['Wholesale Revenue'].to_numpy(dtype=float), ar_terms, current_ar)
+    if ap_terms:
+        ap_aging = aging_engine.age_flows(
+            monthly_pl_df['Other OpEx'].to_numpy(dtype=float), ap_terms, current_ap)
+
     # Starting position
-    current_cash_assets = starting_cash + current_ar
-    current_liabilities = current_ap
+    current_cash_assets = starting_cash + (0 if ar_aging else current_ar)
+    current_liabilities = 0 if ap_aging else current_ap
     net_cash = current_cash_assets - current_liabilities
 
     # Get monthly funding
@@ -71,12 +112,16 @@ def calculate_cash_runway(
     cumulative_cash = net_cash
     cumulative_cash_no_fund = net_cash
 
-    for idx, row in monthly_pl_df.iterrows():
+    for pos, (idx, row) in enumerate(monthly_pl_df.iterrows()):
         month_num = idx + 1
         month_name = row['Month']
         revenue = row['Total Revenue']
         opex = row['Total OpEx']
         funding = monthly_funding.get(month_num, 0)
+        if ar_aging:
+            revenue = row['DTC Revenue'] + ar_aging['cash'][pos]
+        if ap_aging:
+            opex = row['Team Costs'] + ap_aging['cash'][pos]
 
         if use_inv_split:
             inv_purchase = po_payments.get(month_num, 0)
@@ -127,12 +172,224 @@ def calculate_cash_runway(
             entry['Inventory Purchases'] = inv_purchase
             entry['Fulfillment COGS'] = fulfill
             entry['WS COGS'] = ws_cog
+        if ar_aging:
+            entry['AR Collections'] = ar_aging['cash'][pos]
+            entry['AR Balance'] = ar_aging['balance'][pos]
+        if ap_aging:
+            entry['AP Payments'] = ap_aging['cash'][pos]
+            entry['AP Balance'] = ap_aging['balance'][pos]
 
         runway_data.append(entry)
 
     return pd.DataFrame(runway_data)
 
 
+def _terms_mix_inputs(label: str, key: str, defaults: Dict[str, int]) -> Dict[int, float]:
+    """Percent of invoices per payment term -> {days: share}"""
+    st.markdown(f"**{label}**")
+    cols = st.columns(len(aging_engine.TERMS_PRESETS))
+    shares = {}
+    for col, name in zip(cols, aging_engine.TERMS_PRESETS):
+        with col:
+            shares[name] = st.number_input(
+                f"{name} (%)", min_value=0, max_value=100, value=defaults.get(name, 0),
+                step=5, key=f"{key}_{name}",
+            )
+    if sum(shares.values()) <= 0:
+        st.warning(f"{label}: enter at least one non-zero share; paying in the month recognized.")
+        return None
+    if sum(shares.values()) != 100:
+        st.caption(f"{label} shares add to {sum(shares.values())}%; they are scaled to 100%.")
+    return aging_engine.mix_from_shares(shares)
+
+
+def show_payment_terms():
+    """Optional AR/AP aging inputs; returns (ar_terms, ap_terms) or (None, None)"""
+    with st.expander("⏱️ Payment Terms (AR/AP Aging)"):
+        enabled = st.checkbox(
+            "Apply payment terms to the runway", value=False, key="aging_enabled",
+            help="Collect wholesale invoices and pay vendor OpEx on their terms instead of "
+                 "in the month they are recognized. Open AR/AP settle over the same terms.",
+        )
+        ar_terms = _terms_mix_inputs("Wholesale Receivables", "aging_ar",
+                                     {'Net 30': 50, 'Net 60': 30, 'Net 90': 20})
+        ap_terms = _terms_mix_inputs("Vendor Payables (Other OpEx)", "aging_ap",
+                                     {'Due on receipt': 20, 'Net 30': 80})
+    if not enabled:
+        return None, None
+    return ar_terms, ap_terms
+
+
+def show_aging_buckets(monthly_df, runway_df, ar_terms, ap_terms):
+    """Open AR / AP at one month end split by invoice age (aging_engine.aging_buckets)"""
+    months = list(runway_df['Month'])
+    month = st.selectbox("Aging as of", months, index=len(months) - 1, key="aging_month")
+    pos = months.index(month)
+    table = {}
+    for label, balance_col, flow_col, terms in (('AR', 'AR Balance', 'Wholesale Revenue', ar_terms),
+                                                ('AP', 'AP Balance', 'Other OpEx', ap_terms)):
+        if balance_col not in runway_df.columns:
+            continue
+        buckets = aging_engine.aging_buckets(monthly_df[flow_col].to_numpy(dtype=float), terms)[:, pos]
+        # Whatever is left of the starting AR / AP has no invoice dates; shown on its own
+        opening = max(runway_df[balance_col].iloc[pos] - buckets.sum(), 0.0)
+        table[label] = list(buckets) + [opening]
+    aging = pd.DataFrame(table, index=list(aging_engine.AGING_BUCKETS) + ['Opening Balance'])
+    aging.loc['Total'] = aging.sum()
+    st.dataframe(aging.style.format("${:,.0f}"), use_container_width=True)
+
+
+def show_goal_seek(starting_cash, current_ar, current_ap, team_members, opex_expenses,
+                   wholesale_deals, fundraising_rounds, po_data, inv_config):
+    """Solve for minimum fundraise, break-even AOV and cash-zero month"""
+    st.markdown("## Goal Seek")
+    if not (po_data and inv_config):
+        st.info("Goal seek runs on the inventory model. Set up POs and inventory on the "
+                "Inventory Tracker to enable it.")
+        return
+    st.caption("Solved on the 2026 model at recognized timing (payment-term aging is not applied).")
+
+    base = scenario_model.get_scenario_base(
+        2026, team_members, opex_expenses, wholesale_deals, po_data,
+        fundraising_rounds, starting_cash, current_ar, current_ap)
+    params = scenario_model.base_parameters(inv_config)
+
+    tab1, tab2, tab3 = st.tabs(["Minimum Fundraise", "Break-Even AOV", "Cash-Zero Month"])
+
+    with tab1:
+        col1, col2 = st.columns(2)
+        with col1:
+            month = st.selectbox("Raise Lands In", range(1, 13),
+                                 format_func=lambda m: f"{goal_seek.MONTHS[m - 1]} 2026",
+                                 key="seek_raise_month")
+        with col2:
+            floor = st.number_input("Keep Cash Above ($)", min_value=0.0, value=0.0,
+                                    step=5000.0, key="seek_cash_floor")
+        result = goal_seek.minimum_fundraise(base, params, month, floor)
+        if result['status'] == 'already_met':
+            st.success(f"No extra raise needed: cash stays above ${floor:,.0f} all year.")
+        elif result['status'] == 'solved':
+            st.metric(f"Minimum Raise in {goal_seek.MONTHS[month - 1]}", f"${result['value']:,.0f}",
+                      delta=f"Lowest cash ${result['metric']:,.0f}", delta_color="off")
+        else:
+            st.warning(result.get('reason', "No raise in this month reaches the target."))
+
+    with tab2:
+        col1, col2 = st.columns(2)
+        with col1:
+            product = st.selectbox("Product", ["Beta", "Alpha"], key="seek_product")
+        with col2:
+            quarter = st.selectbox("Break Even In", [1, 2, 3, 4], index=3,
+                                   format_func=lambda q: f"Q{q} 2026", key="seek_quarter")
+        param = f"{product.lower()}_aov"
+        result = goal_seek.breakeven_value(base, params, param, goal_seek.QUARTER_MONTHS[quarter])
+        if result['status'] == 'solved':
+            st.metric(f"Break-Even {product} AOV (Q{quarter} EBITDA = 0)", f"${result['value']:,.2f}",
+                      delta=f"{result['value'] - params[param]:+,.2f} vs current ${params[param]:,.0f}",
+                      delta_color="inverse")
+        elif result['status'] == 'already_met':
+            st.success(f"Q{quarter} EBITDA is positive at any {product} AOV in range.")
+        else:
+            st.warning(f"No {product} AOV up to ${params[param] * 3:,.0f} breaks even in Q{quarter}: "
+                       f"best case Q{quarter} EBITDA ${result['metric']:,.0f}.")
+
+    with tab3:
+        zero = goal_seek.cash_zero_month(base, params)
+        if zero['month']:
+            st.metric("Cash Goes Negative", f"{goal_seek.MONTHS[zero['month'] - 1]} 2026",
+                      delta=f"Low point ${zero['min_cash']:,.0f}", delta_color="off")
+        else:
+            st.success(f"Cash stays positive through Dec 2026 (low point ${zero['min_cash']:,.0f}).")
+
+
+def show_13_week_forecast(starting_cash, current_ar, current_ap, team_members, opex_expenses,
+                          wholesale_deals, fundraising_rounds, po_data, inv_config):
+    """Rolling 13-week cash view from the daily cash ledger"""
+    st.markdown("## 13-Week Cash Forecast")
+    st.caption("Cash events placed on their actual days: payroll on the 15th and month end, "
+               "OpEx on the 1st, PO payments in the month they fall due, wholesale invoices "
+               "collected after their terms, DTC sales spread daily.")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        start = st.date_input("Forecast Start", value=date.today(), key="ledger_start")
+    with col2:
+        ws_terms = st.number_input("Wholesale Terms (days)", min_value=0, max_value=180,
+                                   value=cash_ledger.DEFAULT_WS_TERMS_DAYS, step=15,
+                                   key="ledger_ws_terms",
+                                   help="Days from delivery until the wholesale invoice is collected")
+    with col3:
+        settle_days = st.number_input("Open AR/AP Settles Over (days)", min_value=1, max_value=90,
+                                      value=cash_ledger.DEFAULT_SETTLE_DAYS, step=5,
+                                      key="ledger_settle_days")
+
+    ledger = cash_ledger.build_13_week_forecast(
+        start, starting_cash, team_members, opex_expenses, wholesale_deals,
+        fundraising_rounds, po_data if inv_config else None, inv_config,
+        current_ar, current_ap, int(ws_terms), int(settle_days),
+    )
+    weekly = cash_ledger.aggregate_ledger(ledger, 'W')
+    cash_out = cash_ledger.first_negative_day(ledger)
+    low = int(weekly['Lowest Daily Cash'].idxmin())
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Cash at Week 13", f"${weekly['Ending Cash'].iloc[-1]:,.0f}")
+    with col2:
+        st.metric("Lowest Daily Balance", f"${weekly['Lowest Daily Cash'].iloc[low]:,.0f}",
+                  delta=f"Week of {weekly['Start'].iloc[low]:%b %d}", delta_color="off")
+    with col3:
+        if cash_out:
+            st.metric("Cash-Out Date", f"{cash_out:%b %d, %Y}",
+                      delta=f"{(cash_out - start).days} days", delta_color="inverse")
+        else:
+            st.metric("Cash-Out Date", "None in 13 weeks ✅")
+
+    with span("figure.cash_13_week"):
+        fig_weeks = make_subplots(specs=[[{"secondary_y": True}]])
+        fig_weeks.add_trace(
+            go.Bar(
+                name='Net Cash Flow',
+                x=weekly['Start'],
+                y=weekly['Net Cash Flow'],
+                marker_color=['#00BA38' if v >= 0 else '#F8766D' for v in weekly['Net Cash Flow']],
+            ),
+            secondary_y=False,
+        )
+        fig_weeks.add_trace(
+            go.Scatter(
+                name='Daily Balance',
+                x=ledger['days'].astype('datetime64[ns]'),
+                y=ledger['balance'],
+                mode='lines',
+                line=dict(color='#1f77b4', width=2),
+            ),
+            secondary_y=True,
+        )
+        fig_weeks.add_hline(y=0, line_dash="dash", line_color="red", secondary_y=True)
+        fig_weeks.update_layout(title="Weekly Net Cash Flow and Daily Balance", height=420,
+                                hovermode='x unified')
+        fig_weeks.update_yaxes(title_text="Net Flow ($)", secondary_y=False)
+        fig_weeks.update_yaxes(title_text="Cash Balance ($)", secondary_y=True)
+
+    st.plotly_chart(fig_weeks, use_container_width=True)
+
+    display_df = weekly.copy()
+    display_df['Week Of'] = display_df['Start'].dt.strftime('%b %d, %Y')
+    money_cols = ledger['categories'] + ['Net Cash Flow', 'Ending Cash', 'Lowest Daily Cash']
+    for col in money_cols:
+        display_df[col] = display_df[col].apply(lambda x: f"${x:,.0f}")
+    st.dataframe(display_df[['Period', 'Week Of'] + money_cols], use_container_width=True, hide_index=True)
+
+    st.download_button(
+        label="📥 Download 13-Week Forecast (CSV)",
+        data=weekly.to_csv(index=False),
+        file_name=f"alma_mater_13_week_cash_{datetime.now().strftime('%Y%m%d')}.csv",
+        mime="text/csv",
+        key="ledger_download",
+    )
+
+
 def show():
     """Display cash flow and runway calculator"""
     
@@ -145,6 +402,10 @@ def show():
     team_members = st.session_state.get('team_members', [])
     opex_expenses = st.session_state.get('opex_expenses', [])
     wholesale_deals = st.session_state.get('wholesale_deals', [])
+    if st.checkbox("Risk-adjust wholesale pipeline", value=False, key="cash_ws_risk_adjust",
+                   help="Weight open deals by their stage's win probability and delivery slip "
+                        "instead of treating every deal as certain"):
+        wholesale_deals = wholesale_pipeline.expected_deals(wholesale_deals)
     
     # --- INPUT SECTION ---
     st.markdown("## Current Cash Position")
@@ -154,7 +415,8 @@ def show():
     with col1:
         # Use QBO cash balance if available
         qbo = st.session_state.get('qbo_actuals')
-        default_cash = qbo.get('latest_cash', 41422.0) if qbo else 41422.0
+        baseline_position = get_baseline_cash_position()
+        default_cash = qbo.get('latest_cash', baseline_position['cash']) if qbo else baseline_position['cash']
         starting_cash = st.number_input(
             "Current Cash Balance ($)",
             min_value=0.0,
@@ -174,7 +436,7 @@ def show():
     
     with col3:
         # Use QBO AP if available
-        default_ap = qbo.get('latest_ap', 8414.0) if qbo else 8414.0
+        default_ap = qbo.get('latest_ap', baseline_position['ap']) if qbo else baseline_position['ap']
         current_ap = st.number_input(
             "Open Accounts Payable ($)",
             min_value=0.0,
@@ -274,16 +536,9 @@ def show():
         pay_terms = inv_config.get('payment_terms_months', 5)
         po_pay = calculate_po_payments(po_data, lead, pay_terms, 2026)
 
-        # Fulfillment COGS = DTC gross revenue * (total_cogs_rate - product_cost_rate)
-        # i.e. warehousing + freight + merchant = 15% of gross DTC revenue at sale time
-        cogs_total = inv_config.get('cogs_total_rate', 0.40)
-        cogs_product = inv_config.get('cogs_product_pct', 0.25)
-        fulfillment_rate = cogs_total - cogs_product  # 0.15
+        fulfill_cogs = calculate_fulfillment_cogs(monthly_df, inv_config)
 
-        fulfill_cogs = {m: 0.0 for m in range(1, 13)}
-        if 'DTC Gross Revenue' in monthly_df.columns:
-            for idx_r, row_r in monthly_df.iterrows():
-                fulfill_cogs[idx_r + 1] = row_r['DTC Gross Revenue'] * fulfillment_rate
+    ar_terms, ap_terms = show_payment_terms()
 
     # Calculate runway
     runway_df = calculate_cash_runway(
@@ -295,6 +550,8 @@ def show():
         year=2026,
         po_payments=po_pay,
         fulfillment_cogs=fulfill_cogs,
+        ar_terms=ar_terms,
+        ap_terms=ap_terms,
     )
     
     # --- BURN BREAKDOWN ---
@@ -327,25 +584,26 @@ def show():
         # Burn composition breakdown using first month detail
         sample_pl = monthly_df.iloc[0]
         
-        fig_burn = go.Figure(data=[
-            go.Bar(
-                x=['Team Costs', 'Other OpEx', 'COGS', 'Revenue'],
-                y=[
-                    sample_pl['Team Costs'],
-                    sample_pl['Other OpEx'],
-                    sample_pl['Total COGS'],
-                    -sample_pl['Total Revenue']  # Negative to show offset
-                ],
-                marker_color=['#E63946', '#F4A261', '#E9C46A', '#00BA38']
-            )
-        ])
+        with span("figure.burn_breakdown"):
+            fig_burn = go.Figure(data=[
+                go.Bar(
+                    x=['Team Costs', 'Other OpEx', 'COGS', 'Revenue'],
+                    y=[
+                        sample_pl['Team Costs'],
+                        sample_pl['Other OpEx'],
+                        sample_pl['Total COGS'],
+                        -sample_pl['Total Revenue']  # Negative to show offset
+                    ],
+                    marker_color=['#E63946', '#F4A261', '#E9C46A', '#00BA38']
+                )
+            ])
         
-        fig_burn.update_layout(
-            title=f'Cash Flow Components - {sample_pl["Month"]} (Example)',
-            height=350,
-            showlegend=False,
-            yaxis_title="Amount ($)"
-        )
+            fig_burn.update_layout(
+                title=f'Cash Flow Components - {sample_pl["Month"]} (Example)',
+                height=350,
+                showlegend=False,
+                yaxis_title="Amount ($)"
+            )
         
         st.plotly_chart(fig_burn, use_container_width=True)
     
@@ -354,82 +612,99 @@ def show():
     # --- CHARTS ---
     
     # Cash waterfall chart
-    fig_waterfall = go.Figure(data=[
-        go.Waterfall(
-            name="Cash Flow",
-            orientation="v",
-            x=runway_df['Month'],
-            textposition="outside",
-            y=runway_df['Net Cash Flow'],
-            connector={"line": {"color": "rgb(63, 63, 63)"}},
-        )
-    ])
+    with span("figure.cash_waterfall"):
+        fig_waterfall = go.Figure(data=[
+            go.Waterfall(
+                name="Cash Flow",
+                orientation="v",
+                x=runway_df['Month'],
+                textposition="outside",
+                y=runway_df['Net Cash Flow'],
+                connector={"line": {"color": "rgb(63, 63, 63)"}},
+            )
+        ])
     
-    fig_waterfall.update_layout(
-        title="Monthly Cash Flow Waterfall",
-        showlegend=False,
-        height=400
-    )
+        fig_waterfall.update_layout(
+            title="Monthly Cash Flow Waterfall",
+            showlegend=False,
+            height=400
+        )
     
     st.plotly_chart(fig_waterfall, use_container_width=True)
     
     # Ending cash balance projection
-    fig_cash = make_subplots(
-        rows=2, cols=1,
-        subplot_titles=('Projected Cash Balance', 'Monthly Burn Rate'),
-        vertical_spacing=0.15,
-        row_heights=[0.6, 0.4]
-    )
+    with span("figure.cash_balance"):
+        fig_cash = make_subplots(
+            rows=2, cols=1,
+            subplot_titles=('Projected Cash Balance', 'Monthly Burn Rate'),
+            vertical_spacing=0.15,
+            row_heights=[0.6, 0.4]
+        )
     
-    # Cash balance line (with funding)
-    colors_cash = ['#00BA38' if x >= 0 else '#F8766D' for x in runway_df['Ending Cash']]
-    fig_cash.add_trace(
-        go.Scatter(
-            name='With Funding',
-            x=runway_df['Month'],
-            y=runway_df['Ending Cash'],
-            mode='lines+markers',
-            line=dict(color='#1f77b4', width=3),
-            marker=dict(size=10, color=colors_cash),
-            fill='tozeroy'
-        ),
-        row=1, col=1
-    )
-
-    # Cash balance line (without funding) - dashed
-    if runway_df['Funding'].sum() > 0:
+        # Cash balance line (with funding)
+        colors_cash = ['#00BA38' if x >= 0 else '#F8766D' for x in runway_df['Ending Cash']]
         fig_cash.add_trace(
             go.Scatter(
-                name='Without Funding',
+                name='With Funding',
                 x=runway_df['Month'],
-                y=runway_df['Ending Cash (No Funding)'],
+                y=runway_df['Ending Cash'],
                 mode='lines+markers',
-                line=dict(color='#E63946', width=2, dash='dash'),
-                marker=dict(size=6),
+                line=dict(color='#1f77b4', width=3),
+                marker=dict(size=10, color=colors_cash),
+                fill='tozeroy'
             ),
             row=1, col=1
         )
+
+        # Cash balance line (without funding) - dashed
+        if runway_df['Funding'].sum() > 0:
+            fig_cash.add_trace(
+                go.Scatter(
+                    name='Without Funding',
+                    x=runway_df['Month'],
+                    y=runway_df['Ending Cash (No Funding)'],
+                    mode='lines+markers',
+                    line=dict(color='#E63946', width=2, dash='dash'),
+                    marker=dict(size=6),
+                ),
+                row=1, col=1
+            )
     
-    # Zero line
-    fig_cash.add_hline(y=0, line_dash="dash", line_color="red", row=1, col=1)
-    
-    # Burn rate
-    fig_cash.add_trace(
-        go.Bar(
-            name='Monthly Burn',
-            x=runway_df['Month'],
-            y=runway_df['Monthly Burn Rate'],
-            marker_color='#F8766D'
-        ),
-        row=2, col=1
-    )
+        # Zero line
+        fig_cash.add_hline(y=0, line_dash="dash", line_color="red", row=1, col=1)
     
-    fig_cash.update_layout(height=700, showlegend=True)
-    fig_cash.update_yaxes(title_text="Cash Balance ($)", row=1, col=1)
-    fig_cash.update_yaxes(title_text="Burn Rate ($)", row=2, col=1)
+        # Burn rate
+        fig_cash.add_trace(
+            go.Bar(
+                name='Monthly Burn',
+                x=runway_df['Month'],
+                y=runway_df['Monthly Burn Rate'],
+                marker_color='#F8766D'
+            ),
+            row=2, col=1
+        )
     
-    st.plotly_chart(fig_cash, use_container_width=True)
+        fig_cash.update_layout(height=700, showlegend=True)
+        fig_cash.update_yaxes(title_text="Cash Balance ($)", row=1, col=1)
+        fig_cash.update_yaxes(title_text="Burn Rate ($)", row=2, col=1)
     
+    st.plotly_chart(fig_cash, use_container_width=True)
+
+    # Open receivables / payables when payment terms are applied
+    balance_cols = [c for c in ['AR Balance', 'AP Balance'] if c in runway_df.columns]
+    if balance_cols:
+        with span("figure.ar_ap_balances"):
+            fig_aging = go.Figure()
+            for col, color in zip(balance_cols, ['#2A9D8F', '#E76F51']):
+                fig_aging.add_trace(go.Scatter(
+                    name=col, x=runway_df['Month'], y=runway_df[col],
+                    mode='lines+markers', line=dict(color=color, width=2),
+                ))
+            fig_aging.update_layout(title="Open AR / AP Balances (Month End)", height=350,
+                                    yaxis_title="Balance ($)")
+        st.plotly_chart(fig_aging, use_container_width=True)
+        show_aging_buckets(monthly_df, runway_df, ar_terms, ap_terms)
+
     st.divider()
     
     # --- DATA TABLE ---
@@ -440,7 +715,8 @@ def show():
     money_cols = ['Cash Inflow', 'Funding', 'Cash Outflow', 'Net Cash Flow',
                   'Ending Cash', 'Ending Cash (No Funding)', 'Monthly Burn Rate']
     # Add inventory split columns if present
-    for extra in ['Inventory Purchases', 'Fulfillment COGS', 'WS COGS']:
+    for extra in ['Inventory Purchases', 'Fulfillment COGS', 'WS COGS',
+                  'AR Collections', 'AR Balance', 'AP Payments', 'AP Balance']:
         if extra in display_df.columns:
             money_cols.append(extra)
     for col in money_cols:
@@ -461,6 +737,18 @@ def show():
     
     st.divider()
 
+    # --- GOAL SEEK ---
+    show_goal_seek(starting_cash, current_ar, current_ap, team_members, opex_expenses,
+                   wholesale_deals, fundraising_rounds, po_data, inv_config)
+
+    st.divider()
+
+    # --- 13-WEEK FORECAST ---
+    show_13_week_forecast(starting_cash, current_ar, current_ap, team_members, opex_expenses,
+                          wholesale_deals, fundraising_rounds, po_data, inv_config)
+
+    st.divider()
+
     # --- AP INFO ---
     st.markdown("### Accounts Payable")
     if qbo and qbo.get('latest_ap'):
@@ -0,0 +1,95 @@
+"""
+Consolidation Page
+Per-entity results and the consolidated roll-up across every entity
+"""
+
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+import sys
+from pathlib import Path
+
+parent_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(parent_dir))
+
+import consolidation
+from data_persistence import create_entity, list_entities
+from instrumentation import span
+
+
+PL_LINES = ['Total Revenue', 'Total COGS', 'Gross Profit', 'Total OpEx', 'EBITDA']
+
+
+def show():
+    st.markdown('<div class="main-header">Consolidation</div>', unsafe_allow_html=True)
+    st.markdown('<div class="sub-header">Entity forecasts rolled up into one consolidated view</div>', unsafe_allow_html=True)
+
+    entities = list_entities()
+    selected = st.multiselect("Entities", entities, default=entities, key="consolidation_entities")
+    if not selected:
+        st.info("Select at least one entity.")
+        show_create_entity()
+        return
+
+    with span("model.consolidation"):
+        result = consolidation.consolidate(selected)
+    st.caption("Built from each entity's saved data. Only entities whose data changed are recomputed.")
+
+    # Summary
+    summary = consolidation.entity_summary(result)
+    st.markdown("### 2026 Summary by Entity")
+    st.dataframe(
+        summary.style.format({c: "${:,.0f}" for c in summary.columns if c != 'Entity'}),
+        use_container_width=True, hide_index=True,
+    )
+
+    # Consolidated cash
+    st.markdown("### Consolidated Cash Balance")
+    with span("figure.consolidated_cash"):
+        fig = go.Figure()
+        for entity, entity_result in result['entities'].items():
+            fig.add_trace(go.Bar(x=entity_result['runway']['Month'],
+                                 y=entity_result['runway']['Ending Cash'], name=entity))
+        fig.add_trace(go.Scatter(x=result['runway']['Month'], y=result['runway']['Ending Cash'],
+                                 name='Consolidated', mode='lines+markers',
+                                 line=dict(color='black', width=3)))
+        fig.add_hline(y=0, line_dash="dash", line_color="red")
+        fig.update_layout(barmode='relative', height=420, yaxis_title="Ending Cash ($)",
+                          hovermode='x unified')
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Consolidated P&L
+    st.markdown("### Consolidated P&L")
+    pl = result['pl']
+    table = pl.set_index('Month')[[c for c in PL_LINES if c in pl.columns]].T
+    table['Total'] = table.sum(axis=1)
+    st.dataframe(table.style.format("${:,.0f}"), use_container_width=True)
+
+    with st.expander("P&L by Entity"):
+        line = st.selectbox("Line", PL_LINES, key="consolidation_line")
+        by_entity = pd.DataFrame({
+            entity: entity_result['pl'][line].to_numpy()
+            for entity, entity_result in result['entities'].items()
+        }, index=pl['Month']).T
+        by_entity.loc['Consolidated'] = pl[line].to_numpy()
+        by_entity['Total'] = by_entity.sum(axis=1)
+        st.dataframe(by_entity.style.format("${:,.0f}"), use_container_width=True)
+
+    show_create_entity()
+
+
+def show_create_entity():
+    """Form for adding an entity with its own, initially empty, data directory"""
+    with st.expander("Add Entity"):
+        st.caption("A new entity starts with no team, OpEx, deals, POs or actuals. "
+                   "Select it in the sidebar to enter its data.")
+        with st.form("create_entity_form"):
+            name = st.text_input("Entity name", key="new_entity_name")
+            if st.form_submit_button("Create Entity"):
+                try:
+                    entity = create_entity(name)
+                except ValueError as e:
+                    st.error(str(e))
+                else:
+                    st.success(f"Created entity '{entity}'")
+                    st.rerun()
@@ -26,6 +26,11 @@ from financial_calcs import (
 from qbo_parser import (
     deserialize_qbo_data, build_actuals_dataframe, actuals_to_pl_format, MONTHS
 )
+from instrumentation import timed
+import variance_engine
+import anomaly_scan
+
+MAX_ANOMALY_ALERTS = 5
 
 
 # ---------------------------------------------------------------------------
@@ -87,6 +92,7 @@ def _fmt(val, prefix="$", decimals=0):
 # PDF Generation
 # ---------------------------------------------------------------------------
 
+@timed()
 def generate_pdf_report():
     """Build the full management report PDF and return a BytesIO buffer."""
     try:
@@ -138,6 +144,12 @@ def generate_pdf_report():
     forecast_mo_idx = (report_mo - 1) if has_actuals else 0
     forecast_row = forecast_df.iloc[forecast_mo_idx].to_dict() if has_actuals else None
 
+    # Actual vs forecast variances for every metric through the report month
+    variances = None
+    if current_row:
+        report_rows = actuals_rows_26 if report_yr == 2026 else actuals_rows_25
+        variances = variance_engine.analyze(pd.DataFrame(report_rows), forecast_df, report_mo)
+
     # QBO raw data
     qbo_raw = st.session_state.get('qbo_actuals', {})
     latest_cash = qbo_raw.get('latest_cash', 0) if qbo_raw else 0
@@ -285,22 +297,24 @@ def generate_pdf_report():
     story.append(Paragraph("Key Variances & Alerts", section_style))
 
     alerts = []
-    if has_actuals and forecast_row and current_row:
-        for metric in ['Total Revenue', 'Total COGS', 'Total OpEx', 'EBITDA']:
-            act = current_row.get(metric, 0)
-            fc = forecast_row.get(metric, 0)
-            if fc != 0:
-                var_pct = (act - fc) / abs(fc) * 100
-                if abs(var_pct) > 10:
-                    direction = "over" if var_pct > 0 else "under"
-                    flag = "Favorable" if (
-                        (metric in ['Total Revenue', 'EBITDA'] and var_pct > 0) or
-                        (metric in ['Total COGS', 'Total OpEx'] and var_pct < 0)
-                    ) else "Unfavorable"
-                    alerts.append(
-                        f"{metric}: {_fmt(act)} actual vs {_fmt(fc)} forecast "
-                        f"({var_pct:+.1f}% {direction}) - {flag}"
-                    )
+    if variances is not None:
+        flagged = variance_engine.alerts(
+            variances, metrics=['Total Revenue', 'Total COGS', 'Total OpEx', 'EBITDA'])
+        for row in flagged:
+            direction = "over" if row['Variance %'] > 0 else "under"
+            flag = "Favorable" if row['Favorable'] else "Unfavorable"
+            alerts.append(
+                f"{row['Metric']}: {_fmt(row['Actual'])} actual vs {_fmt(row['Forecast'])} forecast "
+                f"({row['Variance %']:+.1f}% {direction}) - {flag}"
+            )
+
+    # Unusual movements in the imported accounts for the report month
+    if has_actuals:
+        flags = anomaly_scan.latest_flags(anomaly_scan.scan_serialized(qbo_raw), report_yr, report_mo)
+        for flag in flags.head(MAX_ANOMALY_ALERTS).to_dict('records'):
+            alerts.append(f"Anomaly ({flag['Check']}): {anomaly_scan.describe(flag)}")
+        if len(flags) > MAX_ANOMALY_ALERTS:
+            alerts.append(f"{len(flags) - MAX_ANOMALY_ALERTS} more flagged movements on the QBO Import page")
 
     if days_runway < 90:
         alerts.append(f"CASH ALERT: Only {days_runway:.0f} days of runway remaining")
@@ -317,14 +331,12 @@ def generate_pdf_report():
         story.append(Paragraph("Year-to-Date Summary (2026)", section_style))
 
         ytd_data = [['Metric', 'YTD Actual', 'YTD Forecast', 'Variance $', 'Variance %']]
-        for metric in ['Total Revenue', 'Total COGS', 'Gross Profit', 'Total OpEx', 'EBITDA']:
-            ytd_act = sum(r.get(metric, 0) for r in actuals_rows_26[:report_mo])
-            ytd_fc = forecast_df[metric].iloc[:report_mo].sum()
-            var_d = ytd_act - ytd_fc
-            var_p = _safe_pct(var_d, abs(ytd_fc))
+        ytd = variance_engine.period_summary(variances, window='YTD').set_index('Metric')
+        for metric in variance_engine.SUMMARY_METRICS:
+            row = ytd.loc[metric]
             ytd_data.append([
-                metric, _fmt(ytd_act), _fmt(ytd_fc),
-                _fmt(var_d), f"{var_p:+.1f}%",
+                metric, _fmt(row['Actual']), _fmt(row['Forecast']),
+                _fmt(row['Variance $']), f"{row['Variance %']:+.1f}%",
             ])
 
         ytd_table = Table(ytd_data, colWidths=[1.6*inch, 1.3*inch, 1.3*inch, 1.2*inch, 1.1*inch])
@@ -27,7 +27,7 @@ def show():
     # Load fundraising rounds from session state
     if 'fundraising_rounds' not in st.session_state:
         from data_persistence import get_data_store
-        store = get_data_store()
+        store = get_data_store(st.session_state.get('entity'))
         saved = store.load_fundraising()
         if saved:
             st.session_state.fundraising_rounds = saved
@@ -193,6 +193,6 @@ def show():
     # Save
     if st.button("Save Fundraising Data", type="primary"):
         from data_persistence import get_data_store
-        store = get_data_store()
+        store = get_data_store(st.session_state.get('entity'))
         store.save_fundraising(rounds)
         st.success("Fundraising data saved.")
@@ -22,6 +22,12 @@ from financial_calcs import (
 )
 from baseline_data import get_baseline_po_data, get_baseline_inventory_config
 from data_persistence import get_data_store
+from instrumentation import span
+import inventory_engine
+import po_planner
+import record_schema
+import inventory_policy
+import demand_forecast
 
 MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
@@ -43,6 +49,256 @@ def _get_po_data():
     return po_data
 
 
+def _signed_dollars(value: float) -> str:
+    return f"{'-' if value < 0 else '+'}${abs(value):,.0f}"
+
+
+def _clear_po_widget_state():
+    """Drop per-PO widget values so replaced POs aren't overwritten by stale inputs."""
+    prefixes = ('po_name_', 'po_prod_', 'po_pairs_', 'po_amt_', 'po_mo_', 'po_yr_')
+    for key in list(st.session_state.keys()):
+        if isinstance(key, str) and key.startswith(prefixes):
+            del st.session_state[key]
+
+
+def show_po_planner(po_data, config, wholesale_deals):
+    """PO Planner tab: search order policies and apply the best plan to po_data."""
+    st.markdown("### PO Planner")
+    st.info(
+        "Proposes order months and quantities per product that minimize DTC revenue lost "
+        "to stockouts while keeping cash above a minimum. POs ordered before the plan "
+        "start are kept; later POs are replaced when you apply a plan."
+    )
+
+    today = datetime.now()
+    default_year = today.year if today.year in po_planner.PLAN_YEARS else po_planner.PLAN_YEARS[0]
+    default_month = today.month if today.year in po_planner.PLAN_YEARS else 1
+
+    qbo = st.session_state.get('qbo_actuals')
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        start_month = st.selectbox(
+            "Plan From (Month)", list(range(1, 13)), index=default_month - 1,
+            format_func=lambda m: MONTHS[m - 1], key="plan_start_month",
+        )
+        start_year = st.selectbox(
+            "Plan From (Year)", list(po_planner.PLAN_YEARS),
+            index=list(po_planner.PLAN_YEARS).index(default_year), key="plan_start_year",
+        )
+    with c2:
+        min_cash = st.number_input("Minimum Cash ($)", value=0.0, step=10000.0, key="plan_min_cash")
+        moq = st.number_input("MOQ (pairs)", min_value=0, value=500, step=100, key="plan_moq")
+    with c3:
+        order_multiple = st.number_input("Order Multiple (pairs)", min_value=1, value=100,
+                                         step=50, key="plan_multiple")
+        starting_cash = st.number_input(
+            "Starting Cash ($)", value=float(qbo.get('latest_cash', 41422.0) if qbo else 41422.0),
+            step=1000.0, key="plan_cash",
+        )
+    with c4:
+        current_ar = st.number_input("Open AR ($)", min_value=0.0, value=0.0, step=100.0, key="plan_ar")
+        current_ap = st.number_input(
+            "Open AP ($)", min_value=0.0,
+            value=float(qbo.get('latest_ap', 8414.0) if qbo else 8414.0),
+            step=100.0, key="plan_ap",
+        )
+
+    if st.button("Run PO Planner", type="primary"):
+        start_abs = (start_year - 2026) * 12 + start_month
+        with span("po_planner.search"):
+            inputs = po_planner.build_plan_inputs(
+                po_data, wholesale_deals,
+                st.session_state.get('team_members', []),
+                st.session_state.get('opex_expenses', []),
+                st.session_state.get('fundraising_rounds', []),
+                config, start_abs, starting_cash, current_ar, current_ap,
+            )
+            plan = po_planner.plan_purchase_orders(inputs, min_cash, moq, order_multiple)
+            current = po_planner.evaluate_current_pos(po_data, inputs, min_cash)
+        st.session_state.po_plan = {'start_abs': start_abs, 'plan': plan, 'current': current}
+
+    result = st.session_state.get('po_plan')
+    if not result:
+        return
+
+    plan, current = result['plan'], result['current']
+    st.caption(
+        f"Evaluated {plan['candidates']} candidate plans from "
+        f"{po_planner.abs_to_label(result['start_abs'])}. Best policy: order every "
+        f"{plan['policy']['cadence']} month(s), {plan['policy']['cover_months']} month(s) of cover "
+        f"x {plan['policy']['safety_factor']:.2f}."
+    )
+    if not plan['feasible']:
+        st.warning(
+            "No candidate keeps cash above the minimum; showing the plan with the highest "
+            "minimum cash. Consider additional funding or a lower minimum."
+        )
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Lost DTC Revenue", f"${plan['lost_revenue']:,.0f}",
+              delta=f"{_signed_dollars(plan['lost_revenue'] - current['lost_revenue'])} vs current",
+              delta_color="inverse")
+    m2.metric("Minimum Cash", f"${plan['min_cash']:,.0f}",
+              delta=f"{_signed_dollars(plan['min_cash'] - current['min_cash'])} vs current")
+    m3.metric("New PO Spend", f"${plan['spend']:,.0f}",
+              delta=f"{_signed_dollars(plan['spend'] - current['spend'])} vs current",
+              delta_color="inverse")
+
+    if plan['po_records']:
+        plan_df = pd.DataFrame(plan['po_records'])
+        plan_df['Order Month'] = [f"{MONTHS[r['order_month'] - 1]} {r['order_year']}"
+                                  for r in plan['po_records']]
+        plan_df = plan_df[['Order Month', 'product', 'pairs', 'amount']].rename(
+            columns={'product': 'Product', 'pairs': 'Pairs', 'amount': 'Amount'})
+        st.dataframe(
+            plan_df.style.format({'Pairs': "{:,.0f}", 'Amount': "${:,.0f}"}),
+            use_container_width=True, hide_index=True,
+        )
+    else:
+        st.success("No new POs needed in the planning window.")
+
+    months_labels = [f"{MONTHS[m]} {str(y)[2:]}" for y in po_planner.PLAN_YEARS for m in range(12)]
+    with span("figure.po_plan_cash"):
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=months_labels, y=current['cash'], name='Current POs',
+                                 mode='lines', line=dict(color='#aec7e8', width=2)))
+        fig.add_trace(go.Scatter(x=months_labels, y=plan['cash'], name='Proposed Plan',
+                                 mode='lines+markers', line=dict(color='#1f77b4', width=2)))
+        fig.add_hline(y=min_cash, line_dash="dash", line_color="red")
+        fig.update_layout(title="Projected Ending Cash", yaxis_title="Cash ($)", height=350)
+    st.plotly_chart(fig, use_container_width=True)
+
+    if st.button("Apply Plan to POs"):
+        order_abs = inventory_engine.order_months(record_schema.columns('po_data', po_data))
+        kept = [po for po, order in zip(po_data, order_abs) if order < result['start_abs']]
+        st.session_state.po_data = kept + [dict(r) for r in plan['po_records']]
+        del st.session_state['po_plan']
+        _clear_po_widget_state()
+        st.rerun()
+
+
+def show_reorder_policy(po_data, config, wholesale_deals):
+    """Reorder Policy tab: safety stock, reorder points and months of cover."""
+    st.markdown("### Reorder Points & Safety Stock")
+
+    cv_estimate, cv_source = inventory_policy.estimate_demand_cv(st.session_state.get('qbo_actuals'))
+    c1, c2 = st.columns(2)
+    with c1:
+        service_level = st.slider(
+            "Target Service Level", min_value=0.80, max_value=0.995,
+            value=inventory_policy.DEFAULT_SERVICE_LEVEL, step=0.005, format="%.3f",
+            help="Probability of not stocking out before a reorder arrives",
+        )
+    with c2:
+        demand_cv = st.number_input(
+            "Demand Variability (CV)", min_value=0.0, max_value=2.0,
+            value=round(cv_estimate, 2), step=0.05,
+            help="Std dev of monthly demand as a share of forecast",
+        )
+    source = "QBO DTC revenue history" if cv_source == 'qbo' else "default (not enough QBO history)"
+    st.caption(
+        f"Estimated CV {cv_estimate:.2f} from {source}. "
+        f"z = {inventory_policy.z_score(service_level):.2f}, "
+        f"lead time = {config.get('lead_time_months', 4)} months."
+    )
+
+    policy_df = inventory_policy.build_inventory_policy(
+        po_data, wholesale_deals, config, service_level=service_level, demand_cv=demand_cv,
+    )
+
+    for product, product_df in policy_df.groupby('Product', sort=False):
+        st.markdown(f"**{product}**")
+        reorder_months = product_df.loc[product_df['Reorder'], 'Month'].tolist()
+        if reorder_months:
+            st.warning(f"Inventory position below reorder point: **{', '.join(reorder_months)}**")
+
+        display_df = product_df.drop(columns=['Product']).set_index('Month')
+        st.dataframe(
+            display_df.style.format({
+                'DTC Demand': "{:,.0f}", 'Ending Inventory': "{:,.0f}",
+                'Lead-Time Demand': "{:,.0f}", 'Safety Stock': "{:,.0f}",
+                'Reorder Point': "{:,.0f}", 'Inventory Position': "{:,.0f}",
+                'Months of Cover': lambda v: "beyond horizon" if v == float('inf') else f"{v:.1f}",
+            }),
+            use_container_width=True, height=300,
+        )
+
+        with span("figure.reorder_policy"):
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=product_df['Month'], y=product_df['Inventory Position'],
+                                     name='Inventory Position', mode='lines+markers'))
+            fig.add_trace(go.Scatter(x=product_df['Month'], y=product_df['Reorder Point'],
+                                     name='Reorder Point', mode='lines', line=dict(dash='dash')))
+            fig.add_trace(go.Scatter(x=product_df['Month'], y=product_df['Safety Stock'],
+                                     name='Safety Stock', mode='lines', line=dict(dash='dot')))
+            fig.update_layout(title=f"{product}: Position vs Reorder Point",
+                              yaxis_title="Units", height=350)
+        st.plotly_chart(fig, use_container_width=True)
+        st.divider()
+
+
+def show_demand_forecast(config):
+    """Demand Forecast tab: Holt-Winters DTC demand from QBO history vs the plan."""
+    st.markdown("### Statistical DTC Demand Forecast")
+
+    qbo = st.session_state.get('qbo_actuals')
+    c1, c2 = st.columns(2)
+    with c1:
+        year = st.selectbox("Forecast Year", [2026, 2027, 2028, 2029, 2030], key="demand_fc_year")
+    with c2:
+        interval = st.slider("Prediction Interval", min_value=0.50, max_value=0.95,
+                             value=demand_forecast.DEFAULT_INTERVAL, step=0.05, key="demand_fc_interval")
+
+    result = demand_forecast.demand_forecast(qbo, year, config, interval) if qbo else None
+    if result is None:
+        st.info(f"Needs at least {demand_forecast.MIN_HISTORY_MONTHS} months of DTC revenue history. "
+                "Upload a QBO file on the **QBO Import** page.")
+        return
+
+    model = result['model']
+    kind = "trend + 12-month seasonality" if model['seasonal'] else "damped trend (seasonality needs 24 months)"
+    st.caption(
+        f"Fitted to {model['n']} months of QBO DTC revenue: {kind}; "
+        f"alpha {model['alpha']:.2f}, beta {model['beta']:.2f}, gamma {model['gamma']:.2f}, "
+        f"phi {model['phi']:.2f}. Units use the plan's product mix and AOVs. QBO revenue is "
+        f"net of discounts and returns."
+    )
+
+    revenue = result['revenue']
+    history_first, history = demand_forecast.history_series(qbo)
+    with span("figure.demand_forecast"):
+        fig = go.Figure()
+        hist_x = [f"{MONTHS[(m - 1) % 12]} {2026 + (m - 1) // 12}"
+                  for m in range(history_first, history_first + len(history))]
+        fc_x = [f"{MONTHS[m]} {year}" for m in range(12)]
+        fig.add_trace(go.Scatter(x=fc_x + fc_x[::-1],
+                                 y=list(revenue['upper']) + list(revenue['lower'][::-1]),
+                                 fill='toself', fillcolor='rgba(46,134,171,0.2)', line=dict(width=0),
+                                 name=f"{interval:.0%} Interval", hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=hist_x, y=history, name='QBO Actuals', mode='lines+markers',
+                                 line=dict(color='#1D3557')))
+        fig.add_trace(go.Scatter(x=fc_x, y=revenue['mean'], name='Forecast', mode='lines+markers',
+                                 line=dict(color='#2E86AB', dash='dash')))
+        fig.update_layout(title=f"DTC Revenue: History and {year} Forecast", yaxis_title="Revenue ($)",
+                          height=400, hovermode='x unified')
+    st.plotly_chart(fig, use_container_width=True)
+
+    plan = get_dtc_demand_units(year)
+    rows = []
+    for sku, units in result['units'].items():
+        for m in range(12):
+            rows.append({
+                'Product': sku, 'Month': MONTHS[m],
+                'Forecast': units['mean'][m], 'Low': units['lower'][m], 'High': units['upper'][m],
+                'Plan': plan.get(sku, [0] * 12)[m],
+            })
+    units_df = pd.DataFrame(rows)
+    for sku, sku_df in units_df.groupby('Product', sort=False):
+        st.markdown(f"**{sku} Units** — forecast {sku_df['Forecast'].sum():,.0f} vs plan {sku_df['Plan'].sum():,.0f}")
+        st.dataframe(sku_df.drop(columns=['Product']).set_index('Month').T.style.format("{:,.0f}"),
+                     use_container_width=True)
+
+
 def show():
     """Display inventory tracker page."""
     st.markdown('<div class="main-header">Inventory & PO Tracker</div>', unsafe_allow_html=True)
@@ -55,10 +311,13 @@ def show():
     config = _get_inventory_config()
     wholesale_deals = st.session_state.get('wholesale_deals', [])
 
-    tab1, tab2, tab3 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         "PO Management",
         "Inventory Balance",
         "Revenue Impact",
+        "PO Planner",
+        "Reorder Policy",
+        "Demand Forecast",
     ])
 
     # ---------------------------------------------------------------
@@ -71,11 +330,16 @@ def show():
             "inventory balance and constrained DTC revenue."
         )
 
-        # Summary metrics
+        # Summary metrics - from the typed columns, where a value that doesn't parse counts as 0
+        cols = record_schema.columns('po_data', po_data)
+        po_pairs = record_schema.filled(cols['pairs'], 0)
+        po_amounts = record_schema.filled(cols['amount'], 0)
+        po_months = record_schema.filled(cols['order_month'], 1).astype(int)
+        po_years = record_schema.filled(cols['order_year'], 2026).astype(int)
         total_pos = len(po_data)
-        beta_pairs = sum(p['pairs'] for p in po_data if p.get('product') == 'Beta')
-        alpha_pairs = sum(p['pairs'] for p in po_data if p.get('product') == 'Alpha')
-        total_amount = sum(p.get('amount', 0) for p in po_data)
+        beta_pairs = int(po_pairs[cols['product'] == 'Beta'].sum())
+        alpha_pairs = int(po_pairs[cols['product'] == 'Alpha'].sum())
+        total_amount = po_amounts.sum()
 
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("Total POs", total_pos)
@@ -123,7 +387,7 @@ def show():
         for i, po in enumerate(po_data):
             with st.expander(
                 f"{po.get('name', f'PO {i+1}')} — {po.get('product', 'Beta')} | "
-                f"{po.get('pairs', 0):,} pairs | ${po.get('amount', 0):,.0f}",
+                f"{po_pairs[i]:,.0f} pairs | ${po_amounts[i]:,.0f}",
                 expanded=False,
             ):
                 c1, c2 = st.columns(2)
@@ -134,32 +398,38 @@ def show():
                         index=0 if po.get('product', 'Beta') == 'Beta' else 1,
                         key=f"po_prod_{i}",
                     )
-                    po['pairs'] = st.number_input(
-                        "Pairs", min_value=0, value=int(po.get('pairs', 0)),
+                    pairs = st.number_input(
+                        "Pairs", min_value=0, value=int(po_pairs[i]),
                         step=100, key=f"po_pairs_{i}",
                     )
                 with c2:
-                    po['amount'] = st.number_input(
+                    amount = st.number_input(
                         "Amount ($)", min_value=0.0,
-                        value=float(po.get('amount', 0)),
+                        value=float(po_amounts[i]),
                         step=1000.0, key=f"po_amt_{i}",
                     )
-                    po['order_month'] = st.selectbox(
+                    order_month = st.selectbox(
                         "Order Month", list(range(1, 13)),
-                        index=po.get('order_month', 1) - 1,
+                        index=int(min(max(po_months[i], 1), 12)) - 1,
                         format_func=lambda m: MONTHS[m - 1],
                         key=f"po_mo_{i}",
                     )
-                    po['order_year'] = st.selectbox(
+                    order_year = st.selectbox(
                         "Order Year", [2026, 2027],
-                        index=0 if po.get('order_year', 2026) == 2026 else 1,
+                        index=0 if po_years[i] == 2026 else 1,
                         key=f"po_yr_{i}",
                     )
+                # Only edited or missing values are written back, so one that doesn't parse is kept as entered
+                for field, value, current in (('pairs', pairs, po_pairs[i]), ('amount', amount, po_amounts[i]),
+                                              ('order_month', order_month, po_months[i]),
+                                              ('order_year', order_year, po_years[i])):
+                    if value != current or po.get(field) is None:
+                        po[field] = value
 
                 # Calculated fields
                 lead = config.get('lead_time_months', 4)
                 pay = config.get('payment_terms_months', 5)
-                arr_abs = (po['order_year'] - 2026) * 12 + po['order_month'] + lead
+                arr_abs = (order_year - 2026) * 12 + order_month + lead
                 pay_abs = arr_abs + pay
                 arr_mo = MONTHS[(arr_abs - 1) % 12]
                 arr_yr = 2026 + (arr_abs - 1) // 12
@@ -169,7 +439,7 @@ def show():
                 st.caption(
                     f"Arrives: **{arr_mo} {arr_yr}** | "
                     f"Payment Due: **{pay_mo} {pay_yr}** | "
-                    f"Cost/Pair: **${po.get('amount', 0) / max(po.get('pairs', 1), 1):,.2f}**"
+                    f"Cost/Pair: **${amount / max(pairs, 1):,.2f}**"
                 )
 
                 if st.button("Delete PO", key=f"del_po_{i}", type="secondary"):
@@ -293,23 +563,24 @@ def show():
         beta_ending = inv_2026["Beta"]["ending"] + inv_2027["Beta"]["ending"]
         alpha_ending = inv_2026["Alpha"]["ending"] + inv_2027["Alpha"]["ending"]
 
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=months_labels, y=beta_ending,
-            name='Beta', mode='lines+markers',
-            line=dict(color='#1f77b4', width=2),
-        ))
-        fig.add_trace(go.Scatter(
-            x=months_labels, y=alpha_ending,
-            name='Alpha', mode='lines+markers',
-            line=dict(color='#ff7f0e', width=2),
-        ))
-        fig.add_hline(y=0, line_dash="dash", line_color="red")
-        fig.update_layout(
-            title="Ending Inventory by Product (2026-2027)",
-            yaxis_title="Units",
-            height=400,
-        )
+        with span("figure.ending_inventory"):
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=months_labels, y=beta_ending,
+                name='Beta', mode='lines+markers',
+                line=dict(color='#1f77b4', width=2),
+            ))
+            fig.add_trace(go.Scatter(
+                x=months_labels, y=alpha_ending,
+                name='Alpha', mode='lines+markers',
+                line=dict(color='#ff7f0e', width=2),
+            ))
+            fig.add_hline(y=0, line_dash="dash", line_color="red")
+            fig.update_layout(
+                title="Ending Inventory by Product (2026-2027)",
+                yaxis_title="Units",
+                height=400,
+            )
         st.plotly_chart(fig, use_container_width=True)
 
     # ---------------------------------------------------------------
@@ -387,21 +658,22 @@ def show():
             st.dataframe(display_df, use_container_width=True, hide_index=True)
 
             # Chart
-            fig = go.Figure()
-            chart_df = df[df['Month'] != 'TOTAL']
-            fig.add_trace(go.Bar(
-                x=chart_df['Month'], y=chart_df['Unconstrained'],
-                name='Unconstrained', marker_color='#aec7e8',
-            ))
-            fig.add_trace(go.Bar(
-                x=chart_df['Month'], y=chart_df['Constrained'],
-                name='Constrained', marker_color='#1f77b4',
-            ))
-            fig.update_layout(
-                title=f"DTC Revenue: Unconstrained vs Constrained ({year})",
-                barmode='group', height=350,
-                yaxis_title="Revenue ($)",
-            )
+            with span("figure.constrained_revenue"):
+                fig = go.Figure()
+                chart_df = df[df['Month'] != 'TOTAL']
+                fig.add_trace(go.Bar(
+                    x=chart_df['Month'], y=chart_df['Unconstrained'],
+                    name='Unconstrained', marker_color='#aec7e8',
+                ))
+                fig.add_trace(go.Bar(
+                    x=chart_df['Month'], y=chart_df['Constrained'],
+                    name='Constrained', marker_color='#1f77b4',
+                ))
+                fig.update_layout(
+                    title=f"DTC Revenue: Unconstrained vs Constrained ({year})",
+                    barmode='group', height=350,
+                    yaxis_title="Revenue ($)",
+                )
             st.plotly_chart(fig, use_container_width=True)
 
             # Lost revenue callout
@@ -434,3 +706,21 @@ def show():
             st.dataframe(pay_df, use_container_width=True, hide_index=True)
         else:
             st.info("No PO payments scheduled in 2026-2027.")
+
+    # ---------------------------------------------------------------
+    # TAB 4 — PO Planner
+    # ---------------------------------------------------------------
+    with tab4:
+        show_po_planner(po_data, config, wholesale_deals)
+
+    # ---------------------------------------------------------------
+    # TAB 5 — Reorder Policy
+    # ---------------------------------------------------------------
+    with tab5:
+        show_reorder_policy(po_data, config, wholesale_deals)
+
+    # ---------------------------------------------------------------
+    # TAB 6 — Demand Forecast
+    # ---------------------------------------------------------------
+    with tab6:
+        show_demand_forecast(config)
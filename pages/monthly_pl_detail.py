@@ -18,6 +18,12 @@ from financial_calcs import generate_monthly_pl
 from qbo_parser import (
     deserialize_qbo_data, build_actuals_dataframe, actuals_to_pl_format, MONTHS
 )
+from instrumentation import timed
+from data_persistence import get_data_store
+import drilldown
+import forecast_snapshots
+import reforecast
+import variance_engine
 
 
 def get_2025_actuals():
@@ -79,9 +85,8 @@ def get_2026_actuals():
     if max_26_month == 0:
         return None, 0
 
-    actuals = build_actuals_dataframe(parsed['pl_data'], 2026, max_26_month)
-    rows = actuals_to_pl_format(actuals)
-    return pd.DataFrame(rows), max_26_month
+    # Dashboard P&L columns plus the full QBO chart of accounts
+    return variance_engine.actuals_frame(parsed['pl_data'], 2026, max_26_month), max_26_month
 
 
 def format_currency_table(df, cols):
@@ -93,6 +98,7 @@ def format_currency_table(df, cols):
     return display
 
 
+@timed()
 def make_pl_chart(df, title, has_team_costs=False):
     """Create standard P&L chart."""
     fig = go.Figure()
@@ -142,12 +148,17 @@ def show():
     df_2025, source_25 = get_2025_actuals()
     df_2026_actual, last_actual_month = get_2026_actuals()
 
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    snapshots = forecast_snapshots.SnapshotStore.for_store(get_data_store(st.session_state.get('entity')))
+
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
         "2025 Actuals",
         "2026 Forecast",
         "Variance Analysis",
         "Year Comparison",
         "Assumptions Breakdown",
+        "Drill-Down",
+        "Reforecast",
+        "Snapshots",
     ])
 
     # --- TAB 1: 2025 ACTUALS ---
@@ -228,23 +239,29 @@ def show():
                 f"Showing variance for closed months: **Jan - {MONTHS[last_actual_month - 1]} 2026**"
             )
 
-            # Build variance for key metrics
-            variance_metrics = ['Total Revenue', 'Total COGS', 'Gross Profit', 'Total OpEx', 'EBITDA']
+            # Compare against the live forecast or any frozen version of it
+            tags = [e['tag'] for e in snapshots.list_snapshots() if e['year'] == 2026]
+            against = st.selectbox("Compare against", ["Current forecast"] + tags, key="variance_against")
+            if against == "Current forecast":
+                variances = variance_engine.analyze(df_2026_actual, df_2026_forecast, last_actual_month)
+            else:
+                variances = forecast_snapshots.variance_vs_actuals(
+                    snapshots.load(against), df_2026_actual, last_actual_month)
+            ytd = variance_engine.period_summary(variances).set_index('Metric')
 
             # Summary metrics for closed months
             col1, col2, col3 = st.columns(3)
-            actual_rev = df_2026_actual['Total Revenue'].iloc[:last_actual_month].sum()
-            forecast_rev = df_2026_forecast['Total Revenue'].iloc[:last_actual_month].sum()
-            var_rev = actual_rev - forecast_rev
+            actual_rev = ytd.loc['Total Revenue', 'Actual']
+            forecast_rev = ytd.loc['Total Revenue', 'Forecast']
+            var_rev = ytd.loc['Total Revenue', 'Variance $']
 
             with col1:
                 st.metric("YTD Actual Revenue", f"${actual_rev:,.0f}")
             with col2:
                 st.metric("YTD Forecast Revenue", f"${forecast_rev:,.0f}")
             with col3:
-                pct = (var_rev / forecast_rev * 100) if forecast_rev != 0 else 0
                 st.metric("Revenue Variance", f"${var_rev:,.0f}",
-                          delta=f"{pct:+.1f}%",
+                          delta=f"{ytd.loc['Total Revenue', 'Variance %']:+.1f}%",
                           delta_color="normal" if var_rev >= 0 else "inverse")
 
             st.divider()
@@ -252,41 +269,9 @@ def show():
             # Detailed variance table
             st.markdown("#### Monthly Variance Detail")
 
-            for metric in variance_metrics:
+            for metric in variance_engine.SUMMARY_METRICS:
                 with st.expander(f"**{metric}**", expanded=(metric in ['Total Revenue', 'EBITDA'])):
-                    var_data = []
-                    for m in range(last_actual_month):
-                        actual_col = metric if metric in df_2026_actual.columns else None
-                        forecast_col = metric if metric in df_2026_forecast.columns else None
-
-                        if actual_col and forecast_col:
-                            act_val = df_2026_actual[actual_col].iloc[m]
-                            fc_val = df_2026_forecast[forecast_col].iloc[m]
-                            var_val = act_val - fc_val
-                            var_pct = (var_val / fc_val * 100) if fc_val != 0 else 0
-                        else:
-                            act_val = fc_val = var_val = var_pct = 0
-
-                        var_data.append({
-                            'Month': MONTHS[m],
-                            'Actual': act_val,
-                            'Forecast': fc_val,
-                            'Variance $': var_val,
-                            'Variance %': var_pct,
-                        })
-
-                    var_df = pd.DataFrame(var_data)
-
-                    # Add totals row
-                    totals = {
-                        'Month': 'YTD Total',
-                        'Actual': var_df['Actual'].sum(),
-                        'Forecast': var_df['Forecast'].sum(),
-                        'Variance $': var_df['Variance $'].sum(),
-                        'Variance %': (var_df['Variance $'].sum() / var_df['Forecast'].sum() * 100)
-                        if var_df['Forecast'].sum() != 0 else 0,
-                    }
-                    var_df = pd.concat([var_df, pd.DataFrame([totals])], ignore_index=True)
+                    var_df = variance_engine.metric_table(variances, metric)
 
                     # Format
                     display_var = var_df.copy()
@@ -296,6 +281,19 @@ def show():
 
                     st.dataframe(display_var, use_container_width=True, hide_index=True)
 
+            # Every account: YTD and trailing three months through the last closed month
+            with st.expander("**Full Chart of Accounts (YTD and Rolling Quarter)**"):
+                window = st.radio("Window", ["YTD", "R3M"], horizontal=True, key="variance_window",
+                                  format_func=lambda w: "Year to Date" if w == "YTD" else "Rolling 3 Months")
+                coa = variance_engine.period_summary(variances, window=window)
+                display_coa = coa.drop(columns=['Favorable']).copy()
+                for col in ['Actual', 'Forecast', 'Variance $']:
+                    display_coa[col] = display_coa[col].apply(lambda x: "-" if pd.isna(x) else f"${x:,.0f}")
+                display_coa['Variance %'] = display_coa['Variance %'].apply(
+                    lambda x: "-" if pd.isna(x) else f"{x:+.1f}%")
+                st.dataframe(display_coa, use_container_width=True, hide_index=True)
+                st.caption("Accounts without a forecast line show actuals only.")
+
             st.divider()
 
             # Variance chart
@@ -305,8 +303,8 @@ def show():
 
             # Only show closed months
             closed_months = MONTHS[:last_actual_month]
-            actual_rev = df_2026_actual['Total Revenue'].iloc[:last_actual_month].values
-            forecast_rev = df_2026_forecast['Total Revenue'].iloc[:last_actual_month].values
+            actual_rev = variances.loc['Total Revenue', 'Month Actual'].values
+            forecast_rev = variances.loc['Total Revenue', 'Month Forecast'].values
 
             fig.add_trace(go.Bar(
                 name='Actual', x=closed_months, y=actual_rev,
@@ -318,7 +316,7 @@ def show():
             ))
 
             # Add variance line
-            variance = actual_rev - forecast_rev
+            variance = variances.loc['Total Revenue', 'Month Variance $'].values
             fig.add_trace(go.Scatter(
                 name='Variance', x=closed_months, y=variance,
                 mode='lines+markers', marker_color='#E63946',
@@ -336,8 +334,8 @@ def show():
             st.plotly_chart(fig, use_container_width=True)
 
             # EBITDA variance chart
-            actual_ebitda = df_2026_actual['EBITDA'].iloc[:last_actual_month].values
-            forecast_ebitda = df_2026_forecast['EBITDA'].iloc[:last_actual_month].values
+            actual_ebitda = variances.loc['EBITDA', 'Month Actual'].values
+            forecast_ebitda = variances.loc['EBITDA', 'Month Forecast'].values
 
             fig2 = go.Figure()
             fig2.add_trace(go.Bar(name='Actual EBITDA', x=closed_months, y=actual_ebitda,
@@ -431,3 +429,182 @@ def show():
         st.markdown("## OpEx")
         st.write(f"**{len(st.session_state.get('opex_expenses', []))}** expense items")
         st.write(f"Total 2026 Other OpEx: ${df_2026_forecast['Other OpEx'].sum():,.0f}")
+
+    # --- TAB 6: DRILL-DOWN ---
+    with tab6:
+        show_drilldown(team_members, opex_expenses, wholesale_deals, df_2026_forecast)
+
+    # --- TAB 7: REFORECAST ---
+    with tab7:
+        show_reforecast(team_members, opex_expenses, wholesale_deals)
+
+    # --- TAB 8: SNAPSHOTS ---
+    with tab8:
+        show_snapshots(snapshots)
+
+
+def get_drilldown_index(team_members, opex_expenses, wholesale_deals, df_forecast):
+    """Contribution index for the 2026 forecast, rebuilt only when the inputs change"""
+    key = drilldown.drilldown_key(2026, team_members, opex_expenses, wholesale_deals, df_forecast)
+    cached = st.session_state.get('drilldown_index')
+    if cached and cached[0] == key:
+        return cached[1]
+    index = drilldown.build_drilldown_index(2026, team_members, opex_expenses, wholesale_deals, df_forecast)
+    st.session_state.drilldown_index = (key, index)
+    return index
+
+
+def show_drilldown(team_members, opex_expenses, wholesale_deals, df_forecast):
+    """Top contributing records for any 2026 forecast cell"""
+    st.markdown("### 2026 Forecast Drill-Down")
+    st.caption("Pick a P&L line and month to see which team members, expenses or deals drive it.")
+
+    index = get_drilldown_index(team_members, opex_expenses, wholesale_deals, df_forecast)
+
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        line = st.selectbox("P&L Line", list(index['lines']), key="drill_line")
+    with col2:
+        month_name = st.selectbox("Month", MONTHS, key="drill_month")
+    with col3:
+        top_n = st.number_input("Show Top", min_value=1, max_value=100, value=10, key="drill_top_n")
+    month = MONTHS.index(month_name) + 1
+
+    summary = drilldown.cell_summary(index, line, month)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(f"{line} - {month_name} 2026", f"${summary['total']:,.0f}")
+    with col2:
+        st.metric("Contributing Records", f"{summary['contributors']:,}")
+
+    top = drilldown.top_contributors(index, line, month, int(top_n))
+    if top.empty:
+        st.info("Nothing recorded for this line in the selected month.")
+        return
+
+    display = top.copy()
+    display['Amount'] = display['Amount'].apply(lambda x: f"${x:,.0f}")
+    display['Share'] = display['Share'].apply(lambda x: f"{x:.1%}")
+    st.dataframe(display, use_container_width=True, hide_index=True)
+
+
+def show_reforecast(team_members, opex_expenses, wholesale_deals):
+    """2026 outlook: QBO actuals for closed months, forecast for the rest"""
+    st.markdown("### 2026 Reforecast (Actuals + Forecast)")
+    qbo_raw = st.session_state.get('qbo_actuals')
+    if not qbo_raw:
+        st.warning("Upload a QBO file on the **QBO Import** page to blend actuals into the outlook.")
+        return
+
+    outlook = reforecast.build_reforecast(
+        2026, team_members, opex_expenses, wholesale_deals, qbo_raw,
+        st.session_state.get('po_data'), st.session_state.get('inventory_config'),
+        st.session_state.get('fundraising_rounds', []),
+    )
+    pl, forecast, runway, closed = outlook['pl'], outlook['forecast'], outlook['runway'], outlook['closed']
+
+    if closed:
+        st.caption(f"Actuals: Jan - {MONTHS[closed - 1]} 2026 (QBO). Forecast: "
+                   f"{MONTHS[closed] + ' - Dec' if closed < 12 else 'none'}. The runway starts from "
+                   f"the {MONTHS[closed - 1]} balance sheet: cash ${outlook['position']['cash']:,.0f}, "
+                   f"AP ${outlook['position']['ap']:,.0f}.")
+    else:
+        st.caption("No closed 2026 months yet: the outlook is the forecast, starting from the "
+                   "latest QBO cash and AP.")
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Outlook Revenue", f"${pl['Total Revenue'].sum():,.0f}",
+                  delta=f"${pl['Total Revenue'].sum() - forecast['Total Revenue'].sum():,.0f} vs plan")
+    with col2:
+        st.metric("Outlook EBITDA", f"${pl['EBITDA'].sum():,.0f}",
+                  delta=f"${pl['EBITDA'].sum() - forecast['EBITDA'].sum():,.0f} vs plan")
+    with col3:
+        st.metric("Year-End Cash", f"${runway['Ending Cash'].iloc[-1]:,.0f}")
+    with col4:
+        low = int(runway['Ending Cash'].idxmin())
+        st.metric("Lowest Month-End Cash", f"${runway['Ending Cash'].iloc[low]:,.0f}",
+                  delta=runway['Month'].iloc[low], delta_color="off")
+
+    fig = go.Figure()
+    for source, color in [('Actual', '#2E86AB'), ('Forecast', '#A9A9A9')]:
+        part = pl[pl['Source'] == source]
+        fig.add_trace(go.Bar(name=f'Revenue ({source})', x=part['Month'], y=part['Total Revenue'],
+                             marker_color=color))
+    fig.add_trace(go.Scatter(name='Original Plan Revenue', x=forecast['Month'], y=forecast['Total Revenue'],
+                             mode='lines', line=dict(color='#E63946', dash='dash')))
+    fig.add_trace(go.Scatter(name='Ending Cash', x=runway['Month'], y=runway['Ending Cash'],
+                             mode='lines+markers', line=dict(color='#1D3557', width=3), yaxis='y2'))
+    fig.update_layout(title='2026 Outlook: Revenue and Cash', height=420, hovermode='x unified',
+                      yaxis=dict(title='Revenue ($)'),
+                      yaxis2=dict(title='Cash ($)', overlaying='y', side='right'))
+    st.plotly_chart(fig, use_container_width=True)
+
+    key_cols = ['Total Revenue', 'Total COGS', 'Gross Profit', 'Team Costs', 'Other OpEx',
+                'Total OpEx', 'EBITDA']
+    table = pl.set_index('Month')[key_cols].T.applymap(lambda x: f"${x:,.0f}")
+    table.columns = [f"{m} ({s[0]})" for m, s in zip(pl['Month'], pl['Source'])]
+    st.dataframe(table, use_container_width=True)
+    st.caption("(A) = actual, (F) = forecast")
+
+    csv = pl.merge(runway[['Month', 'Ending Cash']], on='Month', how='left').to_csv(index=False)
+    st.download_button("Download 2026 Reforecast (CSV)", csv, "2026_reforecast.csv", "text/csv",
+                       key="reforecast_download")
+
+
+def show_snapshots(snapshots):
+    """Freeze the current forecast under a version tag and compare stored versions"""
+    st.markdown("### Forecast Snapshots")
+    st.caption("A snapshot freezes the 2026 P&L and cash runway with the inputs behind them. "
+               "Pick one under **Compare against** on the Variance Analysis tab to measure "
+               "actuals against that version.")
+
+    with st.form("snapshot_form"):
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            tag = st.text_input("Version tag", placeholder="Board approved - Mar 2026", key="snapshot_tag")
+        with col2:
+            note = st.text_input("Note", key="snapshot_note")
+        if st.form_submit_button("Save Snapshot"):
+            inputs = {key: st.session_state.get(key) for key in forecast_snapshots.INPUT_KEYS}
+            try:
+                entry = snapshots.save(tag, inputs, 2026, note)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.success(f"Saved snapshot '{entry['tag']}'")
+
+    entries = snapshots.list_snapshots()
+    if not entries:
+        st.info("No snapshots saved yet.")
+        return
+
+    listing = pd.DataFrame([{
+        'Tag': e['tag'], 'Created': e['created'], 'Year': e['year'], 'Note': e['note'],
+        'Inputs': e['inputs'][:12],
+    } for e in entries])
+    st.dataframe(listing, use_container_width=True, hide_index=True)
+    st.caption("Versions with the same inputs share one stored copy.")
+
+    # Version vs version
+    tags = [e['tag'] for e in entries]
+    if len(tags) > 1:
+        st.markdown("#### Compare Versions")
+        col1, col2 = st.columns(2)
+        with col1:
+            old_tag = st.selectbox("From", tags, index=len(tags) - 2, key="snapshot_from")
+        with col2:
+            new_tag = st.selectbox("To", tags, index=len(tags) - 1, key="snapshot_to")
+        old, new = snapshots.load(old_tag), snapshots.load(new_tag)
+        pl_change = forecast_snapshots.compare(old, new, 'pl')
+        lines = [m for m in variance_engine.SUMMARY_METRICS if m in pl_change.index]
+        st.dataframe(pl_change.loc[lines].style.format("${:+,.0f}"), use_container_width=True)
+        cash_change = forecast_snapshots.compare(old, new, 'runway')
+        if 'Ending Cash' in cash_change.index:
+            st.dataframe(cash_change.loc[['Ending Cash']].style.format("${:+,.0f}"), use_container_width=True)
+
+    with st.expander("Delete Snapshot"):
+        doomed = st.selectbox("Snapshot", tags, key="snapshot_delete")
+        if st.button("Delete", key="snapshot_delete_button"):
+            snapshots.delete(doomed)
+            st.rerun()
@@ -7,6 +7,8 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, date
 
+import record_schema
+
 
 def initialize_expenses():
     """Initialize expenses in session state"""
@@ -15,7 +17,8 @@ def initialize_expenses():
 
 
 def add_expense(expense):
-    """Add a new expense"""
+    """Add a new expense (normalized like loaded records)"""
+    expense, _ = record_schema.validate_record('opex_expenses', expense)
     st.session_state.opex_expenses.append(expense)
 
 
@@ -168,9 +171,12 @@ def show():
         if len(st.session_state.opex_expenses) == 0:
             st.info("No expenses yet. Add your first expense in the 'Add Expense' tab!")
         else:
-            # Summary metrics
-            total_monthly = sum(e['monthly_amount'] for e in st.session_state.opex_expenses)
-            total_annual = sum(e['annual_cost'] for e in st.session_state.opex_expenses)
+            # Summary metrics - amounts come from the typed columns (values that don't parse count as 0)
+            cols = record_schema.columns('opex_expenses', st.session_state.opex_expenses)
+            monthly_amounts = record_schema.filled(cols['monthly_amount'], 0)
+            annual_costs = record_schema.filled(cols['annual_cost'], 0)
+            total_monthly = monthly_amounts.sum()
+            total_annual = annual_costs.sum()
             expense_count = len(st.session_state.opex_expenses)
             
             col1, col2, col3, col4 = st.columns(4)
@@ -208,8 +214,8 @@ def show():
             ]
             
             # Format currency
-            display_df['Monthly'] = display_df['Monthly'].apply(lambda x: f"${x:,.0f}")
-            display_df['Annual'] = display_df['Annual'].apply(lambda x: f"${x:,.0f}")
+            display_df['Monthly'] = [f"${x:,.0f}" for x in monthly_amounts]
+            display_df['Annual'] = [f"${x:,.0f}" for x in annual_costs]
             
             st.dataframe(display_df, use_container_width=True, hide_index=True)
             
@@ -217,7 +223,8 @@ def show():
             st.divider()
             st.markdown("#### Breakdown by Category")
             
-            cat_summary = expenses_df.groupby('category').agg({
+            amounts_df = expenses_df.assign(monthly_amount=monthly_amounts, annual_cost=annual_costs)
+            cat_summary = amounts_df.groupby('category').agg({
                 'expense_name': 'count',
                 'monthly_amount': 'sum',
                 'annual_cost': 'sum'
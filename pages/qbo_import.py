@@ -16,6 +16,37 @@ from qbo_parser import (
     parse_qbo_file, build_actuals_dataframe, actuals_to_pl_format,
     serialize_qbo_data, MONTHS
 )
+import anomaly_scan
+
+
+def show_anomalies(flags: pd.DataFrame, last_yr: int, last_mo: int, key: str):
+    """Flagged movements: the latest month up front, full history in an expander"""
+    st.markdown("### Anomaly Scan")
+    st.caption(
+        f"Month-over-month moves over {anomaly_scan.MOM_PCT_THRESHOLD:.0f}%, values more than "
+        f"{anomaly_scan.Z_THRESHOLD:.0f} trailing std devs from the {anomaly_scan.ZSCORE_WINDOW}-month mean, "
+        f"and ratio shifts over {anomaly_scan.RATIO_THRESHOLD * 100:.0f} pts. "
+        f"Moves under ${anomaly_scan.MIN_ABS_CHANGE:,.0f} are ignored."
+    )
+
+    latest = anomaly_scan.latest_flags(flags, last_yr, last_mo)
+    if latest.empty:
+        st.success(f"No unusual movements in {MONTHS[last_mo - 1]} {last_yr}.")
+    else:
+        st.warning(f"**{len(latest)}** flagged movements in {MONTHS[last_mo - 1]} {last_yr}")
+        for flag in latest.to_dict('records'):
+            st.markdown(f"- **{flag['Check']}** — {anomaly_scan.describe(flag)}")
+
+    with st.expander(f"All flagged cells ({len(flags)})"):
+        check = st.multiselect("Checks", list(anomaly_scan.CHECKS), default=list(anomaly_scan.CHECKS),
+                               key=f"{key}_checks")
+        shown = flags[flags['Check'].isin(check)]
+        st.dataframe(
+            shown[['Period', 'Account', 'Check', 'Value', 'Reference', 'Change', 'Detail']].style.format({
+                'Value': "{:,.2f}", 'Reference': "{:,.2f}", 'Change': "{:,.2f}", 'Detail': "{:+.1f}",
+            }),
+            use_container_width=True, hide_index=True,
+        )
 
 
 def show():
@@ -141,6 +172,9 @@ def show():
                 cash_df['Cash Balance'] = cash_df['Cash Balance'].apply(lambda x: f"${x:,.2f}")
                 st.dataframe(cash_df, use_container_width=True, hide_index=True)
 
+            st.divider()
+            show_anomalies(anomaly_scan.scan(parsed), last_yr, last_mo, key="anomaly_upload")
+
             st.divider()
 
             # Save button
@@ -156,7 +190,7 @@ def show():
 
                 # Save to persistence
                 from data_persistence import get_data_store
-                store = get_data_store()
+                store = get_data_store(st.session_state.get('entity'))
                 store.save_qbo_actuals(serialized)
 
                 st.success(
@@ -170,6 +204,11 @@ def show():
             st.error(f"Error parsing file: {str(e)}")
             st.markdown("**Expected format:** QBO export with 'Profit and Loss' and 'Balance Sheet' tabs, monthly columns starting at row 5.")
 
+    if qbo_data and uploaded_file is None:
+        st.divider()
+        show_anomalies(anomaly_scan.scan_serialized(qbo_data), qbo_data.get('last_year', 0),
+                       qbo_data.get('last_month', 0), key="anomaly_stored")
+
     st.divider()
 
     # Instructions
@@ -7,6 +7,8 @@ import streamlit as st
 import pandas as pd
 from datetime import date, datetime
 
+import record_schema
+
 
 def initialize_team():
     """Initialize team members in session state"""
@@ -15,7 +17,8 @@ def initialize_team():
 
 
 def add_team_member(member):
-    """Add a new team member"""
+    """Add a new team member (normalized like loaded records)"""
+    member, _ = record_schema.validate_record('team_members', member)
     st.session_state.team_members.append(member)
 
 
@@ -187,13 +190,15 @@ def show():
             st.info("No team members yet. Add your first team member in the 'Add Team Member' tab!")
         else:
             # Summary metrics - handle baseline members that don't have 'total_cost'
-            total_headcount = len(st.session_state.team_members)
-            total_salary = sum(m.get('annual_salary', 0) for m in st.session_state.team_members)
+            # Salaries come from the typed columns; a salary that doesn't parse counts as 0
+            members = st.session_state.team_members
+            salaries = record_schema.filled(record_schema.columns('team_members', members)['annual_salary'], 0)
+            total_headcount = len(members)
+            total_salary = salaries.sum()
             avg_salary = total_salary / total_headcount if total_headcount > 0 else 0
             # Estimate total cost: use total_cost if available, otherwise salary * 1.185
             total_annual_cost = sum(
-                m.get('total_cost', m.get('annual_salary', 0) * 1.185)
-                for m in st.session_state.team_members
+                m.get('total_cost', salary * 1.185) for m, salary in zip(members, salaries)
             )
 
             col1, col2, col3, col4 = st.columns(4)
@@ -216,8 +221,7 @@ def show():
             st.markdown("#### Team Members")
 
             table_rows = []
-            for m in st.session_state.team_members:
-                salary = m.get('annual_salary', 0)
+            for m, salary in zip(members, salaries):
                 est_cost = m.get('total_cost', salary * 1.185)
                 table_rows.append({
                     'First Name': m.get('first_name', ''),
@@ -239,9 +243,9 @@ def show():
             st.markdown("#### Department Breakdown")
 
             dept_data = {}
-            for m in st.session_state.team_members:
+            for m, salary in zip(members, salaries):
                 dept = m.get('department', 'Other')
-                cost = m.get('total_cost', m.get('annual_salary', 0) * 1.185)
+                cost = m.get('total_cost', salary * 1.185)
                 if dept not in dept_data:
                     dept_data[dept] = {'count': 0, 'cost': 0}
                 dept_data[dept]['count'] += 1
@@ -5,9 +5,15 @@ Add and manage wholesale deals with detailed tracking
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
 from datetime import datetime, date
 import json
 
+import record_schema
+import wholesale_pipeline
+from instrumentation import span
+
 
 def initialize_deals():
     """Initialize wholesale deals in session state"""
@@ -16,7 +22,8 @@ def initialize_deals():
 
 
 def save_deal(deal):
-    """Save a new deal"""
+    """Save a new deal, with form fields mapped to the canonical deal fields"""
+    deal, _ = record_schema.validate_record('wholesale_deals', deal)
     st.session_state.wholesale_deals.append(deal)
 
 
@@ -83,6 +90,13 @@ def show():
                     ["Beta", "Alpha", "Gamma", "Custom"]
                 )
                 
+                stage = st.selectbox(
+                    "Pipeline Stage*",
+                    list(wholesale_pipeline.STAGES),
+                    index=list(wholesale_pipeline.STAGES).index(wholesale_pipeline.DEFAULT_STAGE),
+                    help="Sets the win probability and how far delivery may slip"
+                )
+                
                 is_inline = st.radio(
                     "Order Type*",
                     ["In-Line Collection", "Custom Order"],
@@ -184,6 +198,7 @@ def show():
                     deal = {
                         'club_name': club_name,
                         'product_type': product_type,
+                        'stage': stage,
                         'is_inline': is_inline == "In-Line Collection",
                         'pairs': pairs,
                         'price_per_pair': price_per_pair,
@@ -210,34 +225,34 @@ def show():
         if len(st.session_state.wholesale_deals) == 0:
             st.info("📋 No deals yet. Add your first deal in the 'Add New Deal' tab!")
         else:
-            # Summary metrics - handle both baseline and custom deal formats
-            def get_deal_revenue(d):
-                if 'revenue' in d:
-                    return d['revenue']
-                return d.get('num_pairs', 0) * d.get('wholesale_price', 0)
+            # Summary metrics - handle both baseline and custom deal formats;
+            # pairs and price come from the typed columns (values that don't parse count as 0)
+            deals = st.session_state.wholesale_deals
+            cols = record_schema.columns('wholesale_deals', deals)
+            deal_pairs = record_schema.filled(cols['num_pairs'], 0)
+            deal_prices = record_schema.filled(cols['wholesale_price'], 0)
 
-            def get_deal_pairs(d):
-                return d.get('pairs', d.get('num_pairs', 0))
+            def get_deal_revenue(i):
+                if 'revenue' in deals[i]:
+                    return deals[i]['revenue']
+                return deal_pairs[i] * deal_prices[i]
 
-            def get_deal_price(d):
-                return d.get('price_per_pair', d.get('wholesale_price', 0))
+            def get_deal_cogs(i):
+                if 'total_cogs' in deals[i]:
+                    return deals[i]['total_cogs']
+                if not np.isnan(cols['total_cost'][i]):
+                    return cols['total_cost'][i]
+                return get_deal_revenue(i) * 0.40
 
-            def get_deal_cogs(d):
-                if 'total_cogs' in d:
-                    return d['total_cogs']
-                if 'total_cost' in d:
-                    return d['total_cost']
-                return get_deal_revenue(d) * 0.40
+            def get_deal_gp(i):
+                if 'gross_profit' in deals[i]:
+                    return deals[i]['gross_profit']
+                return get_deal_revenue(i) - get_deal_cogs(i)
 
-            def get_deal_gp(d):
-                if 'gross_profit' in d:
-                    return d['gross_profit']
-                return get_deal_revenue(d) - get_deal_cogs(d)
-
-            total_revenue = sum(get_deal_revenue(d) for d in st.session_state.wholesale_deals)
-            total_pairs = sum(get_deal_pairs(d) for d in st.session_state.wholesale_deals)
+            total_revenue = sum(get_deal_revenue(i) for i in range(len(deals)))
+            total_pairs = deal_pairs.sum()
             avg_price = total_revenue / total_pairs if total_pairs > 0 else 0
-            total_gross_profit = sum(get_deal_gp(d) for d in st.session_state.wholesale_deals)
+            total_gross_profit = sum(get_deal_gp(i) for i in range(len(deals)))
 
             col1, col2, col3, col4 = st.columns(4)
 
@@ -259,12 +274,12 @@ def show():
             st.markdown("#### All Deals")
 
             table_rows = []
-            for d in st.session_state.wholesale_deals:
-                rev = get_deal_revenue(d)
-                gp = get_deal_gp(d)
+            for i, d in enumerate(deals):
+                rev = get_deal_revenue(i)
+                gp = get_deal_gp(i)
                 gm = (gp / rev * 100) if rev > 0 else 0
-                pairs = get_deal_pairs(d)
-                price = get_deal_price(d)
+                pairs = deal_pairs[i]
+                price = deal_prices[i]
                 name = d.get('club_name', d.get('customer_name', ''))
                 product = d.get('product_type', '')
                 close = d.get('close_date', '')
@@ -272,7 +287,8 @@ def show():
                 table_rows.append({
                     'Club': name,
                     'Product': product,
-                    'Pairs': pairs,
+                    'Stage': d.get('stage') or wholesale_pipeline.DEFAULT_STAGE,
+                    'Pairs': f"{pairs:,.0f}",
                     'Price/Pair': f"${price:.2f}",
                     'Revenue': f"${rev:,.0f}",
                     'Gross Profit': f"${gp:,.0f}",
@@ -284,6 +300,9 @@ def show():
             display_df = pd.DataFrame(table_rows)
             
             st.dataframe(display_df, use_container_width=True, hide_index=True)
+
+            st.divider()
+            show_risk_adjusted(st.session_state.wholesale_deals)
             
             # Export deals
             st.divider()
@@ -311,3 +330,56 @@ def show():
                     else:
                         st.session_state.confirm_clear = True
                         st.warning("⚠️ Click again to confirm deletion")
+
+
+def show_risk_adjusted(deals):
+    """Expected 2026 wholesale revenue and percentile bands from the stage-weighted pipeline"""
+    st.markdown("#### Risk-Adjusted Outlook (2026)")
+    with span("model.wholesale_pipeline"):
+        summary = wholesale_pipeline.summarize(wholesale_pipeline.simulate(deals, 2026))
+    cols = record_schema.columns('wholesale_deals', deals)
+    revenue, _ = wholesale_pipeline.deal_values(cols)
+    p_win, _ = wholesale_pipeline.stage_odds(cols)
+    stage_names = [stage or wholesale_pipeline.DEFAULT_STAGE for stage in cols['stage']]
+    delivery_year = wholesale_pipeline.delivery_dates(cols).astype('datetime64[Y]')
+    committed = sum(
+        revenue[i] for i, stage in enumerate(stage_names)
+        if stage == 'Closed Won' and delivery_year[i] == np.datetime64('2026', 'Y')
+    )
+    annual = summary['annual']['revenue']
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Committed (Closed Won)", f"${committed:,.0f}")
+    with col2:
+        st.metric("Expected Revenue", f"${annual['expected']:,.0f}")
+    with col3:
+        st.metric("P10 - P90 Revenue", f"${annual[10]:,.0f} - ${annual[90]:,.0f}")
+    with col4:
+        st.metric("Expected Gross Profit", f"${summary['annual']['gross_profit']['expected']:,.0f}")
+
+    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    with span("figure.wholesale_bands"):
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=months, y=summary['bands'][90]['revenue'], name='P90',
+                                 mode='lines', line=dict(width=0), showlegend=False))
+        fig.add_trace(go.Scatter(x=months, y=summary['bands'][10]['revenue'], name='P10 - P90',
+                                 mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor='rgba(46, 134, 171, 0.2)'))
+        fig.add_trace(go.Bar(x=months, y=summary['expected']['revenue'], name='Expected',
+                             marker_color='#2E86AB'))
+        fig.update_layout(height=360, hovermode='x unified', yaxis_title='Wholesale Revenue ($)')
+        st.plotly_chart(fig, use_container_width=True)
+
+    stages = {}
+    for i, stage in enumerate(stage_names):
+        row = stages.setdefault(stage, {'Stage': stage, 'Deals': 0, 'Revenue': 0.0, 'Weighted Revenue': 0.0})
+        row['Deals'] += 1
+        row['Revenue'] += revenue[i]
+        row['Weighted Revenue'] += revenue[i] * p_win[i]
+    by_stage = pd.DataFrame([stages[s] for s in wholesale_pipeline.STAGES if s in stages])
+    st.dataframe(by_stage.style.format({'Revenue': "${:,.0f}", 'Weighted Revenue': "${:,.0f}"}),
+                 use_container_width=True, hide_index=True)
+    st.caption("Deals without a stage count as Closed Won. Bands come from simulated win/loss and "
+               "delivery slips across scenarios. Turn on **Risk-adjust wholesale pipeline** on the "
+               "Cash Flow page to run inventory and cash on expected deals.")
@@ -0,0 +1,330 @@
+"""
+PO Planner
+Proposes purchase-order months and quantities per product that minimize DTC revenue
+lost to stockouts, subject to a minimum cash balance, MOQ, lead time and payment terms.
+
+Candidate plans come from a grid of periodic-review ordering policies (months of cover,
+safety factor, review cadence and phase). All candidates are generated and evaluated
+together on (plans x SKUs x months) arrays with the batched inventory recurrence, and
+cash is projected the same way calculate_cash_runway does, so a full search over
+2026-2027 runs in well under a second.
+"""
+
+import itertools
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+import inventory_engine
+import record_schema
+from financial_calcs import calculate_po_payments, generate_monthly_pl, get_dtc_demand_units
+
+PLAN_YEARS = (2026, 2027)
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+          'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+DEFAULT_GRID = {
+    'cover_months': (1, 2, 3, 4, 6),
+    'safety_factor': (0.8, 1.0, 1.25, 1.5),
+    'cadence': (1, 2, 3, 6),
+}
+
+# Cost per pair when no existing PO prices a product
+DEFAULT_UNIT_COSTS = {'Beta': 45.0, 'Alpha': 55.0}
+DEFAULT_AOV = {'Beta': 250.0, 'Alpha': 450.0}
+
+
+def abs_to_label(abs_month: int) -> str:
+    """Absolute month (Jan 2026 = 1) -> 'Mar 2027'."""
+    return f"{MONTHS[(abs_month - 1) % 12]} {inventory_engine.BASE_YEAR + (abs_month - 1) // 12}"
+
+
+def unit_costs_from_pos(po_data: List[Dict], skus: Sequence[str]) -> np.ndarray:
+    """Average cost per pair by product from existing POs, with defaults as fallback."""
+    cols = record_schema.columns('po_data', po_data)
+    sku_idx = inventory_engine.sku_indices(cols['product'], skus)
+    po_pairs = record_schema.filled(cols['pairs'], 0)
+    po_amount = record_schema.filled(cols['amount'], 0)
+    costs = []
+    for i, sku in enumerate(skus):
+        pairs = po_pairs[sku_idx == i].sum()
+        amount = po_amount[sku_idx == i].sum()
+        if pairs > 0 and amount > 0:
+            costs.append(amount / pairs)
+        else:
+            costs.append(DEFAULT_UNIT_COSTS.get(sku, np.mean(list(DEFAULT_UNIT_COSTS.values()))))
+    return np.array(costs)
+
+
+def build_policy_grid(grid: Dict = None) -> List[Dict]:
+    """Every (cover, safety, cadence, phase) combination, plus the 'order nothing' plan."""
+    grid = grid or DEFAULT_GRID
+    policies = [{'cover_months': 0, 'safety_factor': 0.0, 'cadence': 1, 'phase': 0}]
+    for cover, safety, cadence in itertools.product(
+            grid['cover_months'], grid['safety_factor'], grid['cadence']):
+        for phase in range(cadence):
+            policies.append({'cover_months': cover, 'safety_factor': safety,
+                             'cadence': cadence, 'phase': phase})
+    return policies
+
+
+# ============================================================
+# INPUTS
+# ============================================================
+
+def build_plan_inputs(
+    po_data: List[Dict],
+    wholesale_deals: List[Dict],
+    team_members: List[Dict],
+    opex_expenses: List[Dict],
+    fundraising_rounds: List[Dict],
+    inventory_config: Dict,
+    start_abs: int,
+    starting_cash: float,
+    current_ar: float = 0.0,
+    current_ap: float = 0.0,
+    dtc_discount_rate: float = 0.0,
+    dtc_return_rate: float = 0.0,
+) -> Dict:
+    """
+    Arrays shared by every candidate plan over the PLAN_YEARS horizon.
+
+    POs ordered before start_abs are locked in; the planner only proposes orders
+    from start_abs on. Cash flows that no plan can change (wholesale, OpEx, funding)
+    are precomputed per month.
+    """
+    from pages.cash_runway import get_monthly_funding
+
+    skus = list(inventory_engine.DEFAULT_SKUS)
+    n_months = 12 * len(PLAN_YEARS)
+    first_year = PLAN_YEARS[0]
+    lead_time = inventory_config.get('lead_time_months', 4)
+    pay_terms = inventory_config.get('payment_terms_months', 5)
+
+    # Undated POs count as locked; they never arrive or get paid either way
+    order_abs = inventory_engine.order_months(record_schema.columns('po_data', po_data))
+    locked = [po for po, order in zip(po_data, order_abs) if order < start_abs]
+
+    demand = {sku: [] for sku in skus}
+    for year in PLAN_YEARS:
+        for sku, units in get_dtc_demand_units(year).items():
+            demand.setdefault(sku, []).extend(units)
+
+    base_flow = []
+    locked_payments = []
+    for year in PLAN_YEARS:
+        pl = generate_monthly_pl(year, team_members, opex_expenses, wholesale_deals)
+        funding = get_monthly_funding(fundraising_rounds, year)
+        base_flow.extend(
+            pl['Wholesale Revenue'] + [funding[m] for m in range(1, 13)]
+            - pl['Wholesale COGS'] - pl['Total OpEx']
+        )
+        payments = calculate_po_payments(locked, lead_time, pay_terms, year)
+        locked_payments.extend(payments[m] for m in range(1, 13))
+
+    aov = np.array([inventory_config.get(f'{sku.lower()}_aov', DEFAULT_AOV.get(sku, 0.0))
+                    for sku in skus])
+
+    return {
+        'skus': skus,
+        'n_months': n_months,
+        'start_idx': start_abs - inventory_engine.month_index(first_year, 1),
+        'lead_time': lead_time,
+        'payment_terms': pay_terms,
+        'opening': inventory_engine.opening_vector(skus, {
+            'Beta': inventory_config.get('beg_inv_beta', 0),
+            'Alpha': inventory_config.get('beg_inv_alpha', 0),
+        }),
+        'locked_arrivals': inventory_engine.po_arrival_matrix(locked, lead_time, first_year, skus, n_months),
+        'shipments': inventory_engine.ws_shipment_matrix(wholesale_deals, first_year, skus, n_months),
+        'demand': inventory_engine.demand_matrix(demand, skus, n_months),
+        'aov': aov,
+        'net_rate': (1 - dtc_discount_rate) * (1 - dtc_return_rate),
+        'fulfillment_rate': (inventory_config.get('cogs_total_rate', 0.40)
+                             - inventory_config.get('cogs_product_pct', 0.25)),
+        'unit_costs': unit_costs_from_pos(po_data, skus),
+        'base_flow': np.array(base_flow, dtype=float),
+        'locked_payments': np.array(locked_payments, dtype=float),
+        'opening_cash': starting_cash + current_ar - current_ap,
+    }
+
+
+# ============================================================
+# CANDIDATE GENERATION & EVALUATION
+# ============================================================
+
+def generate_candidate_orders(inputs: Dict, policies: List[Dict], moq: float = 0,
+                              order_multiple: float = 1) -> np.ndarray:
+    """
+    Order quantities (plans x SKUs x months) for each periodic-review policy.
+
+    On a review month t the order arriving at a = t + lead_time tops the projected
+    stock at arrival up to safety_factor x (DTC + wholesale need over cover_months).
+    The projection starts from the simulated (clamped) stock of each plan, so all
+    plans advance together through the same vectorized recurrence.
+    """
+    lead = inputs['lead_time']
+    n_months = inputs['n_months']
+    start = inputs['start_idx']
+    demand, shipments = inputs['demand'], inputs['shipments']
+    n_plans, n_skus = len(policies), len(inputs['skus'])
+
+    cover = np.array([p['cover_months'] for p in policies])
+    safety = np.array([p['safety_factor'] for p in policies])[:, None]
+    cadence = np.array([p['cadence'] for p in policies])
+    phase = np.array([p['phase'] for p in policies])
+
+    need = demand + shipments
+    cum_need = np.concatenate([np.zeros((n_skus, 1)), np.cumsum(need, axis=1)], axis=1)
+    locked = inputs['locked_arrivals']
+
+    orders = np.zeros((n_plans, n_skus, n_months))
+    planned = np.zeros((n_plans, n_skus, n_months))
+    state = np.broadcast_to(inputs['opening'], (n_plans, n_skus)).copy()
+
+    for t in range(n_months):
+        arrive = t + lead
+        if t >= start and arrive < n_months:
+            reviewing = ((t - start) % cadence == phase) & (cover > 0)
+            inbound = locked[:, t:arrive].sum(axis=1) + planned[:, :, t:arrive].sum(axis=2)
+            outbound = cum_need[:, arrive] - cum_need[:, t]
+            projected = np.maximum(state + inbound - outbound, 0)
+
+            cover_end = np.minimum(arrive + cover, n_months)
+            target = safety * (cum_need[:, cover_end] - cum_need[:, [arrive]]).T
+            qty = np.maximum(target - projected, 0)
+            qty = np.where(qty > 0, np.maximum(qty, moq), 0)
+            qty = np.ceil(qty / order_multiple) * order_multiple
+            qty[~reviewing] = 0
+
+            orders[:, :, t] = qty
+            planned[:, :, arrive] += qty
+
+        available = state + locked[:, t] + planned[:, :, t] - shipments[:, t]
+        state = available - np.minimum(demand[:, t], np.maximum(available, 0))
+
+    return orders
+
+
+def evaluate_plans(inputs: Dict, orders: np.ndarray, min_cash: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Score a stack of order plans (plans x SKUs x months) in one pass.
+
+    Inventory runs through inventory_engine.simulate_inventory_batch; cash mirrors
+    calculate_cash_runway: revenue + funding - (PO payments + fulfillment COGS +
+    wholesale COGS) - OpEx, accumulated from the opening net cash position.
+    """
+    lead = inputs['lead_time']
+    arrivals = inputs['locked_arrivals'] + inventory_engine.arrivals_from_orders(orders, lead)
+    result = inventory_engine.simulate_inventory_batch(
+        inputs['opening'], arrivals, inputs['shipments'], inputs['demand'],
+        outputs=('demand', 'dtc_sales', 'ending'),
+    )
+
+    aov = inputs['aov'][:, None]
+    gross = (result['dtc_sales'] * aov).sum(axis=1)
+    lost = (inventory_engine.lost_sales(result) * aov).sum(axis=(1, 2)) * inputs['net_rate']
+
+    spend = orders * inputs['unit_costs'][:, None]
+    payments = inputs['locked_payments'] + inventory_engine.arrivals_from_orders(
+        spend, lead + inputs['payment_terms']).sum(axis=1)
+
+    flow = (inputs['base_flow'] + gross * inputs['net_rate']
+            - gross * inputs['fulfillment_rate'] - payments)
+    cash = inputs['opening_cash'] + np.cumsum(flow, axis=1)
+    # New POs can only lower cash once their first payment falls due
+    check_from = min(inputs['start_idx'] + lead + inputs['payment_terms'], inputs['n_months'] - 1)
+    plan_min_cash = cash[:, check_from:].min(axis=1)
+
+    return {
+        'lost_revenue': lost,
+        'spend': spend.sum(axis=(1, 2)),
+        'cash': cash,
+        'min_cash': plan_min_cash,
+        'feasible': plan_min_cash >= min_cash,
+        'ending': result['ending'],
+        'dtc_sales': result['dtc_sales'],
+    }
+
+
+def orders_to_po_records(orders: np.ndarray, inputs: Dict) -> List[Dict]:
+    """One plan's (SKUs x months) orders -> po_data records."""
+    records = []
+    for s, m in zip(*np.nonzero(orders)):
+        abs_month = int(m) + 1
+        pairs = int(orders[s, m])
+        sku = inputs['skus'][s]
+        records.append({
+            'name': f"Plan {abs_to_label(abs_month)} ({sku})",
+            'product': sku,
+            'pairs': pairs,
+            'amount': round(pairs * float(inputs['unit_costs'][s]), 2),
+            'order_month': (abs_month - 1) % 12 + 1,
+            'order_year': inventory_engine.BASE_YEAR + (abs_month - 1) // 12,
+        })
+    return sorted(records, key=lambda r: (r['order_year'], r['order_month'], r['product']))
+
+
+def plan_purchase_orders(inputs: Dict, min_cash: float = 0.0, moq: float = 500,
+                         order_multiple: float = 100, grid: Dict = None) -> Dict:
+    """
+    Search the policy grid and return the best plan.
+
+    Best = least lost DTC revenue among plans that keep cash >= min_cash from the
+    first month a new PO could be paid, ties broken by lower PO spend. When no plan
+    is feasible the one with the highest minimum cash is returned with feasible=False.
+
+    Returns: {"policy", "po_records", "lost_revenue", "min_cash", "spend", "feasible",
+              "cash", "ending", "candidates"}
+    """
+    policies = build_policy_grid(grid)
+    orders = generate_candidate_orders(inputs, policies, moq, order_multiple)
+    scores = evaluate_plans(inputs, orders, min_cash)
+
+    if scores['feasible'].any():
+        candidates = np.flatnonzero(scores['feasible'])
+        order = np.lexsort((scores['spend'][candidates], scores['lost_revenue'][candidates]))
+        best = int(candidates[order[0]])
+    else:
+        best = int(np.argmax(scores['min_cash']))
+
+    return {
+        'policy': policies[best],
+        'po_records': orders_to_po_records(orders[best], inputs),
+        'lost_revenue': float(scores['lost_revenue'][best]),
+        'min_cash': float(scores['min_cash'][best]),
+        'spend': float(scores['spend'][best]),
+        'feasible': bool(scores['feasible'][best]),
+        'cash': scores['cash'][best],
+        'ending': scores['ending'][best],
+        'candidates': len(policies),
+    }
+
+
+def evaluate_current_pos(po_data: List[Dict], inputs: Dict, min_cash: float = 0.0) -> Dict:
+    """Metrics for the existing PO schedule, for side-by-side comparison with a plan."""
+    n_skus, n_months = len(inputs['skus']), inputs['n_months']
+    start_abs = inputs['start_idx'] + 1
+    cols = record_schema.columns('po_data', po_data)
+    order_abs = inventory_engine.order_months(cols)
+    pairs = record_schema.filled(cols['pairs'], 0)
+    sku_idx = inventory_engine.sku_indices(cols['product'], inputs['skus'])
+    unlocked = order_abs >= start_abs
+    rows = np.flatnonzero(unlocked & (pairs > 0) & (sku_idx >= 0) & (order_abs - 1 < n_months))
+    orders = np.zeros((1, n_skus, n_months))
+    np.add.at(orders[0], (sku_idx[rows], order_abs[rows] - 1), pairs[rows])
+    unlocked_pos = [po for po, keep in zip(po_data, unlocked) if keep]
+
+    scores = evaluate_plans(_with_actual_costs(inputs, unlocked_pos), orders, min_cash)
+    current = {key: val[0] for key, val in scores.items()}
+    current['spend'] = float(record_schema.filled(cols['amount'], 0)[unlocked & (pairs > 0)].sum())
+    return current
+
+
+def _with_actual_costs(inputs: Dict, pos: List[Dict]) -> Dict:
+    # Existing POs pay their entered amounts, not the average cost per pair
+    amounts = inputs['locked_payments'].copy()
+    for year_idx, year in enumerate(PLAN_YEARS):
+        payments = calculate_po_payments(pos, inputs['lead_time'], inputs['payment_terms'], year)
+        amounts[year_idx * 12:(year_idx + 1) * 12] += [payments[m] for m in range(1, 13)]
+    return {**inputs, 'locked_payments': amounts, 'unit_costs': np.zeros_like(inputs['unit_costs'])}
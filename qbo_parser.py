@@ -6,6 +6,7 @@ into a standardized format for use in the Streamlit app.
 
 import openpyxl
 from typing import Dict, Tuple, Optional
+from instrumentation import timed
 
 
 # QBO P&L: search patterns -> standardized label
@@ -101,6 +102,7 @@ def _build_pl_row_map(ws):
     return row_map
 
 
+@timed()
 def parse_qbo_file(file_bytes) -> Dict:
     """
     Parse a QBO export file (uploaded via Streamlit file_uploader).
@@ -0,0 +1,285 @@
+"""
+Record Schema
+Validation and normalization of record collections at load and import time.
+
+Team members, OpEx expenses, deals, fundraising rounds and POs arrive as plain
+dicts from JSON files, session state and forms. Each collection has a schema of
+typed fields (date, number, integer, text) plus aliases for the field names the
+entry forms use (e.g. a deal's club_name / pairs / price_per_pair). validate()
+checks a whole collection column by column: every date column is cast to
+datetime64 in one pass and every numeric column coerced in one pass, with a
+per-value parse only for a column that holds something unusual. It returns
+normalized records (canonical field names, 'YYYY-MM-DD' dates, numeric strings
+converted) and one error row per rejected value. A rejected value stays in its
+record as entered, so saving the records never loses what the user typed and
+the error is reported again on the next load.
+
+columns() gives the same parse as typed arrays (datetime64[D] with NaT, float64
+with NaN), cached per collection content, so the calculators read clean columnar
+input instead of parsing and defending every record in their loops. That is
+where a rejected value is blanked: the model sees it as missing.
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model_cache import FingerprintCache
+
+DATE, NUMBER, INTEGER, TEXT = 'date', 'number', 'integer', 'text'
+
+SCHEMAS = {
+    'team_members': {
+        'fields': {
+            'first_name': TEXT, 'last_name': TEXT, 'title': TEXT, 'department': TEXT,
+            'employment_type': TEXT, 'annual_salary': NUMBER,
+            'start_date': DATE, 'termination_date': DATE,
+        },
+        'aliases': {},
+    },
+    'opex_expenses': {
+        'fields': {
+            'expense_name': TEXT, 'category': TEXT, 'frequency': TEXT,
+            'monthly_amount': NUMBER, 'annual_cost': NUMBER, 'growth_rate': NUMBER,
+            'start_date': DATE, 'end_date': DATE,
+        },
+        'aliases': {},
+    },
+    'wholesale_deals': {
+        'fields': {
+            'customer_name': TEXT, 'product_type': TEXT, 'stage': TEXT,
+            'num_pairs': NUMBER, 'wholesale_price': NUMBER, 'total_cost': NUMBER,
+            'cogs_product': NUMBER, 'cogs_warehousing': NUMBER, 'cogs_freight': NUMBER,
+            'cogs_merchant': NUMBER, 'win_probability': NUMBER,
+            'close_date': DATE, 'delivery_date': DATE,
+        },
+        # Wholesale Tracker form field -> canonical field
+        'aliases': {
+            'club_name': 'customer_name', 'pairs': 'num_pairs', 'price_per_pair': 'wholesale_price',
+            'cogs_product_pct': 'cogs_product', 'cogs_warehousing_pct': 'cogs_warehousing',
+            'cogs_freight_pct': 'cogs_freight', 'cogs_merchant_pct': 'cogs_merchant',
+        },
+    },
+    'fundraising_rounds': {
+        'fields': {'name': TEXT, 'status': TEXT, 'amount': NUMBER, 'month': INTEGER, 'year': INTEGER},
+        'aliases': {},
+    },
+    'po_data': {
+        'fields': {
+            'name': TEXT, 'product': TEXT, 'pairs': NUMBER, 'amount': NUMBER,
+            'order_month': INTEGER, 'order_year': INTEGER,
+        },
+        'aliases': {},
+    },
+}
+
+ERRORS = {DATE: "not a YYYY-MM-DD date", NUMBER: "not a number", INTEGER: "not a whole number"}
+
+_cache = FingerprintCache('record_columns', max_entries=32)
+
+
+def _compile(schema: Dict) -> Dict:
+    """Field lists by kind and canonical field -> form aliases, built once per schema."""
+    by_kind = {kind: [f for f, k in schema['fields'].items() if k == kind]
+               for kind in (DATE, NUMBER, INTEGER, TEXT)}
+    sources = {}
+    for alias, field in schema['aliases'].items():
+        sources.setdefault(field, []).append(alias)
+    return {'kinds': by_kind, 'fields': schema['fields'], 'sources': sources}
+
+
+_COMPILED = {name: _compile(schema) for name, schema in SCHEMAS.items()}
+
+
+def _compiled(collection: str) -> Dict:
+    if collection not in _COMPILED:
+        raise KeyError(f"No schema for '{collection}'")
+    return _COMPILED[collection]
+
+
+def _value(record: Dict, field: str, aliases: List[str]) -> Any:
+    """A field's value, falling back to the first alias the record carries."""
+    if field in record:
+        return record[field]
+    for alias in aliases:
+        if alias in record:
+            return record[alias]
+    return None
+
+
+def _missing(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip()) \
+        or (isinstance(value, float) and np.isnan(value))
+
+
+# ============================================================
+# COLUMN PARSERS
+# ============================================================
+
+def _parse_date(value: Any) -> np.datetime64:
+    """One date/datetime or date string (also 'YYYY-M-D' or with a time part); NaT if invalid."""
+    if isinstance(value, datetime):
+        return np.datetime64(value.date(), 'D')
+    if isinstance(value, date):
+        return np.datetime64(value, 'D')
+    if isinstance(value, str):
+        try:
+            d = datetime.strptime(value.strip().split('T')[0].split(' ')[0], '%Y-%m-%d').date()
+        except ValueError:
+            return np.datetime64('NaT', 'D')
+        return np.datetime64(d, 'D')
+    return np.datetime64('NaT', 'D')
+
+
+def parse_dates(values: List) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    datetime64[D] per value (NaT where missing or invalid) and a mask of invalid
+    values. 'YYYY-MM-DD' strings are cast in one pass; only other values, or a
+    column with an impossible date, are parsed one by one.
+    """
+    n = len(values)
+    canonical = np.fromiter((isinstance(v, str) and len(v) == 10 for v in values), dtype=bool, count=n)
+    strs = np.array([v if c else 'NaT' for v, c in zip(values, canonical)], dtype='U10')
+    try:
+        days = strs.astype('datetime64[D]')
+        slow = np.flatnonzero(~canonical)
+    except ValueError:
+        days = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+        slow = np.arange(n)
+    invalid = np.zeros(n, dtype=bool)
+    for i in slow:
+        if not _missing(values[i]):
+            days[i] = _parse_date(values[i])
+            invalid[i] = np.isnat(days[i])
+    return days, invalid
+
+
+def parse_numbers(values: List, integer: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """float64 per value (NaN where missing or invalid) and a mask of invalid values."""
+    numbers = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+    invalid = np.zeros(len(numbers), dtype=bool)
+    for i in np.flatnonzero(np.isnan(numbers)):
+        invalid[i] = not _missing(values[i])
+    if integer:
+        fractional = ~np.isnan(numbers) & (numbers != np.round(numbers))
+        numbers[fractional] = np.nan
+        invalid |= fractional
+    return numbers, invalid
+
+
+# ============================================================
+# VALIDATION
+# ============================================================
+
+def validate(collection: str, records: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Normalize a collection. Form aliases are renamed to their canonical field,
+    dates become 'YYYY-MM-DD' and numeric strings become numbers. Values that do
+    not parse are reported and left unchanged (columns() reads them as missing).
+    Records that need no change are returned as is.
+
+    Returns: (records, errors) where each error is
+             {"row", "record", "field", "value", "error"}
+    """
+    compiled = _compiled(collection)
+    records = list(records or [])
+    out = list(records)
+    errors = []
+
+    def changed(row: int) -> Dict:
+        if out[row] is records[row]:
+            out[row] = dict(records[row])
+        return out[row]
+
+    for field, aliases in compiled['sources'].items():
+        for row, record in enumerate(records):
+            present = [a for a in aliases if a in record]
+            if present and field not in record:
+                normalized = changed(row)
+                normalized[field] = normalized.pop(present[0])
+
+    for kind in (DATE, NUMBER, INTEGER):
+        for field in compiled['kinds'][kind]:
+            values = [r.get(field) for r in out]
+            if kind == DATE:
+                parsed, invalid = parse_dates(values)
+            else:
+                parsed, invalid = parse_numbers(values, integer=kind == INTEGER)
+            for row, value in enumerate(values):
+                if invalid[row]:
+                    errors.append({'row': row, 'record': _label(out[row]), 'field': field,
+                                   'value': str(value), 'error': ERRORS[kind]})
+                elif field in out[row] and not _missing(value):
+                    clean = _clean(kind, value, parsed[row])
+                    if clean is not value:
+                        changed(row)[field] = clean
+    return out, errors
+
+
+def validate_record(collection: str, record: Dict) -> Tuple[Dict, List[Dict]]:
+    """validate() for a single record, e.g. one submitted from a form."""
+    records, errors = validate(collection, [record])
+    return records[0], errors
+
+
+def _clean(kind: str, value: Any, parsed: Any) -> Any:
+    """Canonical form of a valid value; the value itself when it already is."""
+    if kind == DATE:
+        iso = str(parsed)
+        return value if value == iso else iso
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return int(parsed) if kind == INTEGER else float(parsed)
+
+
+def _label(record: Dict) -> str:
+    """Readable name of a record for error reports."""
+    for field in ('customer_name', 'expense_name', 'name', 'product'):
+        if record.get(field):
+            return str(record[field])
+    name = f"{record.get('first_name', '')} {record.get('last_name', '')}".strip()
+    return name
+
+
+def error_frame(errors: Dict[str, List[Dict]]) -> pd.DataFrame:
+    """Row-level errors of several collections as one table."""
+    rows = [{'Collection': collection, 'Row': e['row'] + 1, 'Record': e['record'],
+             'Field': e['field'], 'Value': e['value'], 'Error': e['error']}
+            for collection, collection_errors in errors.items() for e in collection_errors]
+    return pd.DataFrame(rows, columns=['Collection', 'Row', 'Record', 'Field', 'Value', 'Error'])
+
+
+# ============================================================
+# COLUMNS
+# ============================================================
+
+def columns(collection: str, records: List[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Typed columns of every schema field: datetime64[D] (NaT when missing or
+    invalid) for dates, float64 (NaN) for numbers and integers, object arrays for
+    text. Aliases are read like validate() renames them. Cached per content.
+    """
+    compiled = _compiled(collection)
+
+    def compute():
+        cols = {}
+        for field, kind in compiled['fields'].items():
+            aliases = compiled['sources'].get(field)
+            values = [_value(r, field, aliases) for r in records] if aliases \
+                else [r.get(field) for r in records]
+            if kind == DATE:
+                cols[field] = parse_dates(values)[0]
+            elif kind in (NUMBER, INTEGER):
+                cols[field] = parse_numbers(values, integer=kind == INTEGER)[0]
+            else:
+                cols[field] = np.array(values, dtype=object)
+        return cols
+
+    return _cache.get_or_compute([collection, records], compute)
+
+
+def filled(values: np.ndarray, default: float) -> np.ndarray:
+    """A number column with its missing and invalid values (NaN) replaced by default."""
+    return np.where(np.isnan(values), default, values)
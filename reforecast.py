@@ -0,0 +1,166 @@
+"""
+Rolling Reforecast
+Actuals to date plus forecast for the rest of the year.
+
+Closed months (those with a QBO P&L column) take their values from the actuals
+store; open months come from generate_monthly_pl. Ending cash and AP for the last
+closed month come from the QBO balance sheet and seed calculate_cash_runway, which
+then runs over the open months only. The year's forecast is cached on its inputs,
+so when a new QBO month lands only the splice and the open-month runway are redone.
+"""
+
+from typing import Dict, List
+
+import pandas as pd
+
+from financial_calcs import generate_monthly_pl, calculate_po_payments
+from model_cache import FingerprintCache
+from qbo_parser import (
+    deserialize_qbo_data, build_actuals_dataframe, actuals_to_pl_format, MONTHS
+)
+
+# Columns taken straight from QBO in closed months
+ACTUAL_COLUMNS = ['DTC Revenue', 'Wholesale Revenue', 'Total Revenue', 'Total COGS',
+                  'Gross Profit', 'Total OpEx', 'EBITDA']
+# QBO has no DTC / wholesale COGS split: the actual total is split by the forecast mix
+COGS_PARTS = ['DTC COGS', 'Wholesale COGS']
+
+_forecast_cache = FingerprintCache('forecast_pl', max_entries=8)
+
+
+def closed_months(qbo_parsed: Dict, year: int) -> int:
+    """Last month of `year` with actuals (0 when none)."""
+    if not qbo_parsed:
+        return 0
+    return max([mo for yr, mo in qbo_parsed['months_found'] if yr == year] + [0])
+
+
+def get_forecast(year: int, team_members: List[Dict], opex_expenses: List[Dict],
+                 wholesale_deals: List[Dict], po_data: List[Dict] = None,
+                 inventory_config: Dict = None, dtc_demand: Dict = None) -> pd.DataFrame:
+    """
+    Full-year forecast P&L (inventory mode when POs are set up), cached on its inputs.
+    dtc_demand replaces the plan's DTC units (see generate_monthly_pl).
+    """
+    kwargs = dict(year=year, team_members=team_members, opex_expenses=opex_expenses,
+                  wholesale_deals=wholesale_deals, dtc_discount_rate=0.0, dtc_return_rate=0.0,
+                  dtc_demand=dtc_demand)
+    if po_data and inventory_config:
+        kwargs['po_data'] = po_data
+        kwargs['inventory_config'] = inventory_config
+    key = [year, team_members, opex_expenses, wholesale_deals, po_data, inventory_config, dtc_demand]
+    return _forecast_cache.get_or_compute(key, lambda: generate_monthly_pl(**kwargs))
+
+
+def splice_pl(forecast_df: pd.DataFrame, qbo_parsed: Dict, year: int, closed: int) -> pd.DataFrame:
+    """
+    Forecast P&L with months 1..closed replaced by actuals. Payroll is used as actual
+    Team Costs and the rest of QBO expenses as Other OpEx. Adds a "Source" column.
+    """
+    blended = forecast_df.copy()
+    blended['Source'] = ['Actual' if m <= closed else 'Forecast' for m in range(1, len(blended) + 1)]
+    if closed == 0:
+        return blended
+
+    actual = pd.DataFrame(actuals_to_pl_format(
+        build_actuals_dataframe(qbo_parsed['pl_data'], year, closed))).iloc[:closed]
+    rows = blended.index[:closed]
+    spliced = [c for c in ACTUAL_COLUMNS + COGS_PARTS + ['Team Costs', 'Other OpEx', 'DTC Gross Revenue']
+               if c in blended.columns]
+    blended[spliced] = blended[spliced].astype(float)
+
+    forecast_cogs = blended.loc[rows, COGS_PARTS].sum(axis=1)
+    for part in COGS_PARTS:
+        share = (blended.loc[rows, part] / forecast_cogs.where(forecast_cogs != 0)).fillna(
+            1.0 if part == 'DTC COGS' else 0.0)
+        blended.loc[rows, part] = actual['Total COGS'].to_numpy() * share.to_numpy()
+
+    for col in ACTUAL_COLUMNS:
+        blended.loc[rows, col] = actual[col].to_numpy()
+    blended.loc[rows, 'Team Costs'] = actual['Payroll'].to_numpy()
+    blended.loc[rows, 'Other OpEx'] = (actual['Total OpEx'] - actual['Payroll']).to_numpy()
+    if 'DTC Gross Revenue' in blended.columns:
+        blended.loc[rows, 'DTC Gross Revenue'] = actual['DTC Revenue'].to_numpy()
+
+    revenue = blended['Total Revenue']
+    blended['Gross Margin %'] = (blended['Gross Profit'] / revenue.where(revenue > 0) * 100).fillna(0)
+    blended['EBITDA Margin %'] = (blended['EBITDA'] / revenue.where(revenue > 0) * 100).fillna(0)
+    return blended
+
+
+def closing_position(qbo_parsed: Dict, year: int, closed: int) -> Dict[str, float]:
+    """Balance-sheet cash and AP at the end of the last closed month (latest QBO values otherwise)."""
+    if closed == 0:
+        return {'cash': qbo_parsed['latest_cash'], 'ap': qbo_parsed['latest_ap']}
+    return {
+        'cash': qbo_parsed['cash_data'].get((year, closed), qbo_parsed['latest_cash']),
+        'ap': qbo_parsed['ap_data'].get((year, closed), qbo_parsed['latest_ap']),
+    }
+
+
+def open_month_runway(forecast_df: pd.DataFrame, closed: int, starting_cash: float, current_ap: float,
+                      fundraising_rounds: List[Dict] = None, year: int = 2026,
+                      po_data: List[Dict] = None, inventory_config: Dict = None,
+                      current_ar: float = 0.0) -> pd.DataFrame:
+    """calculate_cash_runway over months closed+1..12, seeded with the actual closing position."""
+    from pages.cash_runway import calculate_cash_runway, calculate_fulfillment_cogs
+
+    po_pay = fulfill = None
+    if po_data and inventory_config:
+        po_pay = calculate_po_payments(
+            po_data, inventory_config.get('lead_time_months', 4),
+            inventory_config.get('payment_terms_months', 5), year)
+        fulfill = calculate_fulfillment_cogs(forecast_df, inventory_config)
+
+    return calculate_cash_runway(
+        starting_cash=starting_cash,
+        current_ap=current_ap,
+        current_ar=current_ar,
+        monthly_pl_df=forecast_df.iloc[closed:],
+        fundraising_rounds=fundraising_rounds,
+        year=year,
+        po_payments=po_pay,
+        fulfillment_cogs=fulfill,
+    )
+
+
+def build_reforecast(year: int, team_members: List[Dict], opex_expenses: List[Dict],
+                     wholesale_deals: List[Dict], qbo_raw: Dict, po_data: List[Dict] = None,
+                     inventory_config: Dict = None, fundraising_rounds: List[Dict] = None) -> Dict:
+    """
+    Blended outlook for `year`.
+
+    Returns: {"pl": spliced P&L, "forecast": pure forecast P&L, "runway": month-end
+              cash with actual balances in closed months, "closed": last closed month,
+              "position": closing cash / AP the open months start from}
+    """
+    qbo_parsed = deserialize_qbo_data(qbo_raw)
+    closed = closed_months(qbo_parsed, year)
+    forecast = get_forecast(year, team_members, opex_expenses, wholesale_deals, po_data, inventory_config)
+    blended = splice_pl(forecast, qbo_parsed, year, closed)
+
+    position = closing_position(qbo_parsed, year, closed) if qbo_parsed else {'cash': 0.0, 'ap': 0.0}
+    parts = []
+
+    # Closed months: actual month-end cash from the balance sheet
+    if closed:
+        balances = [qbo_parsed['cash_data'].get((year, m), 0.0) for m in range(1, closed + 1)]
+        prior = qbo_parsed['cash_data'].get((year - 1, 12), balances[0])
+        actual_rows = pd.DataFrame({
+            'Month': MONTHS[:closed],
+            'Source': 'Actual',
+            'Net Cash Flow': pd.Series(balances).diff().fillna(balances[0] - prior).to_numpy(),
+            'Ending Cash': balances,
+        })
+        parts.append(actual_rows)
+
+    # Open months (none once the whole year is closed)
+    if closed < 12:
+        runway = open_month_runway(forecast, closed, position['cash'], position['ap'],
+                                   fundraising_rounds, year, po_data, inventory_config)
+        runway.insert(1, 'Source', 'Forecast')
+        parts.append(runway)
+    runway = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+    return {'pl': blended, 'forecast': forecast, 'runway': runway,
+            'closed': closed, 'position': position}
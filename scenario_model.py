@@ -0,0 +1,235 @@
+"""
+Scenario Model
+Batched evaluation of the monthly P&L and cash runway for many parameter sets.
+
+prepare_scenario_base runs the record-level calculators once and keeps only what the
+parameters cannot change (wholesale revenue and COGS, OpEx, funding, DTC demand,
+PO quantities and order months). Team costs are linear in the Rippling burden
+rates, so they are stored as a base plus one component per rate. evaluate_scenarios
+then takes an array per parameter and produces (scenarios x months) P&L and cash
+lines with the batched inventory recurrence: one call for any number of scenarios.
+
+At the baseline parameters the results equal generate_monthly_pl in inventory mode
+and calculate_cash_runway with the inventory COGS split.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+import inventory_engine
+import record_schema
+from baseline_data import get_rippling_burdens
+from model_cache import FingerprintCache
+from financial_calcs import (
+    calculate_team_costs_monthly,
+    calculate_opex_monthly,
+    calculate_wholesale_revenue_monthly,
+    get_dtc_demand_units,
+)
+
+# Rippling rates the team cost is linear in (start_month is not)
+RIPPLING_RATE_KEYS = ('rippling', 'healthcare', 'futa', 'medicare', 'soc_secur',
+                      'ca_ett', 'pre_rippling_rate')
+
+# Parameters evaluate_scenarios understands, with the model's defaults
+PARAMETER_DEFAULTS = {
+    'beta_aov': 250.0,
+    'alpha_aov': 450.0,
+    'cogs_total_rate': 0.40,
+    'cogs_product_pct': 0.25,
+    'dtc_discount_pct': 0.0,
+    'dtc_returns_pct': 0.0,
+    'lead_time_months': 4,
+    'payment_terms_months': 5,
+    'beg_inv_beta': 0,
+    'beg_inv_alpha': 0,
+    'extra_funding': 0.0,
+    'extra_funding_month': 1,
+    **{key: get_rippling_burdens()[key] for key in RIPPLING_RATE_KEYS},
+}
+
+
+def base_parameters(inventory_config: Dict = None, rippling: Dict = None,
+                    dtc_discount_rate: float = 0.0, dtc_return_rate: float = 0.0) -> Dict[str, float]:
+    """Parameter values the pages currently run the model with."""
+    inventory_config = inventory_config or {}
+    rippling = rippling or get_rippling_burdens()
+    params = dict(PARAMETER_DEFAULTS)
+    for key in ('beta_aov', 'alpha_aov', 'cogs_total_rate', 'cogs_product_pct',
+                'lead_time_months', 'payment_terms_months', 'beg_inv_beta', 'beg_inv_alpha'):
+        if key in inventory_config:
+            params[key] = inventory_config[key]
+    for key in RIPPLING_RATE_KEYS:
+        params[key] = rippling.get(key, params[key])
+    params['dtc_discount_pct'] = dtc_discount_rate
+    params['dtc_returns_pct'] = dtc_return_rate
+    return params
+
+
+# ============================================================
+# INVARIANT INPUTS
+# ============================================================
+
+def _team_components(team_members: List[Dict], year: int) -> Dict[str, np.ndarray]:
+    """Team cost at zero burden rates plus the cost of one unit of each rate."""
+    burdens = get_rippling_burdens()
+    zero = {**burdens, **{key: 0.0 for key in RIPPLING_RATE_KEYS}}
+
+    def run(rates):
+        costs = calculate_team_costs_monthly(team_members, year, rippling=rates)
+        return np.array([costs[m] for m in range(1, 13)])
+
+    base = run(zero)
+    components = np.array([run({**zero, key: 1.0}) - base for key in RIPPLING_RATE_KEYS])
+    return {'base': base, 'components': components}
+
+
+def prepare_scenario_base(
+    year: int,
+    team_members: List[Dict],
+    opex_expenses: List[Dict],
+    wholesale_deals: List[Dict],
+    po_data: List[Dict] = None,
+    fundraising_rounds: List[Dict] = None,
+    starting_cash: float = 0.0,
+    current_ar: float = 0.0,
+    current_ap: float = 0.0,
+) -> Dict:
+    """Arrays shared by every scenario of one year."""
+    from pages.cash_runway import get_monthly_funding
+
+    skus = list(inventory_engine.DEFAULT_SKUS)
+    ws_revenue, ws_cogs = calculate_wholesale_revenue_monthly(wholesale_deals, year)
+    opex = calculate_opex_monthly(opex_expenses, year)
+    funding = get_monthly_funding(fundraising_rounds, year)
+
+    pos = record_schema.columns('po_data', po_data or [])
+    po_sku = inventory_engine.sku_indices(pos['product'], skus)
+    order_abs = inventory_engine.order_months(pos)
+    amount = record_schema.filled(pos['amount'], 0)
+    orders = (po_sku >= 0) & (order_abs != inventory_engine.NO_MONTH)
+    # Payments count POs of any product, like calculate_po_payments
+    paid = (amount > 0) & (order_abs != inventory_engine.NO_MONTH)
+    return {
+        'year': year,
+        'skus': skus,
+        'ws_revenue': np.array([ws_revenue[m] for m in range(1, 13)]),
+        'ws_cogs': np.array([ws_cogs[m] for m in range(1, 13)]),
+        'opex': np.array([opex[m] for m in range(1, 13)]),
+        'funding': np.array([funding[m] for m in range(1, 13)]),
+        'team': _team_components(team_members, year),
+        'demand': inventory_engine.demand_matrix(get_dtc_demand_units(year), skus),
+        'shipments': inventory_engine.ws_shipment_matrix(wholesale_deals, year, skus),
+        'po_sku': po_sku[orders],
+        'po_order_abs': order_abs[orders],
+        'po_pairs': record_schema.filled(pos['pairs'], 0)[orders],
+        'pay_order_abs': order_abs[paid],
+        'pay_amount': amount[paid],
+        'opening_cash': starting_cash + current_ar - current_ap,
+    }
+
+
+_base_cache = FingerprintCache('scenario_base', max_entries=8)
+
+
+def get_scenario_base(year: int, team_members: List[Dict], opex_expenses: List[Dict],
+                      wholesale_deals: List[Dict], po_data: List[Dict] = None,
+                      fundraising_rounds: List[Dict] = None, starting_cash: float = 0.0,
+                      current_ar: float = 0.0, current_ap: float = 0.0) -> Dict:
+    """prepare_scenario_base, reused while the inputs are unchanged."""
+    args = (year, team_members, opex_expenses, wholesale_deals, po_data,
+            fundraising_rounds, starting_cash, current_ar, current_ap)
+    return _base_cache.get_or_compute(list(args), lambda: prepare_scenario_base(*args))
+
+
+# ============================================================
+# BATCHED EVALUATION
+# ============================================================
+
+def _scenario_count(params: Dict) -> int:
+    sizes = {np.size(v) for v in params.values() if np.ndim(v) > 0}
+    if len(sizes) > 1:
+        raise ValueError(f"Parameter arrays differ in length: {sorted(sizes)}")
+    return sizes.pop() if sizes else 1
+
+
+def _bucket(month_col: np.ndarray, weights: np.ndarray, n_scen: int, rows: np.ndarray = None,
+            n_rows: int = 1) -> np.ndarray:
+    """Sum (scenarios x records) weights into (scenarios x rows x 12) by month column."""
+    scen = np.arange(n_scen)[:, None]
+    rows = np.zeros_like(month_col) if rows is None else np.broadcast_to(rows, month_col.shape)
+    keep = (month_col >= 0) & (month_col < 12)
+    flat = ((scen * n_rows + rows) * 12 + month_col)[keep]
+    w = np.broadcast_to(weights, month_col.shape)[keep]
+    return np.bincount(flat, weights=w, minlength=n_scen * n_rows * 12).reshape(n_scen, n_rows, 12)
+
+
+def evaluate_scenarios(base: Dict, params: Dict) -> Dict[str, np.ndarray]:
+    """
+    P&L and cash lines for every scenario. params maps parameter names (see
+    PARAMETER_DEFAULTS; missing ones take the default) to scalars or equal-length
+    arrays, one entry per scenario.
+
+    Returns: (scenarios x 12) arrays for each line, plus per-scenario
+             "annual_ebitda" and "min_cash"
+    """
+    params = {**PARAMETER_DEFAULTS, **params}
+    n_scen = _scenario_count(params)
+
+    def col(name, dtype=float):
+        return np.broadcast_to(np.asarray(params[name], dtype=dtype), (n_scen,))
+
+    first_abs = inventory_engine.month_index(base['year'], 1)
+    lead = col('lead_time_months', np.int64)
+    terms = col('payment_terms_months', np.int64)
+
+    # Inventory: arrivals shift with each scenario's lead time
+    arrival_col = base['po_order_abs'][None, :] + lead[:, None] - first_abs
+    has_pairs = base['po_pairs'] > 0
+    arrivals = _bucket(arrival_col[:, has_pairs], base['po_pairs'][has_pairs], n_scen,
+                       base['po_sku'][has_pairs], len(base['skus']))
+    opening = np.stack([col('beg_inv_beta'), col('beg_inv_alpha')], axis=1)
+    sim = inventory_engine.simulate_inventory_batch(
+        opening, arrivals, base['shipments'], base['demand'], outputs=('dtc_sales',))
+
+    aov = np.stack([col('beta_aov'), col('alpha_aov')], axis=1)
+    dtc_gross = np.einsum('sk,skm->sm', aov, sim['dtc_sales'])
+    dtc_net = dtc_gross * ((1 - col('dtc_discount_pct')) * (1 - col('dtc_returns_pct')))[:, None]
+    dtc_cogs = dtc_gross * col('cogs_total_rate')[:, None]
+
+    rates = np.stack([col(key) for key in RIPPLING_RATE_KEYS], axis=1)
+    team = base['team']['base'][None, :] + rates @ base['team']['components']
+
+    total_revenue = dtc_net + base['ws_revenue']
+    total_cogs = dtc_cogs + base['ws_cogs']
+    total_opex = team + base['opex']
+    ebitda = total_revenue - total_cogs - total_opex
+
+    # Cash: product cost is paid through PO payments, fulfillment at sale time
+    pay_col = base['pay_order_abs'][None, :] + (lead + terms)[:, None] - first_abs
+    po_payments = _bucket(pay_col, base['pay_amount'], n_scen)[:, 0, :]
+    fulfillment = dtc_gross * (col('cogs_total_rate') - col('cogs_product_pct'))[:, None]
+    extra_col = (col('extra_funding_month', np.int64) - 1)[:, None]
+    extra = _bucket(extra_col, col('extra_funding')[:, None], n_scen)[:, 0, :]
+    funding = base['funding'][None, :] + extra
+
+    cash_in = total_revenue + funding
+    cash_out = po_payments + fulfillment + base['ws_cogs'] + total_opex
+    ending_cash = base['opening_cash'] + np.cumsum(cash_in - cash_out, axis=1)
+
+    return {
+        'dtc_gross': dtc_gross,
+        'dtc_revenue': dtc_net,
+        'total_revenue': total_revenue,
+        'total_cogs': total_cogs,
+        'team_costs': team,
+        'total_opex': total_opex,
+        'ebitda': ebitda,
+        'po_payments': po_payments,
+        'funding': funding,
+        'net_cash_flow': cash_in - cash_out,
+        'ending_cash': ending_cash,
+        'annual_ebitda': ebitda.sum(axis=1),
+        'min_cash': ending_cash.min(axis=1),
+    }
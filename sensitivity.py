@@ -0,0 +1,126 @@
+"""
+Sensitivity Analysis
+One-at-a-time perturbation of model assumptions, ranked by impact (tornado).
+
+Every parameter is moved down and up by its delta while the others stay at their
+current values. The 1 + 2 x parameters scenarios are evaluated together in one
+scenario_model pass, and each parameter's swing in annual EBITDA and in minimum
+cash balance is reported. Results are cached on the fingerprint of the inputs
+and deltas.
+
+Only assumptions the model actually reads are perturbed: AOVs, COGS rates,
+discount / returns, lead time, payment terms, beginning inventory and the Rippling
+burden rates. The remaining Assumptions page keys (gamma AOV, CAC, benefits %) do
+not feed generate_monthly_pl.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+import scenario_model
+from model_cache import FingerprintCache
+
+# name -> (label, delta kind, default delta, lower bound, integer)
+# 'pct' deltas are relative (0.10 = +/-10%), 'abs' deltas are added / subtracted
+PARAMETERS = {
+    'beta_aov': ('Beta AOV', 'pct', 0.10, 0.0, False),
+    'alpha_aov': ('Alpha AOV', 'pct', 0.10, 0.0, False),
+    'cogs_total_rate': ('Total COGS Rate', 'abs', 0.05, 0.0, False),
+    'cogs_product_pct': ('Product Cost % (cash timing)', 'abs', 0.05, 0.0, False),
+    'dtc_discount_pct': ('DTC Discount %', 'abs', 0.05, 0.0, False),
+    'dtc_returns_pct': ('DTC Returns %', 'abs', 0.05, 0.0, False),
+    'lead_time_months': ('PO Lead Time (months)', 'abs', 1, 0, True),
+    'payment_terms_months': ('PO Payment Terms (months)', 'abs', 1, 0, True),
+    'beg_inv_beta': ('Beginning Inventory - Beta', 'pct', 0.20, 0, True),
+    'beg_inv_alpha': ('Beginning Inventory - Alpha', 'pct', 0.20, 0, True),
+    'healthcare': ('Rippling Healthcare ($/mo)', 'pct', 0.10, 0.0, False),
+    'rippling': ('Rippling PEO Fee ($/mo)', 'pct', 0.10, 0.0, False),
+    'soc_secur': ('Social Security Rate', 'pct', 0.10, 0.0, False),
+    'medicare': ('Medicare Rate', 'pct', 0.10, 0.0, False),
+    'pre_rippling_rate': ('Pre-Rippling Burden Rate', 'abs', 0.02, 0.0, False),
+}
+
+METRICS = {
+    'annual_ebitda': 'Annual EBITDA',
+    'min_cash': 'Minimum Cash Balance',
+}
+
+_cache = FingerprintCache('sensitivity', max_entries=8)
+
+
+def perturb(value: float, name: str, delta: float = None) -> tuple:
+    """(low, high) values of one parameter around its current value."""
+    _, kind, default_delta, lower, integer = PARAMETERS[name]
+    delta = default_delta if delta is None else delta
+    step = abs(value) * delta if kind == 'pct' else delta
+    low, high = max(value - step, lower), value + step
+    if integer:
+        low, high = int(round(low)), int(round(high))
+    return low, high
+
+
+def build_scenarios(base_params: Dict[str, float], names: List[str],
+                    deltas: Dict[str, float] = None) -> Dict[str, np.ndarray]:
+    """
+    Parameter arrays for [base, low_1, high_1, low_2, high_2, ...]: scenario 0 is the
+    base case, scenarios 2i+1 / 2i+2 move parameter i down / up.
+    """
+    deltas = deltas or {}
+    n_scen = 1 + 2 * len(names)
+    arrays = {key: np.full(n_scen, value, dtype=float) for key, value in base_params.items()}
+    for i, name in enumerate(names):
+        low, high = perturb(base_params[name], name, deltas.get(name))
+        arrays[name][2 * i + 1] = low
+        arrays[name][2 * i + 2] = high
+    return arrays
+
+
+def run_sensitivity(base: Dict, base_params: Dict[str, float], deltas: Dict[str, float] = None,
+                    names: List[str] = None) -> pd.DataFrame:
+    """
+    Impact of each parameter's low / high value on every metric, sorted by the
+    largest swing in annual EBITDA. Base-case metric values are in df.attrs['base'].
+    """
+    names = [n for n in (names or PARAMETERS) if n in base_params]
+    scenarios = build_scenarios(base_params, names, deltas)
+    results = scenario_model.evaluate_scenarios(base, scenarios)
+
+    rows = []
+    for i, name in enumerate(names):
+        lo, hi = 2 * i + 1, 2 * i + 2
+        row = {
+            'Parameter': PARAMETERS[name][0],
+            'Key': name,
+            'Base Value': base_params[name],
+            'Low Value': scenarios[name][lo],
+            'High Value': scenarios[name][hi],
+        }
+        for metric, label in METRICS.items():
+            base_value = results[metric][0]
+            row[f'{label} Low'] = results[metric][lo] - base_value
+            row[f'{label} High'] = results[metric][hi] - base_value
+            row[f'{label} Swing'] = abs(results[metric][hi] - results[metric][lo])
+        rows.append(row)
+
+    df = pd.DataFrame(rows).sort_values(f"{METRICS['annual_ebitda']} Swing", ascending=False)
+    df = df.reset_index(drop=True)
+    df.attrs['base'] = {label: float(results[metric][0]) for metric, label in METRICS.items()}
+    return df
+
+
+def cached_sensitivity(year: int, team_members: List[Dict], opex_expenses: List[Dict],
+                       wholesale_deals: List[Dict], po_data: List[Dict], inventory_config: Dict,
+                       fundraising_rounds: List[Dict] = None, starting_cash: float = 0.0,
+                       current_ap: float = 0.0, deltas: Dict[str, float] = None) -> pd.DataFrame:
+    """run_sensitivity for the current inputs, reused while inputs and deltas are unchanged."""
+    def compute():
+        base = scenario_model.get_scenario_base(
+            year, team_members, opex_expenses, wholesale_deals, po_data,
+            fundraising_rounds, starting_cash, 0.0, current_ap)
+        return run_sensitivity(base, scenario_model.base_parameters(inventory_config), deltas)
+
+    key = [year, team_members, opex_expenses, wholesale_deals, po_data, inventory_config,
+           fundraising_rounds, starting_cash, current_ap, deltas]
+    return _cache.get_or_compute(key, compute)
@@ -0,0 +1,157 @@
+"""
+Variance Engine
+Actual vs forecast variances for every P&L metric and closed month in one pass.
+
+Actuals (the full QBO chart of accounts plus the dashboard's summary lines) and the
+forecast are aligned on a shared metric x month grid. Monthly, year-to-date and
+rolling-quarter (trailing three months) variances in $ and % are then whole-array
+operations: cumulative sums along the month axis give YTD and rolling windows for
+every metric at once. Accounts the forecast does not model keep their actuals with
+no forecast (NaN). Used by the Monthly P&L Detail page and the PDF report.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from qbo_parser import build_actuals_dataframe, actuals_to_pl_format, QBO_PL_LABELS, MONTHS
+
+# Dashboard summary lines, in display order
+SUMMARY_METRICS = ['Total Revenue', 'Total COGS', 'Gross Profit', 'Total OpEx', 'EBITDA']
+# Lines where actual above forecast is good; every other line is a cost
+HIGHER_IS_BETTER = {'DTC Revenue', 'Wholesale Revenue', 'Total Revenue', 'Gross Profit',
+                    'EBITDA', 'Net Operating Income', 'Net Income', 'Other Income/(Expense)'}
+ROLLING_MONTHS = 3
+ALERT_THRESHOLD_PCT = 10.0
+
+WINDOWS = ('Month', 'YTD', 'R3M')
+
+
+def actuals_frame(pl_data: Dict, year: int, max_month: int = 12) -> pd.DataFrame:
+    """
+    Monthly actuals for `year` (12 rows, zero after max_month): the dashboard P&L
+    columns plus every QBO chart-of-accounts line they do not already cover.
+    """
+    raw = build_actuals_dataframe(pl_data, year, max_month)
+    df = pd.DataFrame(actuals_to_pl_format(raw))
+    for label in QBO_PL_LABELS:
+        if label not in df.columns:
+            df[label] = raw[label]
+    return df
+
+
+def _metric_columns(df: pd.DataFrame) -> List[str]:
+    return [c for c in df.columns
+            if c != 'Month' and not c.endswith('%') and pd.api.types.is_numeric_dtype(df[c])]
+
+
+def align(actual_df: pd.DataFrame, forecast_df: pd.DataFrame, closed: int,
+          metrics: List[str] = None) -> Dict:
+    """
+    (metric x month) actual and forecast arrays over months 1..closed. Metrics default
+    to every numeric actuals column, summary lines first; forecast cells for metrics
+    the forecast lacks are NaN.
+    """
+    if metrics is None:
+        columns = _metric_columns(actual_df)
+        metrics = [m for m in SUMMARY_METRICS if m in columns] + \
+                  [m for m in columns if m not in SUMMARY_METRICS]
+    actual = actual_df.reindex(columns=metrics).iloc[:closed].to_numpy(dtype=float).T
+    forecast = forecast_df.reindex(columns=metrics).iloc[:closed].to_numpy(dtype=float).T
+    return {'metrics': metrics, 'months': MONTHS[:closed], 'actual': np.nan_to_num(actual),
+            'forecast': forecast}
+
+
+def _pct(variance: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """Variance as % of |base|; 0 where the base is 0, NaN where there is no base."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = variance / np.abs(base) * 100
+    return np.where(base == 0, 0.0, pct)
+
+
+def _trailing(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing-window sums along the month axis (shorter at the start of the year)."""
+    csum = np.cumsum(values, axis=1)
+    lagged = np.zeros_like(csum)
+    lagged[:, window:] = csum[:, :-window]
+    return csum - lagged
+
+
+def compute_variances(aligned: Dict, rolling: int = ROLLING_MONTHS) -> pd.DataFrame:
+    """
+    Every variance for every (metric, month) cell.
+
+    Returns: DataFrame indexed by (Metric, Month) with, for each window in
+             Month / YTD / R3M: "{w} Actual", "{w} Forecast", "{w} Variance $",
+             "{w} Variance %", plus "Favorable" for the monthly variance.
+    """
+    actual, forecast = aligned['actual'], aligned['forecast']
+    windows = {
+        'Month': (actual, forecast),
+        'YTD': (np.cumsum(actual, axis=1), np.cumsum(forecast, axis=1)),
+        'R3M': (_trailing(actual, rolling), _trailing(forecast, rolling)),
+    }
+    direction = np.where([m in HIGHER_IS_BETTER for m in aligned['metrics']], 1.0, -1.0)[:, None]
+
+    columns = {}
+    for name, (act, fc) in windows.items():
+        var = act - fc
+        columns[f'{name} Actual'] = act
+        columns[f'{name} Forecast'] = fc
+        columns[f'{name} Variance $'] = var
+        columns[f'{name} Variance %'] = _pct(var, fc)
+    columns['Favorable'] = np.where(np.isnan(forecast), np.nan, direction * (actual - forecast) >= 0)
+
+    index = pd.MultiIndex.from_product([aligned['metrics'], aligned['months']], names=['Metric', 'Month'])
+    return pd.DataFrame({name: values.ravel() for name, values in columns.items()}, index=index)
+
+
+def analyze(actual_df: pd.DataFrame, forecast_df: pd.DataFrame, closed: int,
+            metrics: List[str] = None) -> pd.DataFrame:
+    """align + compute_variances."""
+    return compute_variances(align(actual_df, forecast_df, closed, metrics))
+
+
+# ============================================================
+# VIEWS
+# ============================================================
+
+def metric_table(variances: pd.DataFrame, metric: str) -> pd.DataFrame:
+    """Monthly Actual / Forecast / Variance rows for one metric plus a YTD Total row."""
+    rows = variances.loc[metric]
+    table = pd.DataFrame({
+        'Month': rows.index,
+        'Actual': rows['Month Actual'].to_numpy(),
+        'Forecast': rows['Month Forecast'].to_numpy(),
+        'Variance $': rows['Month Variance $'].to_numpy(),
+        'Variance %': rows['Month Variance %'].to_numpy(),
+    })
+    last = rows.iloc[-1]
+    totals = {'Month': 'YTD Total', 'Actual': last['YTD Actual'], 'Forecast': last['YTD Forecast'],
+              'Variance $': last['YTD Variance $'], 'Variance %': last['YTD Variance %']}
+    return pd.concat([table, pd.DataFrame([totals])], ignore_index=True)
+
+
+def period_summary(variances: pd.DataFrame, month: str = None, window: str = 'YTD') -> pd.DataFrame:
+    """One row per metric for a single month (default: the last closed month) and window."""
+    months = variances.index.get_level_values('Month')
+    month = month or months[-1]
+    rows = variances.xs(month, level='Month')
+    cols = [f'{window} Actual', f'{window} Forecast', f'{window} Variance $', f'{window} Variance %']
+    summary = rows[cols].copy()
+    summary.columns = ['Actual', 'Forecast', 'Variance $', 'Variance %']
+    summary['Favorable'] = np.where(
+        summary['Forecast'].isna(), np.nan,
+        np.where([m in HIGHER_IS_BETTER for m in summary.index], 1.0, -1.0) * summary['Variance $'] >= 0)
+    return summary.reset_index()
+
+
+def alerts(variances: pd.DataFrame, month: str = None, metrics: List[str] = None,
+           threshold_pct: float = ALERT_THRESHOLD_PCT) -> List[Dict]:
+    """Metrics whose monthly variance exceeds threshold_pct of forecast in `month`."""
+    summary = period_summary(variances, month, 'Month')
+    if metrics is not None:
+        summary = summary[summary['Metric'].isin(metrics)]
+    flagged = summary[(summary['Forecast'].fillna(0) != 0) & (summary['Variance %'].abs() > threshold_pct)]
+    return flagged.to_dict('records')
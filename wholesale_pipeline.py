@@ -0,0 +1,201 @@
+"""
+Wholesale Pipeline
+Stage-based win probabilities and delivery slips for wholesale deals.
+
+Every deal carries a pipeline stage (deals without one are Closed Won, i.e.
+certain, so existing data is unchanged). A stage sets the chance the deal is won
+and how many months its delivery may slip. Two views follow from that:
+
+  expected_deals   each uncertain deal split into probability-weighted deals, one
+                   per possible delivery month. Fed to generate_monthly_pl, the
+                   inventory engine and the cash runway unchanged, this gives the
+                   risk-adjusted (expected) forecast.
+  simulate         (deals x scenarios) win and slip draws, summed into per-scenario
+                   monthly revenue, COGS and pairs with np.bincount. Percentile bands
+                   come from the scenario axis. Results are cached per deal list.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+import record_schema
+from model_cache import FingerprintCache
+
+BASE_YEAR = 2026
+DEFAULT_STAGE = 'Closed Won'
+# stage -> (win probability, P(delivery slips 0, 1, 2, 3 months))
+STAGES = {
+    'Prospect': (0.10, (0.40, 0.30, 0.20, 0.10)),
+    'Qualified': (0.25, (0.50, 0.25, 0.15, 0.10)),
+    'Proposal': (0.50, (0.60, 0.25, 0.10, 0.05)),
+    'Negotiation': (0.75, (0.70, 0.20, 0.07, 0.03)),
+    'Verbal': (0.90, (0.80, 0.15, 0.05, 0.00)),
+    'Closed Won': (1.00, (1.00, 0.00, 0.00, 0.00)),
+    'Closed Lost': (0.00, (1.00, 0.00, 0.00, 0.00)),
+}
+MAX_SLIP = 3
+DEFAULT_SCENARIOS = 2000
+DEFAULT_SEED = 7
+PERCENTILES = (10, 50, 90)
+
+_cache = FingerprintCache('wholesale_pipeline', max_entries=8)
+
+
+def month_index(year: int, month: int) -> int:
+    """Absolute month number: Jan 2026 = 1, Jan 2027 = 13."""
+    return (year - BASE_YEAR) * 12 + month
+
+
+def delivery_dates(deal_columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Delivery date of each deal from record_schema columns, else its close date (NaT if neither)."""
+    delivery = deal_columns['delivery_date']
+    return np.where(np.isnat(delivery), deal_columns['close_date'], delivery)
+
+
+def deal_values(deal_columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """(revenue, COGS) per deal: pairs x price, and total_cost or the COGS rates."""
+    filled = record_schema.filled
+    revenue = filled(deal_columns['num_pairs'], 0) * filled(deal_columns['wholesale_price'], 0)
+    rate = (filled(deal_columns['cogs_product'], 0.25) + filled(deal_columns['cogs_warehousing'], 0.06)
+            + filled(deal_columns['cogs_freight'], 0.06) + filled(deal_columns['cogs_merchant'], 0.03))
+    total_cost = deal_columns['total_cost']
+    return revenue, np.where(np.isnan(total_cost), revenue * rate, total_cost)
+
+
+def stage_odds(deal_columns: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """(win probability, slip distribution) per deal; win_probability overrides the stage's."""
+    odds = [STAGES.get(stage or DEFAULT_STAGE, STAGES[DEFAULT_STAGE]) for stage in deal_columns['stage']]
+    p_win = np.array([p for p, _ in odds], dtype=float)
+    p_win = np.where(np.isnan(deal_columns['win_probability']), p_win, deal_columns['win_probability'])
+    return p_win, np.array([s for _, s in odds], dtype=float).reshape(-1, MAX_SLIP + 1)
+
+
+def _shift(day: np.datetime64, months: int) -> str:
+    """'YYYY-MM-DD' of a day moved `months` later (day clamped to 28 when it moves)."""
+    if months == 0:
+        return str(day)
+    month = day.astype('datetime64[M]')
+    day_of_month = int((day - month.astype('datetime64[D]')).astype(np.int64)) + 1
+    return str((month + months).astype('datetime64[D]') + min(day_of_month, 28) - 1)
+
+
+# ============================================================
+# EXPECTED VALUE
+# ============================================================
+
+def expected_deals(deals: List[Dict]) -> List[Dict]:
+    """
+    Risk-adjusted deal list: certain deals unchanged, lost deals dropped, every other
+    deal split into one copy per possible delivery month with pairs (and total_cost)
+    scaled by P(won) x P(slip). Feeds any calculator that takes wholesale_deals.
+    """
+    cols = record_schema.columns('wholesale_deals', deals)
+    p_win, slips = stage_odds(cols)
+    undated = np.isnat(delivery_dates(cols))
+    pairs = record_schema.filled(cols['num_pairs'], 0)
+    out = []
+    for i, deal in enumerate(deals):
+        if p_win[i] >= 1 and slips[i, 0] >= 1:
+            out.append(deal)
+            continue
+        if p_win[i] <= 0 or undated[i]:
+            continue
+        for k, p_slip in enumerate(slips[i]):
+            weight = float(p_win[i] * p_slip)
+            if weight <= 0:
+                continue
+            part = dict(deal, stage=DEFAULT_STAGE, expected_weight=weight,
+                        num_pairs=float(pairs[i]) * weight)
+            if not np.isnan(cols['total_cost'][i]):
+                part['total_cost'] = float(cols['total_cost'][i]) * weight
+            for field in ('close_date', 'delivery_date'):
+                if not np.isnat(cols[field][i]):
+                    part[field] = _shift(cols[field][i], k)
+            if k:
+                part['customer_name'] = f"{deal.get('customer_name', '')} (+{k}mo)"
+            out.append(part)
+    return out
+
+
+# ============================================================
+# SIMULATION
+# ============================================================
+
+def compile_deals(deals: List[Dict], skus: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Per-deal arrays of the dated deals: win probability, slip CDF, base month, revenue, COGS, pairs, SKU row."""
+    cols = record_schema.columns('wholesale_deals', deals)
+    delivery = delivery_dates(cols)
+    rows = np.flatnonzero(~np.isnat(delivery))
+    p_win, slips = stage_odds(cols)
+    revenue, cogs = deal_values(cols)
+    month = delivery.astype('datetime64[M]').astype(np.int64) - (BASE_YEAR - 1970) * 12 + 1
+    sku_rows = {sku: i for i, sku in enumerate(skus)}
+    sku = np.array([sku_rows.get('Beta' if name is None else name, -1) for name in cols['product_type']],
+                   dtype=np.int64)
+    return {
+        'p_win': p_win[rows],
+        'slip_cdf': np.cumsum(slips[rows], axis=1),
+        'month': month[rows],
+        'revenue': revenue[rows],
+        'cogs': cogs[rows],
+        'pairs': record_schema.filled(cols['num_pairs'], 0)[rows],
+        'sku': sku[rows],
+    }
+
+
+def simulate(deals: List[Dict], year: int = 2026, n_scenarios: int = DEFAULT_SCENARIOS,
+             seed: int = DEFAULT_SEED, skus: Sequence[str] = ('Beta', 'Alpha')) -> Dict[str, np.ndarray]:
+    """
+    Draw win/loss and delivery slip for every (deal, scenario) and total each
+    scenario by month of `year`.
+
+    Returns: {"revenue": (scenarios x 12), "cogs": (scenarios x 12),
+              "pairs": (scenarios x skus x 12)}
+    """
+    def compute():
+        c = compile_deals(deals, skus)
+        n_deals, n_skus = len(c['p_win']), len(skus)
+        rng = np.random.default_rng(seed)
+        won = rng.random((n_deals, n_scenarios)) < c['p_win'][:, None]
+        draw = rng.random((n_deals, n_scenarios))
+        slip = (draw[:, :, None] >= c['slip_cdf'][:, None, :MAX_SLIP]).sum(axis=2)
+        col = c['month'][:, None] + slip - month_index(year, 1)
+        keep = won & (col >= 0) & (col < 12)
+
+        deal_idx, scenario = np.nonzero(keep)
+        cell = scenario * 12 + col[keep]
+        size = n_scenarios * 12
+        revenue = np.bincount(cell, weights=c['revenue'][deal_idx], minlength=size)
+        cogs = np.bincount(cell, weights=c['cogs'][deal_idx], minlength=size)
+        sku = c['sku'][deal_idx]
+        known = sku >= 0
+        pair_cell = (scenario[known] * n_skus + sku[known]) * 12 + col[keep][known]
+        pairs = np.bincount(pair_cell, weights=c['pairs'][deal_idx][known], minlength=size * n_skus)
+        return {
+            'revenue': revenue.reshape(n_scenarios, 12),
+            'cogs': cogs.reshape(n_scenarios, 12),
+            'pairs': pairs.reshape(n_scenarios, n_skus, 12),
+        }
+
+    return _cache.get_or_compute([deals, year, n_scenarios, seed, list(skus)], compute)
+
+
+def summarize(simulation: Dict[str, np.ndarray], percentiles: Sequence[int] = PERCENTILES) -> Dict:
+    """
+    Expected value and percentile bands of monthly and full-year revenue and gross profit.
+
+    Returns: {"expected": {"revenue", "gross_profit"} per month,
+              "bands": {pct: {"revenue", "gross_profit"} per month},
+              "annual": {"expected", pct...} for revenue and gross profit}
+    """
+    revenue = simulation['revenue']
+    gross_profit = revenue - simulation['cogs']
+    series = {'revenue': revenue, 'gross_profit': gross_profit}
+    return {
+        'expected': {k: v.mean(axis=0) for k, v in series.items()},
+        'bands': {p: {k: np.percentile(v, p, axis=0) for k, v in series.items()} for p in percentiles},
+        'annual': {k: {'expected': float(v.sum(axis=1).mean()),
+                       **{p: float(np.percentile(v.sum(axis=1), p)) for p in percentiles}}
+                   for k, v in series.items()},
+    }